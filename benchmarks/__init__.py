@@ -0,0 +1,7 @@
+"""
+Micro benchmarks for the data structures.
+
+Run one from the repository root, e.g.
+
+    python -m benchmarks.bench_bulk_load -n 100000
+"""
@@ -0,0 +1,42 @@
+"""
+Incremental __setitem__ inserts versus LinearProbeTable.update / from_items.
+"""
+from __future__ import annotations
+
+import argparse
+
+from benchmarks.workloads import mountains, report, timed
+from data_structures.hash_table import LinearProbeTable
+
+
+def incremental(items: list) -> LinearProbeTable:
+    table = LinearProbeTable()
+    for key, value in items:
+        table[key] = value
+    return table
+
+
+def count_rehashes(items: list) -> int:
+    table = LinearProbeTable()
+    rounds = 0
+    for key, value in items:
+        before = table.table_size
+        table[key] = value
+        rounds += table.table_size != before
+    return rounds
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("-n", type=int, default=100_000, help="Number of mountains to load.")
+    args = p.parse_args()
+
+    items = [(m.name, m) for m in mountains(args.n)]
+    t_incremental, _ = timed(lambda: incremental(items))
+    t_bulk, table = timed(lambda: LinearProbeTable.from_items(items))
+    assert len(table) == args.n
+
+    report(f"Loading {args.n} mountains ({count_rehashes(items)} rehash rounds incrementally)", [
+        ("incremental __setitem__", t_incremental),
+        ("from_items", t_bulk),
+    ])
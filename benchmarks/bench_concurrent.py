@@ -0,0 +1,94 @@
+"""
+Several threads filling and reading one DoubleKeyTable: the plain table
+(which loses pairs), the plain table behind one global lock, and
+ConcurrentDoubleKeyTable with lock striping. Reports throughput and whether
+every pair written could be read back.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import threading
+import time
+
+from benchmarks.workloads import mountain_names
+from concurrent_double_key_table import ConcurrentDoubleKeyTable
+from double_key_table import DoubleKeyTable
+
+
+class GlobalLockTable(DoubleKeyTable):
+    """Every operation takes one shared lock."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key):
+        with self._lock:
+            return super().__getitem__(key)
+
+    def __setitem__(self, key, data):
+        with self._lock:
+            super().__setitem__(key, data)
+
+
+def worker(table: DoubleKeyTable, key1s: list[str], worker_id: int, ops: int, read_ratio: float,
+           written: dict, errors: list) -> None:
+    rng = random.Random(worker_id)
+    mine = []
+    for i in range(ops):
+        try:
+            if mine and rng.random() < read_ratio:
+                table[rng.choice(mine)]
+            else:
+                key = (rng.choice(key1s), f"w{worker_id}-{i}")
+                table[key] = i
+                mine.append(key)
+        except Exception as e:
+            # Lost pairs and broken slots, when the table isn't thread-safe.
+            errors.append(e)
+    written[worker_id] = mine
+
+
+def run(table: DoubleKeyTable, key1s: list[str], threads: int, ops: int,
+        read_ratio: float) -> tuple[float, int, int]:
+    """Return (operations per second, failed operations, written pairs missing afterwards)."""
+    written = {}
+    errors = []
+    pool = [threading.Thread(target=worker, args=(table, key1s, i, ops, read_ratio, written, errors))
+            for i in range(threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    seconds = time.perf_counter() - start
+    missing = 0
+    for keys in written.values():
+        for key in keys:
+            try:
+                table[key]
+            except Exception:
+                missing += 1
+    return threads * ops / seconds, len(errors), missing
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("-t", "--threads", type=int, default=8)
+    p.add_argument("-n", "--ops", type=int, default=20_000, help="Operations per thread.")
+    p.add_argument("-k", type=int, default=500, help="Number of key1s.")
+    p.add_argument("-r", "--reads", type=float, default=0.5, help="Fraction of operations that are lookups.")
+    args = p.parse_args()
+
+    # Switch threads often, as a busy ingestion process would.
+    sys.setswitchinterval(1e-5)
+    key1s = mountain_names(args.k)
+    print(f"{args.threads} threads x {args.ops} operations, {args.reads:.0%} lookups, {args.k} key1s")
+    print(f"  {'table':<28}{'ops/s':>10}{'failed':>10}{'missing':>10}")
+    for label, make in (("DoubleKeyTable, no lock", DoubleKeyTable),
+                        ("DoubleKeyTable, one lock", GlobalLockTable),
+                        ("ConcurrentDoubleKeyTable", ConcurrentDoubleKeyTable)):
+        ops_per_second, failed, missing = run(make(), key1s, args.threads, args.ops, args.reads)
+        print(f"  {label:<28}{ops_per_second:>10.0f}{failed:>10}{missing:>10}")
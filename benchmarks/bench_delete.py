@@ -0,0 +1,41 @@
+"""
+Delete-heavy workload with cluster re-insertion versus tombstone deletion.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+from collections import deque
+
+from benchmarks.workloads import mountain_names, report, timed
+from data_structures.hash_table import LinearProbeTable
+
+
+def churn(table: LinearProbeTable, names: list[str], rounds: int, seed: int = 0) -> None:
+    """Fill the table, then repeatedly delete a random live key and insert a fresh one."""
+    rng = random.Random(seed)
+    live = names[:len(names) // 2]
+    spare = deque(names[len(names) // 2:])
+    table.update((name, name) for name in live)
+    for i in range(rounds):
+        victim = rng.randrange(len(live))
+        del table[live[victim]]
+        spare.append(live[victim])
+        live[victim] = spare.popleft()
+        table[live[victim]] = i
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("-n", type=int, default=50_000, help="Number of keys kept in the table.")
+    p.add_argument("-r", "--rounds", type=int, default=100_000, help="Number of delete/insert rounds.")
+    args = p.parse_args()
+
+    names = mountain_names(2 * args.n)
+    t_cluster, _ = timed(lambda: churn(LinearProbeTable(), names, args.rounds))
+    t_tombstone, _ = timed(lambda: churn(LinearProbeTable(tombstones=True), names, args.rounds))
+
+    report(f"{args.rounds} delete/insert rounds over {args.n} keys", [
+        ("cluster re-insertion", t_cluster),
+        ("tombstones", t_tombstone),
+    ])
@@ -0,0 +1,39 @@
+"""
+Time to load (key1, key2) pairs into a DoubleKeyTable, for doubling sizes.
+Linear total time shows up as a flat time per pair.
+"""
+from __future__ import annotations
+
+import argparse
+
+from benchmarks.workloads import mountain_names, timed
+from double_key_table import DoubleKeyTable
+
+
+def load(pairs: list[tuple[str, str]]) -> DoubleKeyTable:
+    table = DoubleKeyTable()
+    for i, key in enumerate(pairs):
+        table[key] = i
+    return table
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("-n", type=int, default=1_000_000, help="Largest number of pairs to load.")
+    p.add_argument("-f", "--fanout", type=int, default=4, help="Number of key2s per key1.")
+    args = p.parse_args()
+
+    sizes = []
+    n = args.n
+    while n >= 1000 and len(sizes) < 5:
+        sizes.append(n)
+        n //= 2
+
+    key1s = mountain_names(args.n // args.fanout + 1)
+    print(f"Loading (key1, key2) pairs, {args.fanout} key2s per key1")
+    print(f"  {'pairs':>10}{'total':>12}{'per pair':>14}")
+    for n in reversed(sizes):
+        pairs = [(key1s[i // args.fanout], f"m{i % args.fanout}") for i in range(n)]
+        seconds, table = timed(lambda: load(pairs))
+        assert len(table) == n
+        print(f"  {n:>10}{seconds:>11.3f}s{seconds / n * 1e6:>12.2f}us")
@@ -0,0 +1,47 @@
+"""
+Cost of growing a DoubleKeyTable's primary table and of the cluster repair
+after deleting a key1, when every key1 has many key2s.
+"""
+from __future__ import annotations
+
+import argparse
+
+from benchmarks.workloads import mountain_names, report, timed
+from double_key_table import DoubleKeyTable
+
+
+def build(key1s: list[str], fanout: int) -> DoubleKeyTable:
+    table = DoubleKeyTable()
+    for key1 in key1s:
+        for j in range(fanout):
+            table[key1, f"m{j}"] = j
+    return table
+
+
+def delete_last_pairs(table: DoubleKeyTable, key1s: list[str]) -> None:
+    """Delete the last remaining pair of each key1, which repairs its primary cluster."""
+    for key1 in key1s:
+        del table[key1, "m0"]
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("-k", type=int, default=2_000, help="Number of key1s.")
+    p.add_argument("-f", "--fanout", type=int, default=200, help="Number of key2s per key1.")
+    args = p.parse_args()
+
+    key1s = mountain_names(args.k)
+    table = build(key1s, args.fanout)
+    t_resize, _ = timed(lambda: table._resize(table.outer_index + 1))
+    # Few enough that the table does not shrink.
+    victims = key1s[:args.k // 10]
+    for key1 in victims:
+        for j in range(1, args.fanout):
+            del table[key1, f"m{j}"]
+    t_delete, _ = timed(lambda: delete_last_pairs(table, victims))
+    assert len(table) == (args.k - len(victims)) * args.fanout
+
+    report(f"{args.k} key1s with {args.fanout} key2s each", [
+        ("grow primary table", t_resize),
+        (f"delete {len(victims)} key1s", t_delete),
+    ])
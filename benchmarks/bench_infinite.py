@@ -0,0 +1,56 @@
+"""
+InfiniteHashTable on mountain names: inserts, lookups, listing every key
+in sorted order by walking the levels versus sorting the keys, and prefix
+queries versus filtering every key.
+"""
+from __future__ import annotations
+
+import argparse
+
+from benchmarks.workloads import mountain_names, report, timed
+from infinite_hash_table import InfiniteHashTable
+
+
+def build(names: list[str]) -> InfiniteHashTable:
+    table = InfiniteHashTable()
+    for i, name in enumerate(names):
+        table[name] = i
+    return table
+
+
+def lookup_all(table: InfiniteHashTable, names: list[str]) -> None:
+    for name in names:
+        table[name]
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("-n", type=int, default=100_000, help="Number of names.")
+    args = p.parse_args()
+
+    names = mountain_names(args.n)
+    t_build, table = timed(lambda: build(names))
+    t_lookup, _ = timed(lambda: lookup_all(table, names))
+    t_walk, walked = timed(lambda: list(table.keys()))
+    t_sort, ordered = timed(lambda: sorted(names))
+    assert walked == ordered
+
+    report(f"{args.n} names", [
+        ("insert", t_build),
+        ("lookup", t_lookup),
+        ("sorted keys, walking levels", t_walk),
+        ("sorted keys, sorted()", t_sort),
+    ])
+
+    queries = 100
+    for prefix in ("default-a", "default-a1", "default-a1f"):
+        t_prefix, found = timed(lambda: [list(table.keys_with_prefix(prefix)) for _ in range(queries)])
+        t_filter, filtered = timed(lambda: [sorted(name for name in names if name.startswith(prefix))
+                                            for _ in range(queries)])
+        assert found == filtered
+        t_count, _ = timed(lambda: [table.count_with_prefix(prefix) for _ in range(queries)])
+        report(f"{queries} queries for {prefix!r} ({len(found[0])} matches)", [
+            ("keys_with_prefix", t_prefix),
+            ("filter and sort all names", t_filter),
+            ("count_with_prefix", t_count),
+        ])
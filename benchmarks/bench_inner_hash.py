@@ -0,0 +1,63 @@
+"""
+DoubleKeyTable with hash2 overwritten: one shared SecondKeyHash for all inner
+tables versus the previous lambda closure per inner table.
+"""
+from __future__ import annotations
+
+import argparse
+import tracemalloc
+
+from benchmarks.workloads import mountain_names, timed
+from data_structures.hash_table import LinearProbeTable
+from double_key_table import DoubleKeyTable
+
+
+class SharedHashTable(DoubleKeyTable):
+    def hash2(self, key: str, sub_table: LinearProbeTable) -> int:
+        return self.full_hash(key) % sub_table.table_size
+
+
+class ClosureHashTable(SharedHashTable):
+    """Gives each inner table its own closure, as DoubleKeyTable used to."""
+
+    def _new_internal_table(self) -> LinearProbeTable:
+        internal_table = LinearProbeTable(self.internal_table_sizes, hasher=self.hasher)
+        internal_table.hash = lambda k: self.hash2(k, internal_table)
+        return internal_table
+
+
+def build(cls: type, pairs: list[tuple[str, str]]) -> DoubleKeyTable:
+    table = cls()
+    for i, key in enumerate(pairs):
+        table[key] = i
+    return table
+
+
+def bytes_used(cls: type, pairs: list[tuple[str, str]]) -> int:
+    tracemalloc.start()
+    table = build(cls, pairs)
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del table
+    return used
+
+
+def lookup_all(table: DoubleKeyTable, pairs: list[tuple[str, str]]) -> None:
+    for key in pairs:
+        table[key]
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("-k", type=int, default=50_000, help="Number of key1s.")
+    p.add_argument("-f", "--fanout", type=int, default=2, help="Number of key2s per key1.")
+    args = p.parse_args()
+
+    pairs = [(key1, f"m{j}") for key1 in mountain_names(args.k) for j in range(args.fanout)]
+    print(f"{args.k} key1s with {args.fanout} key2s each, hash2 overwritten")
+    print(f"  {'inner hash':<12}{'bytes/key1':>12}{'lookups':>10}")
+    for label, cls in (("closure", ClosureHashTable), ("shared", SharedHashTable)):
+        used = bytes_used(cls, pairs)
+        table = build(cls, pairs)
+        t_lookup, _ = timed(lambda: lookup_all(table, pairs))
+        print(f"  {label:<12}{used / args.k:>12.1f}{t_lookup:>9.3f}s")
@@ -0,0 +1,69 @@
+"""
+Growth reinserts in DoubleKeyTable inner tables on a skewed (Zipf) fanout,
+with inner tables starting at the smallest size, at the running mean
+fanout, or at an explicit expected_fanout.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+
+from benchmarks.workloads import mountain_names, timed
+from data_structures.hash_table import LinearProbeTable
+from double_key_table import DoubleKeyTable
+
+
+class CountingProbeTable(LinearProbeTable):
+    moved = 0
+
+    def _rebuild(self, size_index: int) -> None:
+        CountingProbeTable.moved += len(self)
+        super()._rebuild(size_index)
+
+
+class CountingDoubleKeyTable(DoubleKeyTable):
+    def _new_internal_table(self) -> LinearProbeTable:
+        table = super()._new_internal_table()
+        table.__class__ = CountingProbeTable
+        return table
+
+
+def zipf_pairs(k: int, top: int, grouped: bool, seed: int = 0) -> list[tuple[str, str]]:
+    """Pairs where the i-th most common of k key1s has about top / i key2s."""
+    rng = random.Random(seed)
+    key1s = mountain_names(k, seed)
+    pairs = [(key1, f"m{j}") for rank, key1 in enumerate(key1s, 1) for j in range(max(1, top // rank))]
+    if grouped:
+        rng.shuffle(key1s)
+        order = {key1: i for i, key1 in enumerate(key1s)}
+        pairs.sort(key=lambda pair: order[pair[0]])
+    else:
+        rng.shuffle(pairs)
+    return pairs
+
+
+def load(pairs: list[tuple[str, str]], **kwargs) -> CountingDoubleKeyTable:
+    table = CountingDoubleKeyTable(**kwargs)
+    for i, key in enumerate(pairs):
+        table[key] = i
+    return table
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("-k", type=int, default=2_000, help="Number of key1s.")
+    p.add_argument("-t", "--top", type=int, default=10_000, help="Fanout of the most common key1.")
+    args = p.parse_args()
+
+    for grouped in (True, False):
+        pairs = zipf_pairs(args.k, args.top, grouped)
+        mean = len(pairs) // args.k
+        print(f"{len(pairs)} pairs over {args.k} key1s, {'grouped by key1' if grouped else 'interleaved'}")
+        print(f"  {'inner tables start at':<28}{'reinserts':>12}{'time':>10}")
+        for label, kwargs in (("smallest size", {"expected_fanout": 0}),
+                              ("running mean", {}),
+                              (f"expected_fanout={mean}", {"expected_fanout": mean})):
+            CountingProbeTable.moved = 0
+            seconds, table = timed(lambda: load(pairs, **kwargs))
+            assert len(table) == len(pairs)
+            print(f"  {label:<28}{CountingProbeTable.moved:>12}{seconds:>9.3f}s")
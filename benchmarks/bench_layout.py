@@ -0,0 +1,45 @@
+"""
+Memory and throughput of the tuple slot layout (LinearProbeTable) versus the
+column layout (ColumnProbeTable).
+"""
+from __future__ import annotations
+
+import argparse
+import tracemalloc
+
+from benchmarks.workloads import mountain_names, timed
+from data_structures.hash_table import LinearProbeTable
+from data_structures.column_probe_table import ColumnProbeTable
+
+
+def build(table_class: type, names: list[str]) -> LinearProbeTable:
+    table = table_class()
+    for i, name in enumerate(names):
+        table[name] = i
+    return table
+
+
+def memory(table_class: type, names: list[str]) -> int:
+    """Bytes still allocated by a table once it holds every name (keys and values excluded)."""
+    tracemalloc.start()
+    table = build(table_class, names)
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del table
+    return used
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("-n", type=int, default=100_000, help="Number of keys to insert.")
+    args = p.parse_args()
+
+    names = mountain_names(args.n)
+    print(f"{args.n} keys")
+    print(f"  {'layout':<8}{'bytes/key':>11}{'insert':>10}{'lookup':>10}{'values()':>10}")
+    for label, table_class in [("tuple", LinearProbeTable), ("column", ColumnProbeTable)]:
+        used = memory(table_class, names)
+        t_insert, table = timed(lambda: build(table_class, names))
+        t_lookup, _ = timed(lambda: [table[name] for name in names])
+        t_values, _ = timed(lambda: list(table.values()))
+        print(f"  {label:<8}{used / args.n:>11.1f}{t_insert:>9.3f}s{t_lookup:>9.3f}s{t_values:>9.3f}s")
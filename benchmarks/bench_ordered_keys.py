@@ -0,0 +1,61 @@
+"""
+Ordered listings and key2 range queries on a DoubleKeyTable: sorting an
+inner table's keys on every query versus reading the ordered index kept
+with ordered=True, and what keeping the index costs when loading.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+
+from benchmarks.workloads import mountain_names, report, timed
+from double_key_table import DoubleKeyTable
+
+
+def build(pairs: list[tuple[int, str]], ordered: bool) -> DoubleKeyTable:
+    table = DoubleKeyTable(ordered=ordered)
+    for i, key in enumerate(pairs):
+        table[key] = i
+    return table
+
+
+def sorted_ranges(table: DoubleKeyTable, key1s: list[int], bounds: list[tuple[str, str]]) -> int:
+    found = 0
+    for key1, (start, stop) in zip(key1s, bounds):
+        found += sum(1 for key2 in sorted(table.keys(key1)) if start <= key2 < stop)
+    return found
+
+
+def index_ranges(table: DoubleKeyTable, key1s: list[int], bounds: list[tuple[str, str]]) -> int:
+    found = 0
+    for key1, (start, stop) in zip(key1s, bounds):
+        found += sum(1 for _ in table.iter_keys(key1, start, stop))
+    return found
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("-k", type=int, default=10, help="Number of key1s (difficulty levels).")
+    p.add_argument("-f", "--fanout", type=int, default=5_000, help="Number of key2s per key1.")
+    p.add_argument("-q", "--queries", type=int, default=2_000, help="Number of range queries.")
+    args = p.parse_args()
+
+    rng = random.Random(0)
+    names = mountain_names(args.fanout)
+    pairs = [(key1, name) for key1 in range(args.k) for name in names]
+    rng.shuffle(pairs)
+    key1s = [rng.randrange(args.k) for _ in range(args.queries)]
+    bounds = [tuple(sorted(rng.sample(names, 2))) for _ in range(args.queries)]
+
+    t_plain, plain = timed(lambda: build(pairs, False))
+    t_ordered, ordered = timed(lambda: build(pairs, True))
+    t_sorted, n_sorted = timed(lambda: sorted_ranges(plain, key1s, bounds))
+    t_index, n_index = timed(lambda: index_ranges(ordered, key1s, bounds))
+    assert n_sorted == n_index
+
+    report(f"{args.k} key1s with {args.fanout} key2s each, {args.queries} range queries", [
+        ("load, unordered", t_plain),
+        ("load, ordered=True", t_ordered),
+        ("ranges by sorting keys", t_sorted),
+        ("ranges from the index", t_index),
+    ])
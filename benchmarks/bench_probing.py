@@ -0,0 +1,40 @@
+"""
+Probe lengths and timings for each ProbeStrategy on the same workload.
+"""
+from __future__ import annotations
+
+import argparse
+
+from benchmarks.workloads import mountain_names, timed
+from data_structures.hash_table import LinearProbeTable, ProbeStrategy
+
+
+def build(strategy: ProbeStrategy, names: list[str]) -> LinearProbeTable:
+    table = LinearProbeTable(probing=strategy)
+    for name in names:
+        table[name] = name
+    return table
+
+
+def lookup_all(table: LinearProbeTable, names: list[str]) -> None:
+    for name in names:
+        table[name]
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("-n", type=int, default=50_000, help="Number of keys to insert.")
+    args = p.parse_args()
+
+    names = mountain_names(args.n)
+    print(f"{args.n} keys")
+    print(f"  {'strategy':<16}{'load':>6}{'mean probe':>12}{'max probe':>11}{'insert':>10}{'lookup':>10}")
+    for strategy in ProbeStrategy:
+        t_insert, table = timed(lambda: build(strategy, names))
+        t_lookup, _ = timed(lambda: lookup_all(table, names))
+        lengths = [table.probe_length(name) for name in names]
+        print(
+            f"  {strategy.name.lower():<16}{len(table) / table.table_size:>6.2f}"
+            f"{sum(lengths) / len(lengths):>12.3f}{max(lengths):>11}"
+            f"{t_insert:>9.3f}s{t_lookup:>9.3f}s"
+        )
@@ -0,0 +1,55 @@
+"""
+Per-insert latency with all-at-once resizing versus incremental resizing.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from benchmarks.workloads import mountain_names
+from data_structures.hash_table import LinearProbeTable
+from double_key_table import DoubleKeyTable
+
+
+def insert_latencies(table, keys: list) -> list[float]:
+    """Insert every key into table, returning the seconds each insert took."""
+    latencies = []
+    for i, key in enumerate(keys):
+        start = time.perf_counter()
+        table[key] = i
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def percentiles(latencies: list[float]) -> list[float]:
+    """p50, p99, p99.9 and max of the latencies, in milliseconds."""
+    ordered = sorted(latencies)
+    picks = [ordered[int(len(ordered) * q)] for q in (0.5, 0.99, 0.999)]
+    return [seconds * 1000 for seconds in picks + [ordered[-1]]]
+
+
+def print_rows(title: str, rows: list[tuple[str, list[float]]]) -> None:
+    print(title)
+    print(f"  {'':<28}{'p50':>12}{'p99':>12}{'p99.9':>12}{'max':>12}  (ms)")
+    for label, latencies in rows:
+        print(f"  {label:<28}" + "".join(f"{ms:>12.4f}" for ms in percentiles(latencies)))
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("-n", type=int, default=200_000, help="Number of keys inserted into LinearProbeTable.")
+    p.add_argument("-k", type=int, default=5_000, help="Number of key1s inserted into DoubleKeyTable.")
+    p.add_argument("-f", "--fanout", type=int, default=4, help="Number of key2s per key1.")
+    args = p.parse_args()
+
+    names = mountain_names(args.n)
+    print_rows(f"Inserting {args.n} keys into LinearProbeTable", [
+        ("all at once", insert_latencies(LinearProbeTable(), names)),
+        ("incremental", insert_latencies(LinearProbeTable(incremental=True), names)),
+    ])
+
+    pairs = [(key1, f"m{j}") for key1 in mountain_names(args.k, seed=1) for j in range(args.fanout)]
+    print_rows(f"Inserting {len(pairs)} pairs ({args.k} key1s) into DoubleKeyTable", [
+        ("all at once", insert_latencies(DoubleKeyTable(), pairs)),
+        ("incremental", insert_latencies(DoubleKeyTable(incremental=True), pairs)),
+    ])
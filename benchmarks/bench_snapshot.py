@@ -0,0 +1,70 @@
+"""
+Snapshots of a DoubleKeyTable: the cost of taking one, of the copies
+writers make afterwards, and a report scan interleaved with inserts, which
+fails on the live table but stays consistent on a snapshot.
+"""
+from __future__ import annotations
+
+import argparse
+
+from benchmarks.workloads import mountain_names, report, timed
+from double_key_table import DoubleKeyTable
+
+
+def build(key1s: list[str], fanout: int) -> DoubleKeyTable:
+    table = DoubleKeyTable()
+    for key1 in key1s:
+        for j in range(fanout):
+            table[key1, f"m{j}"] = j
+    return table
+
+
+def write_round(table: DoubleKeyTable, key1s: list[str]) -> None:
+    """Overwrite one pair of every key1."""
+    for key1 in key1s:
+        table[key1, "m0"] = -1
+
+
+def scan_while_writing(source, table: DoubleKeyTable, extra: list[str]) -> int:
+    """Sum the values of source, inserting a new pair into table after every 100 read."""
+    total = 0
+    for i, value in enumerate(source.values()):
+        total += value
+        if i % 100 == 0 and extra:
+            table[extra.pop(), "m0"] = 0
+    return total
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("-k", type=int, default=20_000, help="Number of key1s.")
+    p.add_argument("-f", "--fanout", type=int, default=10, help="Number of key2s per key1.")
+    args = p.parse_args()
+
+    names = mountain_names(args.k * 2)
+    key1s, extra = names[:args.k], names[args.k:]
+    table = build(key1s, args.fanout)
+
+    t_plain, _ = timed(lambda: write_round(table, key1s))
+    t_snapshot, snapshot = timed(table.snapshot)
+    t_first, _ = timed(lambda: write_round(table, key1s))
+    t_second, _ = timed(lambda: write_round(table, key1s))
+
+    try:
+        scan_while_writing(table, table, list(extra))
+        live = "completed"
+    except RuntimeError as e:
+        live = f"RuntimeError: {e}"
+    snapshot = table.snapshot()
+    expected = sum(snapshot.values())
+    t_scan, total = timed(lambda: scan_while_writing(snapshot, table, list(extra)))
+    assert total == expected
+
+    report(f"{args.k} key1s with {args.fanout} key2s each", [
+        ("snapshot()", t_snapshot),
+        ("write round, no snapshot", t_plain),
+        ("first write round after", t_first),
+        ("second write round after", t_second),
+        ("scan snapshot while writing", t_scan),
+    ])
+    print(f"  scanning the live table while writing: {live}")
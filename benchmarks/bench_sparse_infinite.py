@@ -0,0 +1,61 @@
+"""
+Memory per key and lookup time of InfiniteHashTable, which gives every
+table a list of all 27 slots, against SparseInfiniteHashTable, which keeps
+only the occupied slots and stores chains of single-table tables as one node.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import tracemalloc
+
+from benchmarks.workloads import mountain_names, timed
+from infinite_hash_table import InfiniteHashTable
+from sparse_infinite_hash_table import SparseInfiniteHashTable
+
+SYLLABLES = ["ka", "li", "man", "jaro", "ev", "er", "est", "ana", "pur", "na", "k2", "mont", "blanc", "den", "ali"]
+
+
+def peak_names(n: int, seed: int = 0) -> list[str]:
+    """n distinct names made of a few syllables, like "mount kalijaro"."""
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < n:
+        names.add(rng.choice(["mount ", "mt ", ""]) + "".join(rng.choices(SYLLABLES, k=rng.randint(2, 5))))
+    return list(names)
+
+
+def build(table_class: type, names: list[str]):
+    table = table_class()
+    for i, name in enumerate(names):
+        table[name] = i
+    return table
+
+
+def measured(table_class: type, names: list[str]) -> tuple[float, object]:
+    """Build a table, returning (bytes allocated that it still holds, table)."""
+    tracemalloc.start()
+    table = build(table_class, names)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, table
+
+
+def lookup_all(table, names: list[str]) -> None:
+    for name in names:
+        table[name]
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("-n", type=int, default=100_000, help="Number of names.")
+    args = p.parse_args()
+
+    for label, names in (("mountain names", mountain_names(args.n)), ("syllable names", peak_names(args.n))):
+        print(f"{args.n} {label}")
+        print(f"  {'':<26}{'bytes/key':>10}{'insert':>10}{'lookup':>10}")
+        for table_class in (InfiniteHashTable, SparseInfiniteHashTable):
+            size, table = measured(table_class, names)
+            t_build, _ = timed(lambda: build(table_class, names))
+            t_lookup, _ = timed(lambda: lookup_all(table, names))
+            print(f"  {table_class.__name__:<26}{size / len(names):>10.0f}{t_build:>9.3f}s{t_lookup:>9.3f}s")
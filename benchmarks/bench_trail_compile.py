@@ -0,0 +1,51 @@
+"""
+Repeated queries on a trail that doesn't change: with the compiled trail
+kept between queries (warm), and compiled again for every query (cold, as
+after an edit). iter_mountains walks the Trail objects themselves, for
+comparison with collect_all_mountains.
+"""
+from __future__ import annotations
+
+import argparse
+
+from benchmarks.workloads import trail, timed
+from personality import LazyWalker, TopWalker
+from trail import Trail, _TrailPart
+
+
+def per_query(query, repeats: int, cold: bool) -> float:
+    """Seconds per call of query, marking every trail as edited before each call if cold."""
+    def run() -> None:
+        for _ in range(repeats):
+            if cold:
+                _TrailPart.edits += 1
+            query()
+    seconds, _ = timed(run)
+    return seconds / repeats
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("-n", type=int, default=50_000, help="Mountains in series.")
+    p.add_argument("-s", "--splits", type=int, default=500, help="Splits, each with a mountain on top and none on the bottom.")
+    p.add_argument("-r", "--repeats", type=int, default=20)
+    args = p.parse_args()
+
+    t = trail(args.n, args.splits, empty_bottom=True)
+    t_compile, compiled = timed(t.compile)
+    longest = args.n + args.splits
+    queries = [
+        ("iter_mountains (objects)", lambda: list(t.iter_mountains())),
+        ("collect_all_mountains", t.collect_all_mountains),
+        ("follow_path TopWalker", lambda: t.follow_path(TopWalker())),
+        ("follow_path LazyWalker", lambda: t.follow_path(LazyWalker())),
+        ("count_k_paths", lambda: t.count_k_paths(longest - 1)),
+        ("length_k_paths (longest)", lambda: t.length_k_paths(longest)),
+        ("first of iter_k_paths", lambda: next(t.iter_k_paths(longest - 1))),
+    ]
+    print(f"{args.n} mountains, {args.splits} splits: {len(compiled)} instructions, compiled in {t_compile * 1000:.1f} ms")
+    print(f"  {'ms per query':<28}{'cold':>10}{'warm':>10}")
+    for label, query in queries:
+        cold = per_query(query, args.repeats, cold=True)
+        warm = per_query(query, args.repeats, cold=False)
+        print(f"  {label:<28}{cold * 1000:>10.2f}{warm * 1000:>10.2f}")
@@ -0,0 +1,76 @@
+"""
+The visited-set bookkeeping of the trail traversals (a membership test and
+an add per trail object) with trail objects hashed by identity, against the
+old scheme where every object of a class had the same hash, so each set
+lookup compared trails structurally against everything already visited.
+"""
+from __future__ import annotations
+
+import argparse
+
+from benchmarks.workloads import trail, timed
+from trail import Trail, TrailSeries, TrailSplit
+
+
+def visit_all(root: Trail) -> int:
+    """Walk every trail object, recording it in a visited set, and return how many there were."""
+    visited = set()
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node in visited:
+            continue
+        visited.add(node)
+        if isinstance(node, Trail):
+            if node.store is not None:
+                stack.append(node.store)
+        elif isinstance(node, TrailSeries):
+            stack.append(node.following)
+        else:
+            stack.extend((node.path_follow, node.path_bottom, node.path_top))
+    return len(visited)
+
+
+def structural_hashing() -> dict:
+    """Make trail objects hash and compare like the old dataclasses, returning what to restore."""
+    saved = {cls: (cls.__eq__, cls.__hash__) for cls in (Trail, TrailSeries, TrailSplit)}
+    for cls in saved:
+        cls.__eq__ = lambda self, other: type(self) is type(other) and self.structurally_equal(other)
+        cls.__hash__ = lambda self: hash(type(self))
+    return saved
+
+
+def restore(saved: dict) -> None:
+    for cls, (eq, hash_) in saved.items():
+        cls.__eq__ = eq
+        cls.__hash__ = hash_
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("-n", type=int, default=50_000, help="Mountains on the largest trail.")
+    p.add_argument("-s", "--splits", type=int, default=100, help="Splits along each trail.")
+    p.add_argument("--structural-max", type=int, default=4_000, help="Largest trail to time with structural hashing.")
+    args = p.parse_args()
+
+    print(f"Visiting every object of a trail, {args.splits} splits per trail")
+    print(f"  {'mountains':>10}{'objects':>10}{'identity':>12}{'structural':>12}")
+    sizes = [500]
+    while sizes[-1] * 2 < args.n:
+        sizes.append(sizes[-1] * 2)
+    sizes.append(args.n)
+    for n in sizes:
+        t = trail(n, args.splits)
+        t_identity, count = timed(lambda: visit_all(t))
+        row = f"  {n:>10}{count:>10}{t_identity:>11.4f}s"
+        if n <= args.structural_max:
+            saved = structural_hashing()
+            try:
+                t_structural, structural_count = timed(lambda: visit_all(t))
+            finally:
+                restore(saved)
+            # Structurally equal objects, like the empty trails ending each branch, count as one.
+            row += f"{t_structural:>11.4f}s  ({structural_count} objects told apart)"
+        else:
+            row += f"{'skipped':>12}"
+        print(row)
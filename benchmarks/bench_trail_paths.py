@@ -0,0 +1,93 @@
+"""
+Counting the paths of each length through a trail: Trail.count_paths_by_length
+against listing every path and counting lengths. Then listing the paths of
+k mountains: Trail.iter_k_paths against copying out every path and keeping
+those of length k. Splits have one mountain on top and none on the bottom,
+so there are 2^splits paths of many lengths.
+"""
+from __future__ import annotations
+
+import argparse
+from collections import Counter
+
+from benchmarks.workloads import trail, timed
+from trail import Trail, TrailSplit
+
+
+def enumerate_lengths(root: Trail) -> Counter:
+    """Count path lengths by walking every path, with a stack of (trail, length so far, trails still to walk)."""
+    lengths = Counter()
+    stack = [(root, 0, ())]
+    while stack:
+        t, length, pending = stack.pop()
+        while t.store is None and pending:
+            t, pending = pending[0], pending[1:]
+        if t.store is None:
+            lengths[length] += 1
+        elif isinstance(t.store, TrailSplit):
+            rest = (t.store.path_follow,) + pending
+            stack.append((t.store.path_bottom, length, rest))
+            stack.append((t.store.path_top, length, rest))
+        else:
+            stack.append((t.store.following, length + 1, pending))
+    return lengths
+
+
+def copy_k_paths(root: Trail, k: int) -> list[list]:
+    """Build every path as its own list, copied at each split, keeping those of k mountains."""
+    found = []
+    stack = [(root, [], ())]
+    while stack:
+        t, path, pending = stack.pop()
+        while t.store is None and pending:
+            t, pending = pending[0], pending[1:]
+        if t.store is None:
+            if len(path) == k:
+                found.append(path)
+        elif isinstance(t.store, TrailSplit):
+            rest = (t.store.path_follow,) + pending
+            stack.append((t.store.path_bottom, list(path), rest))
+            stack.append((t.store.path_top, path, rest))
+        else:
+            path.append(t.store.mountain)
+            stack.append((t.store.following, path, pending))
+    return found
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("-n", type=int, default=2_000, help="Mountains in series on each trail.")
+    p.add_argument("--enumerate-max", type=int, default=16, help="Most splits to list every path for.")
+    args = p.parse_args()
+
+    print(f"{args.n} mountains in series plus the splits")
+    print(f"  {'splits':>7}{'paths':>12}{'dp':>10}{'enumerate':>12}")
+    for splits in (4, 8, 12, 16, 100, 300, 1000):
+        t = trail(args.n, splits, empty_bottom=True)
+        t_dp, histogram = timed(t.count_paths_by_length)
+        row = f"  {splits:>7}{sum(histogram):>12.3g}{t_dp:>9.4f}s"
+        if splits <= args.enumerate_max:
+            t_enum, lengths = timed(lambda: enumerate_lengths(t))
+            assert lengths == Counter({k: c for k, c in enumerate(histogram) if c})
+            row += f"{t_enum:>11.4f}s"
+        else:
+            row += f"{'skipped':>12}"
+        print(row)
+
+    print(f"\nPaths of k mountains, {args.n} mountains in series plus the splits")
+    print(f"  {'splits':>7}{'k':>6}{'paths':>8}{'iter_k_paths':>14}{'first path':>12}{'copy all':>10}")
+    for splits in (12, 16, 1000):
+        t = trail(args.n, splits, empty_bottom=True)
+        for k in (args.n + splits, args.n + splits - 2):
+            t_iter, paths = timed(lambda: list(t.iter_k_paths(k)) if splits <= 16 or k == args.n + splits else None)
+            t_first, _ = timed(lambda: next(t.iter_k_paths(k), None))
+            row = f"  {splits:>7}{k:>6}{t.count_k_paths(k):>8.3g}"
+            row += f"{t_iter:>13.4f}s" if paths is not None else f"{'skipped':>14}"
+            row += f"{t_first:>11.4f}s"
+            if splits <= args.enumerate_max:
+                t_copy, copied = timed(lambda: copy_k_paths(t, k))
+                assert len(copied) == len(paths)
+                row += f"{t_copy:>9.4f}s"
+            else:
+                row += f"{'skipped':>10}"
+            print(row)
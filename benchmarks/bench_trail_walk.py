@@ -0,0 +1,34 @@
+"""
+Trail.iter_mountains / collect_all_mountains on growing trails, and loading
+their mountains into a MountainManager the way main.py's setup does. Time
+per mountain should stay flat as the trail grows.
+"""
+from __future__ import annotations
+
+import argparse
+
+from benchmarks.workloads import trail, timed
+from mountain_manager import MountainManager
+
+
+def load(t) -> MountainManager:
+    manager = MountainManager()
+    manager.add_mountains(t.iter_mountains())
+    return manager
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("-n", type=int, default=200_000, help="Mountains on the largest trail.")
+    args = p.parse_args()
+
+    print(f"  {'mountains':>10}{'splits':>8}{'collect':>10}{'us/mtn':>8}{'load':>10}{'us/mtn':>8}")
+    n = args.n // 16
+    while n <= args.n:
+        t = trail(n, n // 10)
+        t_collect, found = timed(t.collect_all_mountains)
+        t_load, manager = timed(lambda: load(t))
+        assert len(manager.mountain_store) == len(found)
+        print(f"  {n:>10}{n // 10:>8}{t_collect:>9.3f}s{t_collect / len(found) * 1e6:>8.2f}"
+              f"{t_load:>9.3f}s{t_load / len(found) * 1e6:>8.2f}")
+        n *= 2
@@ -0,0 +1,60 @@
+"""
+Shared inputs and timing helpers for the benchmarks.
+"""
+from __future__ import annotations
+
+import random
+import time
+from typing import Callable
+
+from mountain import Mountain
+from trail import Trail, TrailSeries, TrailSplit
+
+
+def mountain_names(n: int, seed: int = 0) -> list[str]:
+    """Return n distinct mountain names, shaped like the ones main.py creates."""
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < n:
+        names.add(f"default-{rng.getrandbits(48):012x}")
+    return list(names)
+
+
+def mountains(n: int, seed: int = 0) -> list[Mountain]:
+    """Return n mountains with distinct names and random difficulty/length."""
+    rng = random.Random(seed)
+    return [Mountain(name, rng.randint(0, 10), rng.randint(1, 100)) for name in mountain_names(n, seed)]
+
+
+def trail(n: int, splits: int, seed: int = 0, empty_bottom: bool = False) -> Trail:
+    """
+    Return a trail of about n mountains in series, with `splits` evenly spaced
+    splits along it. Each split has one mountain on its top path, and one on
+    its bottom path unless empty_bottom is set, which gives paths of
+    different lengths.
+    """
+    every = max(1, n // (splits + 1))
+    names = iter(mountains(n + 2 * splits, seed))
+    trail = Trail(None)
+    # Built from the end, so no recursion is needed.
+    for i in range(n, 0, -1):
+        trail = Trail(TrailSeries(next(names), trail))
+        if i % every == 0 and splits:
+            splits -= 1
+            bottom = Trail(None) if empty_bottom else Trail(TrailSeries(next(names), Trail(None)))
+            trail = Trail(TrailSplit(Trail(TrailSeries(next(names), Trail(None))), bottom, trail))
+    return trail
+
+
+def timed(func: Callable[[], object]) -> tuple[float, object]:
+    """Run func once and return (seconds taken, result)."""
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def report(title: str, rows: list[tuple[str, float]]) -> None:
+    """Print a small table of (label, seconds) rows."""
+    print(title)
+    for label, seconds in rows:
+        print(f"  {label:<28} {seconds:10.4f}s")
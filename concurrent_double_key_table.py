@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+from contextlib import contextmanager, ExitStack
+from typing import TypeVar, Callable, Iterable, Iterator
+from data_structures.hashers import Hasher
+from data_structures.read_write_lock import ReadWriteLock
+from double_key_table import DoubleKeyTable, DoubleKeyTableSnapshot
+
+K1 = TypeVar('K1')
+K2 = TypeVar('K2')
+V = TypeVar('V')
+
+
+class ConcurrentDoubleKeyTable(DoubleKeyTable[K1, K2, V]):
+    """
+    Double Hash Table that can be used from several threads at once.
+
+    Key1s are split into `stripes` groups by their stored hash, each guarded
+    by a ReadWriteLock, and one more ReadWriteLock (the resize lock) guards
+    the primary table:
+        - Lookups hold both as readers, so they never wait for each other.
+        - Setting or deleting a key2 of an existing key1 only changes its
+          inner table, so it holds the resize lock as a reader and the
+          stripe of key1 as the writer. Writers to different stripes run
+          side by side.
+        - Adding a key1, deleting its last key2 (which repairs the primary
+          cluster) and resizing the primary table hold the resize lock as
+          the writer, which excludes every other operation.
+
+    The number of pairs is kept per stripe, so writers never share a
+    counter. keys(), values() and items() return lists copied under the read
+    locks rather than live views, as other threads would invalidate a view
+    part way through. Primary and inner tables always resize in one go
+    (incremental=False), since an incremental resize moves entries on
+    lookups.
+
+    Where the GIL lets only one thread run Python code at a time, the locks
+    make concurrent use safe rather than faster: expect about the throughput
+    of one lock around a DoubleKeyTable (see benchmarks/bench_concurrent.py).
+
+    Unless stated otherwise, all methods have the complexity of their
+    DoubleKeyTable counterpart, plus O(1) to take the locks.
+    """
+
+    # Default number of stripes.
+    STRIPES = 16
+
+    def __init__(self, sizes:list|None=None, internal_sizes:list|None=None, hasher:Hasher|None=None,
+                 expected_fanout:int|None=None, ordered:bool=False, stripes:int|None=None) -> None:
+        super().__init__(sizes, internal_sizes, hasher, expected_fanout=expected_fanout, ordered=ordered)
+        self._resize_lock = ReadWriteLock()
+        self._stripes = [ReadWriteLock() for _ in range(stripes if stripes is not None else self.STRIPES)]
+        # Pairs added (or removed, if negative) under each stripe lock, on top of _num_entries.
+        self._stripe_entries = [0] * len(self._stripes)
+
+    @contextmanager
+    def _reading(self, key1: K1) -> Iterator[None]:
+        """
+        Hold the resize lock and the stripe lock of key1 as a reader for the
+        duration of a with block. The hot paths (__getitem__, __setitem__ and
+        __delitem__) take the same locks inline.
+
+        :complexity: O(hash1(key1))
+        """
+        with self._resize_lock.reading():
+            with self._stripes[self._key1_hash(key1) % len(self._stripes)].reading():
+                yield
+
+    @contextmanager
+    def _reading_all(self) -> Iterator[None]:
+        """
+        Hold the resize lock and every stripe lock as a reader, so the whole
+        table stays still. Stripes are always taken in the same order.
+
+        :complexity: O(number of stripes)
+        """
+        with ExitStack() as stack:
+            stack.enter_context(self._resize_lock.reading())
+            for lock in self._stripes:
+                stack.enter_context(lock.reading())
+            yield
+
+    def __getitem__(self, key: tuple[K1, K2]) -> V:
+        """
+        :raises KeyError: when the key doesn't exist.
+        """
+        with self._resize_lock.reading():
+            key1_hash = self._key1_hash(key[0])
+            with self._stripes[key1_hash % len(self._stripes)].reading():
+                position, _ = self._linear_probe(key[0], None, False, key1_hash)
+                return self.primary_table[position][1][key[1]]
+
+    def __setitem__(self, key: tuple[K1, K2], data: V) -> None:
+        """
+        Set a (key, value) pair, only locking the stripe of key1 when key1 is
+        already in the table.
+        """
+        key1, key2 = key
+        with self._resize_lock.reading():
+            key1_hash = self._key1_hash(key1)
+            stripe = key1_hash % len(self._stripes)
+            with self._stripes[stripe].writing():
+                try:
+                    position, _ = self._linear_probe(key1, None, False, key1_hash)
+                except KeyError:
+                    pass
+                else:
+                    internal_table = self._writable_inner(position)
+                    old_size = len(internal_table)
+                    internal_table[key2] = data
+                    self._stripe_entries[stripe] += len(internal_table) - old_size
+                    return
+        # A new key1 changes the primary table.
+        with self._resize_lock.writing():
+            self._insert(key1, key2, data)
+
+    def __delitem__(self, key: tuple[K1, K2]) -> None:
+        """
+        Delete a (key, value) pair, only locking the stripe of key1 when
+        key1 keeps other key2s.
+
+        :raises KeyError: when the key doesn't exist.
+        """
+        key1, key2 = key
+        with self._resize_lock.reading():
+            key1_hash = self._key1_hash(key1)
+            stripe = key1_hash % len(self._stripes)
+            with self._stripes[stripe].writing():
+                position, _ = self._linear_probe(key1, None, False, key1_hash)
+                internal_table = self.primary_table[position][1]
+                if len(internal_table) > 1:
+                    del self._writable_inner(position)[key2]
+                    self._stripe_entries[stripe] -= 1
+                    return
+        # Removing key1 repairs its primary cluster.
+        with self._resize_lock.writing():
+            super().__delitem__(key)
+
+    def iter_keys(self, key:K1|None=None, start:K2|None=None, stop:K2|None=None) -> Iterator[K1|K2]:
+        """
+        Iterate a copy of the keys, see DoubleKeyTable.iter_keys.
+
+        :complexity: O(number of keys copied), plus the cost of finding them.
+        """
+        if start is None and stop is None:
+            # DoubleKeyTable.iter_keys would call keys(), taking the locks a second time.
+            return iter(self.keys(key))
+        return iter(self._copy(key, super().iter_keys, key, start, stop))
+
+    def iter_values(self, key:K1|None=None) -> Iterator[V]:
+        """
+        Iterate a copy of the values, see DoubleKeyTable.iter_values.
+        """
+        return iter(self.values(key))
+
+    def keys(self, key:K1|None=None) -> list[K1|K2]:
+        """
+        A list of the keys, see DoubleKeyTable.keys.
+        """
+        return self._copy(key, super().keys, key)
+
+    def values(self, key:K1|None=None) -> list[V]:
+        """
+        A list of the values, see DoubleKeyTable.values.
+        """
+        return self._copy(key, super().values, key)
+
+    def items(self, key:K1|None=None) -> list[tuple[tuple[K1, K2], V]|tuple[K2, V]]:
+        """
+        A list of the items, see DoubleKeyTable.items.
+        """
+        return self._copy(key, super().items, key)
+
+    def min_key(self, key1: K1) -> K2:
+        with self._reading(key1):
+            return super().min_key(key1)
+
+    def max_key(self, key1: K1) -> K2:
+        with self._reading(key1):
+            return super().max_key(key1)
+
+    def _copy(self, key: K1|None, read: Callable[..., Iterable], *args) -> list:
+        """
+        List what read(*args) returns, with the stripe of key locked for
+        reading, or the whole table if key is None.
+        """
+        if key is None:
+            with self._reading_all():
+                return list(read(*args))
+        with self._reading(key):
+            return list(read(*args))
+
+    def snapshot(self) -> DoubleKeyTableSnapshot[K1, K2, V]:
+        """
+        See DoubleKeyTable.snapshot. Reading the snapshot takes no locks.
+
+        The primary table is copied straight away, as writers holding
+        different stripe locks could otherwise both copy it. Inner tables
+        are still copied by the first writer to change them, under the
+        stripe lock of their key1.
+
+        :complexity: O(self.table_size)
+        """
+        with self._resize_lock.writing():
+            snapshot = super().snapshot()
+            self._own_primary()
+            return snapshot
+
+    def __len__(self) -> int:
+        """
+        :complexity: O(number of stripes)
+        """
+        return self._num_entries + sum(self._stripe_entries)
+
+    def __getstate__(self) -> dict:
+        """
+        Locks cannot be pickled, so pickle the table without them.
+        """
+        with self._reading_all():
+            state = self.__dict__.copy()
+        state["_stripes"] = len(self._stripes)
+        del state["_resize_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._resize_lock = ReadWriteLock()
+        self._stripes = [ReadWriteLock() for _ in range(state["_stripes"])]
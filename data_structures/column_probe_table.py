@@ -0,0 +1,160 @@
+""" Column-oriented Hash Table
+
+Defines a LinearProbeTable that keeps keys, values and hashes in three
+parallel arrays rather than one (key, value, key_hash) tuple per slot.
+
+The columns are plain lists (as in InfiniteHashTable) rather than ArrayR:
+the ctypes array behind ArrayR records every object written to it in a
+per-array dictionary, which would cost more than the tuples saved.
+"""
+from __future__ import annotations
+
+from typing import TypeVar, Iterator
+from data_structures.hash_table import LinearProbeTable, ProbeStrategy, FullError, TOMBSTONE, _Tombstone
+
+K = TypeVar('K')
+V = TypeVar('V')
+
+
+class ColumnProbeTable(LinearProbeTable[K, V]):
+    """
+    Column Probe Table.
+
+    Behaves exactly like LinearProbeTable (same constructor, probe strategies,
+    tombstones and methods), but slot i is spread over three arrays:
+        - array[i]:       the key, or None / TOMBSTONE.
+        - value_array[i]: the value.
+        - hash_array[i]:  the stored key hash.
+
+    Inserting an item allocates no tuple, probes read keys and hashes straight
+    from their arrays, and iterating keys() walks a single array.
+    """
+
+    def _allocate(self, size: int) -> None:
+        """
+        Replace the storage with size empty slots.
+
+        :complexity: O(size)
+        """
+        self.array: list[K] = [None] * size
+        self.value_array: list[V] = [None] * size
+        self.hash_array: list[int] = [None] * size
+
+    def _entry(self, position: int) -> tuple[K, V, int]|_Tombstone|None:
+        """
+        The (key, value, key_hash) tuple at position, or None / TOMBSTONE.
+        """
+        key = self.array[position]
+        if key is None or key is TOMBSTONE:
+            return key
+        return (key, self.value_array[position], self.hash_array[position])
+
+    def _set_entry(self, position: int, entry: tuple[K, V, int]|_Tombstone|None) -> None:
+        """
+        Store a (key, value, key_hash) tuple, None or TOMBSTONE at position.
+        """
+        if entry is None or entry is TOMBSTONE:
+            self.array[position] = entry
+            # Don't keep the old value alive.
+            self.value_array[position] = None
+            self.hash_array[position] = None
+        else:
+            self._write(position, entry[0], entry[1], entry[2])
+
+    def _write(self, position: int, key: K, data: V, key_hash: int) -> None:
+        """
+        Store an item at position.
+        """
+        self.array[position] = key
+        self.value_array[position] = data
+        self.hash_array[position] = key_hash
+
+    def _key_at(self, position: int) -> K:
+        """
+        The key of the item at position.
+        """
+        return self.array[position]
+
+    def _value_at(self, position: int) -> V:
+        """
+        The value of the item at position.
+        """
+        return self.value_array[position]
+
+    def _entries(self) -> Iterator[tuple[K, V, int]]:
+        """
+        Yields the (key, value, key_hash) tuple of every item.
+
+        :complexity: O(N) where N is self.table_size.
+        """
+        for key, value, key_hash in zip(self.array, self.value_array, self.hash_array):
+            if key is not None and key is not TOMBSTONE:
+                yield (key, value, key_hash)
+
+    def _iter_keys(self) -> Iterator[K]:
+        for key in self.array:
+            if key is not None and key is not TOMBSTONE:
+                yield key
+
+    def _iter_values(self) -> Iterator[V]:
+        for key, value in zip(self.array, self.value_array):
+            if key is not None and key is not TOMBSTONE:
+                yield value
+
+    def _iter_items(self) -> Iterator[tuple[K, V]]:
+        for key, value in zip(self.array, self.value_array):
+            if key is not None and key is not TOMBSTONE:
+                yield (key, value)
+
+    def _linear_probe(self, key: K, is_insert: bool, key_hash: int|None = None) -> int:
+        """
+        Find the correct position for this key in the hash table using the
+        table's probe strategy. Same contract as LinearProbeTable._linear_probe.
+
+        :complexity best: O(hash(key)) first position is empty
+        :complexity worst: O(hash(key) + N*comp(K)) when we've searched the entire table
+                        where N is the tablesize
+        :raises KeyError: When the key is not in the table, but is_insert is False.
+        :raises FullError: When a table is full and cannot be inserted.
+        """
+        if key_hash is None:
+            key_hash = self._key_hash(key)
+        keys = self.array
+        hashes = self.hash_array
+        # Initial position
+        position = key_hash % self.table_size
+        step = self._probe_step(key_hash)
+        # Quadratic offsets 0, 1, 4, 9, ... are reached by steps 1, 3, 5, ...
+        step_increase = 2 if self.probing is ProbeStrategy.QUADRATIC else 0
+        robin_hood = self.probing is ProbeStrategy.ROBIN_HOOD
+        # First tombstone seen, which an insert can reuse once we know the key is absent.
+        reusable = None
+
+        for distance in range(self.table_size):
+            slot_key = keys[position]
+            if slot_key is None:
+                # Empty spot. Am I upserting or retrieving?
+                if is_insert:
+                    return position if reusable is None else reusable
+                else:
+                    raise KeyError(key)
+            elif slot_key is TOMBSTONE:
+                if reusable is None:
+                    reusable = position
+            elif hashes[position] == key_hash and slot_key == key:
+                return position
+            elif robin_hood and (position - hashes[position]) % self.table_size < distance:
+                # The key would have taken this slot had it been inserted.
+                if is_insert:
+                    return position
+                raise KeyError(key)
+            # Taken by something else. Time to probe.
+            position = (position + step) % self.table_size
+            step += step_increase
+
+        if is_insert:
+            if reusable is not None:
+                return reusable
+            raise FullError("Table is full!")
+        else:
+            raise KeyError(key)
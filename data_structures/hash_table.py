@@ -1,14 +1,19 @@
 """ Hash Table ADT
 
-Defines a Hash Table using Linear Probing for conflict resolution.
+Defines a Hash Table using open addressing for conflict resolution.
+Linear probing is the default, see ProbeStrategy for the alternatives.
 """
 from __future__ import annotations
 __author__ = 'Jackson Goerner'
 __since__ = '07/02/2023'
 
 
-from typing import TypeVar, Generic
+from enum import Enum, auto
+from typing import TypeVar, Generic, Iterable, Iterator
 from data_structures.referential_array import ArrayR
+from data_structures.table_sizes import DEFAULT_SIZES, has_size
+from data_structures.hash_table_views import KeysView, ValuesView, ItemsView
+from data_structures.hashers import Hasher, TableHash, DEFAULT_HASHER
 
 K = TypeVar('K')
 V = TypeVar('V')
@@ -17,32 +22,144 @@ class FullError(Exception):
     pass
 
 
+class _Tombstone:
+    """
+    Marks a slot whose item was deleted in tombstone mode.
+    Lookups probe past it, and inserts may reuse it.
+    """
+
+    def __repr__(self) -> str:
+        return "TOMBSTONE"
+
+    def __reduce__(self) -> str:
+        # Slots are compared with `is TOMBSTONE`, so unpickle as the same object.
+        return "TOMBSTONE"
+
+TOMBSTONE = _Tombstone()
+
+
+class ProbeStrategy(Enum):
+    """
+    How LinearProbeTable steps through slots after a collision.
+
+    - LINEAR:         home, home+1, home+2, ...
+    - QUADRATIC:      home, home+1, home+4, home+9, ...
+    - DOUBLE_HASHING: home, home+s, home+2s, ... with s derived from the key's
+                      hash and HASH_BASE.
+    - ROBIN_HOOD:     linear steps, but an insert takes the slot of any entry
+                      closer to its home than the new key would be, and
+                      deletes shift the following entries back.
+    """
+    LINEAR = auto()
+    QUADRATIC = auto()
+    DOUBLE_HASHING = auto()
+    ROBIN_HOOD = auto()
+
+
 class LinearProbeTable(Generic[K, V]):
     """
     Linear Probe Table.
 
+    Each slot stores a (key, value, key_hash) triple, where key_hash is the
+    table-independent `full_hash` of the key. Growing the table or repairing a
+    cluster only reduces the stored hash modulo the new size, and probes
+    compare hashes before keys. If `hash` is overwritten, the stored hash is
+    its result instead, which is only valid for the current table size.
+
+    By default deleting an item re-inserts the rest of its cluster. With
+    tombstones=True the slot is instead marked with TOMBSTONE, and the table
+    is compacted in a single pass once tombstones take up more than
+    max_tombstone_ratio of the slots. Keeping that ratio below 0.5 guarantees
+    some empty slots remain to end unsuccessful probes.
+
+    The table grows once more than half its slots are used, and shrinks down
+    the TABLE_SIZES ladder once fewer than MIN_LOAD_FACTOR of them are, to the
+    smallest size at most a quarter full. The gap between the two bounds stops
+    alternating inserts and deletes from resizing back and forth. The default
+    ladder has no largest size; a list passed as `sizes` is used as given.
+
+    With incremental=True, growing does not move every item at once. The old
+    array is kept next to the new one and each insert or delete moves the
+    next MIGRATION_STEP of its slots across; lookups check the new array,
+    then the old one. Anything needing every item in one place (iteration,
+    bulk updates, shrinking) finishes the move first. Only available while
+    `hash` isn't overwritten, as positions in the old array must be found
+    from the stored hashes.
+
+    The probe sequence is chosen with `probing` (see ProbeStrategy). Quadratic
+    and double hashing always delete with tombstones, as clusters are no
+    longer contiguous, while Robin Hood always uses backward-shift deletion.
+
     Type Arguments:
-        - K:    Key Type. In most cases should be string.
-                Otherwise `hash` should be overwritten.
+        - K:    Key Type. Strings, integers and tuples of them are hashed by the
+                default hasher. Otherwise pass a `hasher` (see Hasher), or
+                choose positions with a `table_hash` (see TableHash) or by
+                overwriting `hash`.
         - V:    Value Type.
 
     Unless stated otherwise, all methods have O(1) complexity.
     """
 
-    # No test case should exceed 1 million entries.
-    TABLE_SIZES = [5, 13, 29, 53, 97, 193, 389, 769, 1543, 3079, 6151, 12289, 24593, 49157, 98317, 196613, 393241, 786433, 1572869]
+    # Extended with larger primes when a table outgrows it, see PrimeSizes.
+    TABLE_SIZES = DEFAULT_SIZES
 
     HASH_BASE = 31
 
-    def __init__(self, sizes=None) -> None:
+    # Prime modulus keeping full hashes within a machine word.
+    HASH_MODULUS = 2147483647
+
+    MAX_TOMBSTONE_RATIO = 0.25
+
+    MIN_LOAD_FACTOR = 0.125
+
+    # Old slots moved per insert / delete during an incremental resize.
+    MIGRATION_STEP = 8
+
+    def __init__(self, sizes=None, tombstones: bool = False, max_tombstone_ratio: float|None = None,
+                 probing: ProbeStrategy = ProbeStrategy.LINEAR, hasher: Hasher|None = None,
+                 incremental: bool = False, table_hash: TableHash|None = None, capacity: int = 0) -> None:
         """
-        Initialise the Hash Table.
+        Initialise the Hash Table, starting at the smallest size that holds
+        `capacity` items without growing.
+
+        :raises ValueError: when asking for tombstones with Robin Hood probing.
         """
+        if tombstones and probing is ProbeStrategy.ROBIN_HOOD:
+            raise ValueError("Robin Hood probing deletes by backward shift, not tombstones.")
         if sizes is not None:
             self.TABLE_SIZES = sizes
         self.size_index = 0
-        self.array:ArrayR[tuple[K, V]] = ArrayR(self.TABLE_SIZES[self.size_index])
+        if capacity:
+            self.size_index = self._size_index_for(capacity)
+        self._allocate(self.TABLE_SIZES[self.size_index])
         self.count = 0
+        self.probing = probing
+        self.hasher = hasher if hasher is not None else DEFAULT_HASHER
+        self.table_hash = table_hash
+        self.use_tombstones = tombstones or probing in (ProbeStrategy.QUADRATIC, ProbeStrategy.DOUBLE_HASHING)
+        self.max_tombstone_ratio = max_tombstone_ratio if max_tombstone_ratio is not None else self.MAX_TOMBSTONE_RATIO
+        self.tombstone_count = 0
+        # Changed when an item is removed or the array reallocated, see TableView.
+        self._version = 0
+        self.incremental = incremental
+        # The previous array while an incremental resize is in progress, wrapped in a table.
+        self._old_table: LinearProbeTable[K, V]|None = None
+        self._migrate_position = 0
+        # Snapshot generation of the DoubleKeyTable it is an inner table of, see DoubleKeyTable._writable_inner.
+        self._generation = 0
+
+    @classmethod
+    def from_items(cls, items: Iterable[tuple[K, V]], sizes=None, **kwargs) -> LinearProbeTable[K, V]:
+        """
+        Build a table from (key, value) pairs, allocating the final array once.
+        Other keyword arguments are passed on to the constructor.
+
+        :complexity: See update.
+        """
+        items = list(items)
+        table = cls(sizes, capacity=len(items), **kwargs)
+        table.update(items)
+        return table
 
     def hash(self, key: K) -> int:
         """
@@ -50,77 +167,232 @@ class LinearProbeTable(Generic[K, V]):
 
         :complexity: O(len(key))
         """
+        if self.table_hash is not None:
+            return self.table_hash(key, self)
+        return self.full_hash(key) % self.table_size
+
+    def full_hash(self, key: K) -> int:
+        """
+        Hash a key independently of the table size, see Hasher.
 
-        value = 0
-        a = 31415
-        for char in key:
-            value = (ord(char) + a * value) % self.table_size
-            a = a * self.HASH_BASE % (self.table_size - 1)
-        return value
+        :complexity: O(len(key)) for strings and tuples, O(1) for integers.
+        """
+        return self.hasher.full_hash(key)
+
+    def _key_hash(self, key: K) -> int:
+        """
+        The hash stored alongside key: `full_hash` normally, or the
+        position given by `table_hash` or an overwritten `hash`.
+
+        :complexity: O(hash(key))
+        """
+        if self.table_hash is not None:
+            return self.table_hash(key, self)
+        if self._has_portable_hashes():
+            return self.full_hash(key)
+        return self.hash(key)
+
+    def _has_portable_hashes(self) -> bool:
+        """
+        Whether stored hashes survive a change of table size, which is only
+        the case without a `table_hash` while `hash` hasn't been overwritten.
+        """
+        return self.table_hash is None and getattr(self.hash, "__func__", None) is LinearProbeTable.hash
 
     @property
     def table_size(self) -> int:
         return len(self.array)
 
+    # Slot storage. Every slot of `array` holds None, TOMBSTONE or a
+    # (key, value, key_hash) tuple. Subclasses storing slots differently
+    # override these methods, along with _linear_probe, _entries, keys and values.
+
+    def _allocate(self, size: int) -> None:
+        """
+        Replace the storage with size empty slots.
+
+        :complexity: O(size)
+        """
+        self.array:ArrayR[tuple[K, V, int]] = ArrayR(size)
+
+    def _entry(self, position: int) -> tuple[K, V, int]|_Tombstone|None:
+        """
+        The (key, value, key_hash) tuple at position, or None / TOMBSTONE.
+        """
+        return self.array[position]
+
+    def _set_entry(self, position: int, entry: tuple[K, V, int]|_Tombstone|None) -> None:
+        """
+        Store a (key, value, key_hash) tuple, None or TOMBSTONE at position.
+        """
+        self.array[position] = entry
+
+    def _write(self, position: int, key: K, data: V, key_hash: int) -> None:
+        """
+        Store an item at position.
+        """
+        self.array[position] = (key, data, key_hash)
+
+    def _key_at(self, position: int) -> K:
+        """
+        The key of the item at position.
+        """
+        return self.array[position][0]
+
+    def _value_at(self, position: int) -> V:
+        """
+        The value of the item at position.
+        """
+        return self.array[position][1]
+
+    def _entries(self) -> Iterator[tuple[K, V, int]]:
+        """
+        Yields the (key, value, key_hash) tuple of every item.
+
+        :complexity: O(N) where N is self.table_size.
+        """
+        for entry in self.array:
+            if entry is not None and entry is not TOMBSTONE:
+                yield entry
+
     def __len__(self) -> int:
         """
         Returns number of elements in the hash table
         """
+        if self._old_table is not None:
+            return self.count + self._old_table.count
         return self.count
 
-    def _linear_probe(self, key: K, is_insert: bool) -> int:
+    def _probe_step(self, key_hash: int) -> int:
+        """
+        Distance between the first two slots of the probe sequence.
+
+        :complexity: O(1)
         """
-        Find the correct position for this key in the hash table using linear probing.
+        if self.probing is ProbeStrategy.DOUBLE_HASHING:
+            # Never a multiple of a prime table size, so every slot is reached.
+            return (self.HASH_BASE - key_hash % self.HASH_BASE) % self.table_size or 1
+        return 1
+
+    def _linear_probe(self, key: K, is_insert: bool, key_hash: int|None = None) -> int:
+        """
+        Find the correct position for this key in the hash table using the
+        table's probe strategy (linear probing unless stated otherwise).
+
+        key_hash can be given when already known (see _key_hash) to skip hashing the key.
+        With Robin Hood probing, an insert may return the slot of another entry,
+        which _place then shifts along.
         :complexity best: O(hash(key)) first position is empty
         :complexity worst: O(hash(key) + N*comp(K)) when we've searched the entire table
                         where N is the tablesize
         :raises KeyError: When the key is not in the table, but is_insert is False.
         :raises FullError: When a table is full and cannot be inserted.
         """
+        if key_hash is None:
+            key_hash = self._key_hash(key)
         # Initial position
-        position = self.hash(key)
-
-        for _ in range(self.table_size):
-            if self.array[position] is None:
+        position = key_hash % self.table_size
+        step = self._probe_step(key_hash)
+        # Quadratic offsets 0, 1, 4, 9, ... are reached by steps 1, 3, 5, ...
+        step_increase = 2 if self.probing is ProbeStrategy.QUADRATIC else 0
+        robin_hood = self.probing is ProbeStrategy.ROBIN_HOOD
+        # First tombstone seen, which an insert can reuse once we know the key is absent.
+        reusable = None
+
+        for distance in range(self.table_size):
+            entry = self.array[position]
+            if entry is None:
                 # Empty spot. Am I upserting or retrieving?
                 if is_insert:
-                    return position
+                    return position if reusable is None else reusable
                 else:
                     raise KeyError(key)
-            elif self.array[position][0] == key:
+            elif entry is TOMBSTONE:
+                if reusable is None:
+                    reusable = position
+            elif entry[2] == key_hash and entry[0] == key:
                 return position
-            else:
-                # Taken by something else. Time to linear probe.
-                position = (position + 1) % self.table_size
+            elif robin_hood and (position - entry[2]) % self.table_size < distance:
+                # This entry is closer to its home than the key would be here,
+                # so the key would have taken this slot had it been inserted.
+                if is_insert:
+                    return position
+                raise KeyError(key)
+            # Taken by something else. Time to probe.
+            position = (position + step) % self.table_size
+            step += step_increase
 
         if is_insert:
+            if reusable is not None:
+                return reusable
             raise FullError("Table is full!")
         else:
             raise KeyError(key)
 
-    def keys(self) -> list[K]:
+    def keys(self) -> KeysView[K]:
         """
-        Returns all keys in the hash table.
+        Returns a live view of all keys in the hash table.
 
-        :complexity: O(N) where N is self.table_size.
+        :complexity: O(1), iterating it is O(N) where N is self.table_size.
         """
-        res = []
-        for x in range(self.table_size):
-            if self.array[x] is not None:
-                res.append(self.array[x][0])
-        return res
+        return KeysView(self)
 
-    def values(self) -> list[V]:
+    def values(self) -> ValuesView[V]:
         """
-        Returns all values in the hash table.
+        Returns a live view of all values in the hash table.
 
-        :complexity: O(N) where N is self.table_size.
+        :complexity: O(1), iterating it is O(N) where N is self.table_size.
+        """
+        return ValuesView(self)
+
+    def items(self) -> ItemsView[tuple[K, V]]:
+        """
+        Returns a live view of all (key, value) pairs in the hash table.
+
+        :complexity: O(1), iterating it is O(N) where N is self.table_size.
+        """
+        return ItemsView(self)
+
+    def _iter_keys(self) -> Iterator[K]:
+        for entry in self._entries():
+            yield entry[0]
+
+    def _iter_values(self) -> Iterator[V]:
+        for entry in self._entries():
+            yield entry[1]
+
+    def _iter_items(self) -> Iterator[tuple[K, V]]:
+        for entry in self._entries():
+            yield (entry[0], entry[1])
+
+    def _read_items(self) -> Iterator[tuple[K, V]]:
         """
-        res = []
-        for x in range(self.table_size):
-            if self.array[x] is not None:
-                res.append(self.array[x][1])
-        return res
+        Like _iter_items, but reads the old array of an incremental resize
+        where it is rather than finishing the resize first, so the table is
+        never changed. For tables that may be shared with a snapshot.
+
+        :complexity: O(N) where N is self.table_size plus the size of any old array.
+        """
+        yield from self._iter_items()
+        if self._old_table is not None:
+            for entry in self._old_table._entries():
+                yield (entry[0], entry[1])
+
+    def copy(self) -> LinearProbeTable[K, V]:
+        """
+        A table with the same items that can be changed independently of this
+        one. Keys and values themselves are shared, and no key is hashed again.
+
+        :complexity: O(N) where N is self.table_size plus the size of any old array.
+        """
+        table = object.__new__(type(self))
+        table.__dict__.update(self.__dict__)
+        table._allocate(self.table_size)
+        for position in range(self.table_size):
+            table._set_entry(position, self._entry(position))
+        if self._old_table is not None:
+            table._old_table = self._old_table.copy()
+        return table
 
     def __contains__(self, key: K) -> bool:
         """
@@ -142,8 +414,16 @@ class LinearProbeTable(Generic[K, V]):
         :complexity: See linear probe.
         :raises KeyError: when the key doesn't exist.
         """
-        position = self._linear_probe(key, False)
-        return self.array[position][1]
+        if self._old_table is None:
+            position = self._linear_probe(key, False)
+            return self._value_at(position)
+        key_hash = self._key_hash(key)
+        try:
+            position = self._linear_probe(key, False, key_hash)
+        except KeyError:
+            old = self._old_table
+            return old._value_at(old._linear_probe(key, False, key_hash))
+        return self._value_at(position)
 
     def __setitem__(self, key: K, data: V) -> None:
         """
@@ -153,43 +433,233 @@ class LinearProbeTable(Generic[K, V]):
         :raises FullError: when the table cannot be resized further.
         """
 
-        position = self._linear_probe(key, True)
+        self._insert(key, data)
 
-        if self.array[position] is None:
-            self.count += 1
+    def _insert(self, key: K, data: V, key_hash: int|None = None) -> None:
+        """
+        __setitem__ for a key whose hash may already be known.
 
-        self.array[position] = (key, data)
+        :complexity: See linear probe.
+        """
+        if self._old_table is not None:
+            if key_hash is None:
+                key_hash = self._key_hash(key)
+            self._take_old(key, key_hash)
+            self._migrate(self.MIGRATION_STEP)
+        self._place(key, data, key_hash)
 
         if len(self) > self.table_size / 2:
             self._rehash()
 
+    def update(self, items: Iterable[tuple[K, V]]) -> None:
+        """
+        Insert many (key, value) pairs at once.
+
+        Rather than growing one rung at a time as __setitem__ does, the table
+        jumps straight to the smallest size that keeps the load factor under
+        0.5 for every item, so existing entries are moved at most once and
+        each new item is probed exactly once.
+
+        :complexity best: O(N*hash(K)) No probing.
+        :complexity worst: O(N*hash(K) + N^2*comp(K)) Lots of probing.
+        Where N is len(self) + len(items)
+        """
+        items = list(items)
+        self._finish_resize()
+        size_index = self._size_index_for(self.count + len(items))
+        if size_index != self.size_index or self.count + self.tombstone_count + len(items) > self.table_size / 2:
+            self._rebuild(size_index)
+        for key, data in items:
+            self._place(key, data)
+
+    def _shrunk_size_index(self) -> int:
+        """
+        Size index to move down to once the load factor drops below
+        MIN_LOAD_FACTOR: the smallest one at most a quarter full.
+        Otherwise the current size index.
+
+        :complexity: O(len(TABLE_SIZES))
+        """
+        size_index = self.size_index
+        if len(self) < self.MIN_LOAD_FACTOR * self.table_size:
+            while size_index > 0 and len(self) <= self.TABLE_SIZES[size_index - 1] / 4:
+                size_index -= 1
+        return size_index
+
+    def _size_index_for(self, n: int) -> int:
+        """
+        Smallest size index (no smaller than the current one) that can hold
+        n items without passing the load factor. Falls back to the largest size.
+
+        :complexity: O(len(TABLE_SIZES))
+        """
+        size_index = self.size_index
+        while n > self.TABLE_SIZES[size_index] / 2:
+            if not has_size(self.TABLE_SIZES, size_index + 1):
+                break
+            size_index += 1
+        return size_index
+
+    def _place(self, key: K, data: V, key_hash: int|None = None) -> None:
+        """
+        Write a (key, value) pair into its probed position without checking the load factor.
+
+        :complexity: See linear probe.
+        :raises FullError: when the table is full.
+        """
+        if key_hash is None:
+            key_hash = self._key_hash(key)
+        position = self._linear_probe(key, True, key_hash)
+        occupant = self.array[position]
+
+        if occupant is None:
+            self.count += 1
+        elif occupant is TOMBSTONE:
+            self.count += 1
+            self.tombstone_count -= 1
+        elif self._key_at(position) != key:
+            # Robin Hood: take the slot and push the richer entries along.
+            if self.count == self.table_size:
+                raise FullError("Table is full!")
+            self.count += 1
+            self._shift_forward(position, self._entry(position))
+
+        self._write(position, key, data, key_hash)
+
+    def _shift_forward(self, position: int, carry: tuple[K, V, int]) -> None:
+        """
+        Robin Hood insertion of an entry displaced from position: walk forward,
+        swapping it with any entry closer to its home, until a slot is empty.
+
+        :complexity: O(N) where N is the length of the cluster after position.
+        """
+        distance = (position - carry[2]) % self.table_size
+        while True:
+            position = (position + 1) % self.table_size
+            distance += 1
+            entry = self._entry(position)
+            if entry is None:
+                self._set_entry(position, carry)
+                return
+            entry_distance = (position - entry[2]) % self.table_size
+            if entry_distance < distance:
+                self._set_entry(position, carry)
+                carry, distance = entry, entry_distance
+
+    def probe_length(self, key: K) -> int:
+        """
+        Number of slots a successful lookup of key examines, in the old array
+        if key has not been moved yet by an incremental resize.
+
+        :complexity: See linear probe.
+        :raises KeyError: when the key doesn't exist.
+        """
+        key_hash = self._key_hash(key)
+        try:
+            target = self._linear_probe(key, False, key_hash)
+        except KeyError:
+            if self._old_table is None:
+                raise
+            return self._old_table.probe_length(key)
+        position = key_hash % self.table_size
+        step = self._probe_step(key_hash)
+        length = 1
+        while position != target:
+            position = (position + step) % self.table_size
+            if self.probing is ProbeStrategy.QUADRATIC:
+                step += 2
+            length += 1
+        return length
+
+    def _items_with_hashes(self) -> Iterator[tuple[K, V, int|None]]:
+        """
+        Yields (key, value, key_hash) for every item, where key_hash is None
+        if it would not be valid in a table of a different size.
+
+        :complexity: O(N) where N is self.table_size.
+        """
+        self._finish_resize()
+        portable = self._has_portable_hashes()
+        for entry in self._entries():
+            yield entry if portable else (entry[0], entry[1], None)
+
     def __delitem__(self, key: K) -> None:
         """
         Deletes a (key, value) pair in our hash table.
 
         :complexity best: O(hash(key)) deleting item is not probed and in correct spot.
         :complexity worst: O(N*hash(key)+N^2*comp(K)) deleting item is midway through large chain.
+                           In tombstone mode, O(hash(key) + N*comp(K)) plus an occasional compaction.
+                           Either way, plus an occasional shrink.
         :raises KeyError: when the key doesn't exist.
         """
-        position = self._linear_probe(key, False)
-        # Remove the element
-        self.array[position] = None
+        key_hash = self._key_hash(key)
+        if self._old_table is not None:
+            self._migrate(self.MIGRATION_STEP)
+            if self._old_table is not None and self._take_old(key, key_hash) is not None:
+                self._version += 1
+                return
+        position = self._linear_probe(key, False, key_hash)
         self.count -= 1
+        self._version += 1
+        if self.probing is ProbeStrategy.ROBIN_HOOD:
+            self._shift_back(position)
+        elif self.use_tombstones:
+            if self.probing is ProbeStrategy.LINEAR and self.array[(position + 1) % self.table_size] is None:
+                # Nothing is probed past this slot, so it can simply be emptied.
+                self._set_entry(position, None)
+            else:
+                self._set_entry(position, TOMBSTONE)
+                self.tombstone_count += 1
+        else:
+            self._repair_cluster(position)
+
+        size_index = self._shrunk_size_index()
+        if size_index != self.size_index:
+            self._rebuild(size_index)
+        elif self.tombstone_count > self.max_tombstone_ratio * self.table_size:
+            self._compact()
+
+    def _repair_cluster(self, position: int) -> None:
+        """
+        Empty position, then re-insert the rest of its cluster so no probe stops early.
+
+        :complexity best: O(1) position ends its cluster.
+        :complexity worst: O(N^2*comp(K)) where N is the length of the cluster.
+        """
+        # Remove the element
+        self._set_entry(position, None)
         # Start moving over the cluster
         position = (position + 1) % self.table_size
         while self.array[position] is not None:
-            key2, value = self.array[position]
-            self.array[position] = None
-            # Reinsert.
-            newpos = self._linear_probe(key2, True)
-            self.array[newpos] = (key2, value)
+            entry = self._entry(position)
+            self._set_entry(position, None)
+            # Reinsert, reusing the stored hash as the table size hasn't changed.
+            newpos = self._linear_probe(entry[0], True, entry[2])
+            self._set_entry(newpos, entry)
             position = (position + 1) % self.table_size
 
+    def _shift_back(self, position: int) -> None:
+        """
+        Robin Hood backward-shift deletion: empty position, then move each
+        following entry that isn't at its home back by one slot.
+
+        :complexity: O(N) where N is the length of the cluster after position.
+        """
+        following = (position + 1) % self.table_size
+        entry = self._entry(following)
+        while entry is not None and (following - entry[2]) % self.table_size != 0:
+            self._set_entry(position, entry)
+            position = following
+            following = (following + 1) % self.table_size
+            entry = self._entry(following)
+        self._set_entry(position, None)
+
     def is_empty(self) -> bool:
-        return self.count == 0
+        return len(self) == 0
 
     def is_full(self) -> bool:
-        return self.count == self.table_size
+        return len(self) == self.table_size
 
     def _rehash(self) -> None:
         """
@@ -199,17 +669,114 @@ class LinearProbeTable(Generic[K, V]):
         :complexity worst: O(N*hash(K) + N^2*comp(K)) Lots of probing.
         Where N is len(self)
         """
-        old_array = self.array
-        self.size_index += 1
-        if self.size_index == len(self.TABLE_SIZES):
+        self._finish_resize()
+        if not has_size(self.TABLE_SIZES, self.size_index + 1):
             # Cannot be resized further.
             return
-        self.array = ArrayR(self.TABLE_SIZES[self.size_index])
+        if self.incremental and self._has_portable_hashes():
+            self._start_resize(self.size_index + 1)
+        else:
+            self._rebuild(self.size_index + 1)
+
+    def _start_resize(self, size_index: int) -> None:
+        """
+        Begin an incremental resize: keep the current array aside as
+        _old_table and continue with an empty array of size TABLE_SIZES[size_index].
+
+        :complexity: O(TABLE_SIZES[size_index]) to allocate the new array.
+        """
+        old = object.__new__(type(self))
+        old.__dict__.update(self.__dict__)
+        # Moved items leave tombstones behind, so the rest can still be found.
+        old.use_tombstones = True
+        self._old_table = old
+        self._migrate_position = 0
+        self._version += 1
+        self.size_index = size_index
+        self._allocate(self.TABLE_SIZES[self.size_index])
+        self.count = 0
+        self.tombstone_count = 0
+
+    def _migrate(self, steps: int) -> None:
+        """
+        Move the items in the next `steps` slots of the old array into the
+        current one, ending the incremental resize once all slots are done.
+
+        :complexity: O(steps * hash(K)) with no probing, see _place.
+        """
+        old = self._old_table
+        end = min(self._migrate_position + steps, old.table_size)
+        for position in range(self._migrate_position, end):
+            entry = old._entry(position)
+            if entry is not None and entry is not TOMBSTONE:
+                old._set_entry(position, TOMBSTONE)
+                old.count -= 1
+                self._place(entry[0], entry[1], entry[2])
+        self._migrate_position = end
+        if end == old.table_size:
+            self._old_table = None
+
+    def _take_old(self, key: K, key_hash: int) -> tuple[K, V, int]|None:
+        """
+        Remove key from the old array of an incremental resize and return its
+        (key, value, key_hash) entry, or None if it isn't there.
+
+        :complexity: See linear probe.
+        """
+        old = self._old_table
+        try:
+            position = old._linear_probe(key, False, key_hash)
+        except KeyError:
+            return None
+        entry = old._entry(position)
+        old._set_entry(position, TOMBSTONE)
+        old.count -= 1
+        return entry
+
+    def _adopt(self, key: K, key_hash: int) -> None:
+        """
+        Move key from the old array of an incremental resize into the current
+        one, if it is there, so that _linear_probe finds it. For callers
+        working with positions rather than __getitem__.
+
+        :complexity: See linear probe.
+        """
+        if self._old_table is not None:
+            entry = self._take_old(key, key_hash)
+            if entry is not None:
+                self._place(entry[0], entry[1], entry[2])
+
+    def _finish_resize(self) -> None:
+        """
+        Complete any incremental resize in progress.
+
+        :complexity: O(N*hash(K)) where N is the size of the old array, see _migrate.
+        """
+        if self._old_table is not None:
+            self._migrate(self._old_table.table_size)
+
+    def _compact(self) -> None:
+        """
+        Clear out all tombstones by rebuilding the table at its current size.
+
+        :complexity: See _rehash.
+        """
+        self._rebuild(self.size_index)
+
+    def _rebuild(self, size_index: int) -> None:
+        """
+        Allocate an array of size TABLE_SIZES[size_index] and move every item into it.
+
+        :complexity: See _rehash.
+        """
+        old_items = list(self._items_with_hashes())
+        self._version += 1
+        self.size_index = size_index
+        self._allocate(self.TABLE_SIZES[self.size_index])
         self.count = 0
-        for item in old_array:
-            if item is not None:
-                key, value = item
-                self[key] = value
+        self.tombstone_count = 0
+        for key, value, key_hash in old_items:
+            self._place(key, value, key_hash)
 
     def __str__(self) -> str:
         """
@@ -218,8 +785,6 @@ class LinearProbeTable(Generic[K, V]):
         :complexity: O(N * (str(key) + str(value))) where N is the table size
         """
         result = ""
-        for item in self.array:
-            if item is not None:
-                (key, value) = item
-                result += "(" + str(key) + "," + str(value) + ")\n"
+        for (key, value) in self.items():
+            result += "(" + str(key) + "," + str(value) + ")\n"
         return result
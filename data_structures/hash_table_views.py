@@ -0,0 +1,113 @@
+""" Hash Table Views
+
+Live, read-only views over the keys, values and items of a hash table,
+returned by keys(), values() and items(). Nothing is copied: each view reads
+the table's slots as it is iterated, so it always reflects the table's
+current contents.
+
+A table supports views by providing `_iter_keys`, `_iter_values` and
+`_iter_items` generators, a `_version` counter, which must change
+whenever an item is removed or the slots are reallocated, and
+`_finish_resize`, which completes any incremental resize so that every
+item is in the current slots.
+"""
+from __future__ import annotations
+
+from typing import Generic, TypeVar, Iterator, Any
+
+T = TypeVar('T')
+
+
+class TableView(Generic[T]):
+    """
+    Base class for the views.
+
+    Adding or removing keys while a view is being iterated (changing the value
+    of an existing key is fine) makes the iteration raise RuntimeError, as
+    the remaining slots may have moved.
+    """
+
+    def __init__(self, table: Any) -> None:
+        self._table = table
+
+    def _source(self) -> Iterator[T]:
+        raise NotImplementedError()
+
+    def _state(self) -> tuple[int, int]:
+        """
+        Changes whenever a key is added (the length changes) or removed (the version changes).
+        """
+        return (self._table._version, len(self._table))
+
+    def __iter__(self) -> Iterator[T]:
+        """
+        :complexity: O(N) to run to completion, where N is the table size.
+        :raises RuntimeError: when the table gains or loses keys during iteration.
+        """
+        self._table._finish_resize()
+        state = self._state()
+        for item in self._source():
+            if self._state() != state:
+                raise RuntimeError(f"{type(self._table).__name__} changed size during iteration")
+            yield item
+        if self._state() != state:
+            raise RuntimeError(f"{type(self._table).__name__} changed size during iteration")
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self)!r})"
+
+
+class KeysView(TableView[T]):
+    """
+    View over the keys of a table.
+    """
+
+    def _source(self) -> Iterator[T]:
+        return self._table._iter_keys()
+
+    def __contains__(self, key: object) -> bool:
+        """
+        :complexity: See the table's __contains__.
+        """
+        return key in self._table
+
+
+class ValuesView(TableView[T]):
+    """
+    View over the values of a table.
+    """
+
+    def _source(self) -> Iterator[T]:
+        return self._table._iter_values()
+
+    def __contains__(self, value: object) -> bool:
+        """
+        :complexity: O(N) where N is the table size.
+        """
+        for item in self:
+            if item is value or item == value:
+                return True
+        return False
+
+
+class ItemsView(TableView[T]):
+    """
+    View over the (key, value) pairs of a table.
+    """
+
+    def _source(self) -> Iterator[T]:
+        return self._table._iter_items()
+
+    def __contains__(self, item: object) -> bool:
+        """
+        :complexity: See the table's __getitem__.
+        """
+        try:
+            key, value = item
+            found = self._table[key]
+        except (KeyError, TypeError, ValueError):
+            return False
+        return found is value or found == value
@@ -0,0 +1,146 @@
+""" Hashers
+
+Defines the Hasher ADT used by LinearProbeTable, DoubleKeyTable and
+InfiniteHashTable to turn keys into integers, and DefaultHasher, which
+handles str, int and tuple keys directly so that tables with integer keys
+(such as difficulty levels) need no custom hash function.
+
+Also defines TableHash, for tables that are told positions directly rather
+than full hashes, such as the inner tables of a DoubleKeyTable.
+"""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Any
+
+
+class Hasher(ABC):
+    """
+    Abstract Hasher class.
+
+    A table asks its hasher for a key's full hash, independent of the table
+    size, and reduces it to a position itself.
+    """
+
+    @abstractmethod
+    def full_hash(self, key: Any) -> int:
+        """ Hash a key to a non-negative integer, independently of any table size. """
+        pass
+
+    @abstractmethod
+    def level_hash(self, key: Any, level: int, width: int) -> int:
+        """
+        Position of key in the level-th table of an InfiniteHashTable: a
+        number below width, or width itself once the key has no symbol at
+        that level.
+        """
+        pass
+
+
+class DefaultHasher(Hasher):
+    """
+    Hashes strings with the polynomial hash the tables have always used,
+    integers as themselves, and tuples by combining the hashes of their
+    items. Any other key falls back to Python's hash().
+
+    For InfiniteHashTable, a string's symbols are its characters, an integer's
+    are the digits of its decimal form and a tuple's are its items.
+    """
+
+    HASH_BASE = 31
+
+    # Prime modulus keeping full hashes within a machine word.
+    HASH_MODULUS = 2147483647
+
+    def full_hash(self, key: Any) -> int:
+        """
+        :complexity: O(len(key)) for strings and tuples, O(1) for integers.
+        """
+        kind = type(key)
+        if kind is str:
+            return self._hash_str(key)
+        if kind is int:
+            return key % self.HASH_MODULUS
+        if kind is tuple:
+            return self._hash_tuple(key)
+        # Subclasses of the fast path types hash like their base type.
+        if isinstance(key, str):
+            return self._hash_str(key)
+        if isinstance(key, int):
+            return int(key) % self.HASH_MODULUS
+        if isinstance(key, tuple):
+            return self._hash_tuple(key)
+        return hash(key) % self.HASH_MODULUS
+
+    def _hash_str(self, key: str) -> int:
+        """
+        :complexity: O(len(key))
+        """
+        value = 0
+        a = 31415
+        modulus = self.HASH_MODULUS
+        base = self.HASH_BASE
+        for char in key:
+            value = (ord(char) + a * value) % modulus
+            a = a * base % modulus
+        return value
+
+    def _hash_tuple(self, key: tuple) -> int:
+        """
+        :complexity: O(sum of the hash complexities of the items)
+        """
+        value = len(key)
+        for item in key:
+            value = (value * self.HASH_BASE + self.full_hash(item)) % self.HASH_MODULUS
+        return value
+
+    def level_hash(self, key: Any, level: int, width: int) -> int:
+        """
+        :complexity: O(1) for strings, O(len(key)) for integers, hash(key[level]) for tuples.
+        """
+        if isinstance(key, int):
+            key = str(key)
+        if level >= len(key):
+            return width
+        if isinstance(key, str):
+            return ord(key[level]) % width
+        return self.full_hash(key[level]) % width
+
+    def __reduce__(self) -> str|tuple:
+        # Unpickle the shared default as itself, so `is DEFAULT_HASHER` checks still hold.
+        return "DEFAULT_HASHER" if self is DEFAULT_HASHER else super().__reduce__()
+
+
+DEFAULT_HASHER = DefaultHasher()
+
+
+class TableHash(ABC):
+    """
+    Abstract TableHash class.
+
+    Maps a key straight to a position in the given table, for tables whose
+    positions cannot be derived from a full hash. A single instance can be
+    shared by many tables, as the table is passed in on every call.
+    """
+
+    @abstractmethod
+    def __call__(self, key: Any, table: Any) -> int:
+        """ Position of key in table, below table.table_size. """
+        pass
+
+
+class SecondKeyHash(TableHash):
+    """
+    Positions in the inner tables of a DoubleKeyTable whose hash2 has been
+    overwritten: calls owner.hash2(key, table). One instance is shared by
+    all inner tables of owner, and pickles along with it.
+    """
+
+    def __init__(self, owner: Any) -> None:
+        self.owner = owner
+
+    def __call__(self, key: Any, table: Any) -> int:
+        """
+        :complexity: O(hash2(key))
+        """
+        return self.owner.hash2(key, table)
@@ -0,0 +1,113 @@
+""" Ordered Hash Table
+
+Defines a LinearProbeTable that also keeps its keys in a sorted list, so
+that they can be listed in order, or between two bounds, without sorting
+the table each time. DoubleKeyTable uses it for its inner tables when
+created with ordered=True.
+"""
+from __future__ import annotations
+
+from typing import TypeVar, Iterable, Iterator
+from algorithms.binary_search import binary_search
+from data_structures.hash_table import LinearProbeTable
+
+K = TypeVar('K')
+V = TypeVar('V')
+
+
+class OrderedProbeTable(LinearProbeTable[K, V]):
+    """
+    Ordered Probe Table.
+
+    Behaves like LinearProbeTable (same constructor and methods), but keys(),
+    values() and items() list the items in ascending key order, and keys can
+    be read between two bounds with key_range. Keys must be comparable.
+
+    Lookups don't touch the index. Adding or removing a key finds its place
+    with a binary search, then shifts the rest of the list along by one,
+    which is O(N) but a single memory move.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.sorted_keys: list[K] = []
+
+    def _insert(self, key: K, data: V, key_hash: int|None = None) -> None:
+        """
+        :complexity: See LinearProbeTable.__setitem__, plus O(log(N) * comp(K) + N) for a new key.
+        """
+        old_len = len(self)
+        super()._insert(key, data, key_hash)
+        if len(self) > old_len:
+            self.sorted_keys.insert(binary_search(self.sorted_keys, key), key)
+
+    def update(self, items: Iterable[tuple[K, V]]) -> None:
+        """
+        :complexity: See LinearProbeTable.update, plus O(N*log(N)*comp(K)) to sort the keys.
+        """
+        super().update(items)
+        # update finishes any incremental resize, so every key is in the array.
+        self.sorted_keys = sorted(entry[0] for entry in self._entries())
+
+    def __delitem__(self, key: K) -> None:
+        """
+        :complexity: See LinearProbeTable.__delitem__, plus O(log(N) * comp(K) + N).
+        """
+        super().__delitem__(key)
+        del self.sorted_keys[binary_search(self.sorted_keys, key)]
+
+    def key_range(self, start: K|None = None, stop: K|None = None) -> Iterator[K]:
+        """
+        Iterate the keys from start (inclusive) up to stop (exclusive) in
+        ascending order. Either bound can be left out.
+
+        :complexity: O(log(N) * comp(K)) to find the bounds, then O(1) per key.
+        """
+        keys = self.sorted_keys
+        lo = 0 if start is None else binary_search(keys, start)
+        hi = len(keys) if stop is None else binary_search(keys, stop)
+        for i in range(lo, hi):
+            yield keys[i]
+
+    def min_key(self) -> K:
+        """
+        The smallest key.
+
+        :raises KeyError: when the table is empty.
+        """
+        if not self.sorted_keys:
+            raise KeyError("min_key of an empty table")
+        return self.sorted_keys[0]
+
+    def max_key(self) -> K:
+        """
+        The largest key.
+
+        :raises KeyError: when the table is empty.
+        """
+        if not self.sorted_keys:
+            raise KeyError("max_key of an empty table")
+        return self.sorted_keys[-1]
+
+    def copy(self) -> OrderedProbeTable[K, V]:
+        """
+        :complexity: See LinearProbeTable.copy.
+        """
+        table = super().copy()
+        table.sorted_keys = list(self.sorted_keys)
+        return table
+
+    def _read_items(self) -> Iterator[tuple[K, V]]:
+        # The index holds every key, and lookups read any old array without changing it.
+        return self._iter_items()
+
+    def _iter_keys(self) -> Iterator[K]:
+        yield from self.sorted_keys
+
+    def _iter_values(self) -> Iterator[V]:
+        for key in self.sorted_keys:
+            yield self[key]
+
+    def _iter_items(self) -> Iterator[tuple[K, V]]:
+        for key in self.sorted_keys:
+            yield (key, self[key])
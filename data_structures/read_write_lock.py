@@ -0,0 +1,82 @@
+""" Read-Write Lock
+
+Defines ReadWriteLock, a lock that any number of readers can hold at once,
+or a single writer on its own. Used by ConcurrentDoubleKeyTable.
+"""
+from __future__ import annotations
+
+from threading import Condition, Lock
+from typing import Callable
+
+
+class ReadWriteLock:
+    """
+    Read-Write Lock.
+
+    Readers only wait for writers, never for each other. Once a writer is
+    waiting, new readers wait behind it, so a steady stream of readers can't
+    starve writers. Not reentrant: a thread must not acquire it again while
+    holding it.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._condition = Condition(self._lock)
+        self._readers = 0
+        self._writing = False
+        self._waiting_writers = 0
+        self._as_reader = _Held(self.acquire_read, self.release_read)
+        self._as_writer = _Held(self.acquire_write, self.release_write)
+
+    def acquire_read(self) -> None:
+        # Holding the plain lock is the same as holding the condition, and cheaper.
+        with self._lock:
+            while self._writing or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+
+    def release_read(self) -> None:
+        with self._lock:
+            self._readers -= 1
+            if self._readers == 0 and self._waiting_writers:
+                self._condition.notify_all()
+
+    def acquire_write(self) -> None:
+        with self._lock:
+            self._waiting_writers += 1
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writing = True
+
+    def release_write(self) -> None:
+        with self._lock:
+            self._writing = False
+            self._condition.notify_all()
+
+    def reading(self) -> _Held:
+        """ Hold the lock as a reader for the duration of a with block. """
+        return self._as_reader
+
+    def writing(self) -> _Held:
+        """ Hold the lock as the writer for the duration of a with block. """
+        return self._as_writer
+
+
+class _Held:
+    """
+    Context manager calling acquire on entry and release on exit. Cheaper than
+    a contextlib.contextmanager generator, and can be reused.
+    """
+
+    __slots__ = ("_acquire", "_release")
+
+    def __init__(self, acquire: Callable[[], None], release: Callable[[], None]) -> None:
+        self._acquire = acquire
+        self._release = release
+
+    def __enter__(self) -> None:
+        self._acquire()
+
+    def __exit__(self, *exc_info) -> None:
+        self._release()
@@ -53,3 +53,16 @@ class ArrayR(Generic[T]):
         """
         self.array[index] = value
 
+    def __getstate__(self) -> list[T]:
+        """ ctypes arrays of references cannot be pickled, so pickle the contents as a list
+        :complexity: O(length)
+        """
+        return self.array[:]
+
+    def __setstate__(self, state: list[T]) -> None:
+        """ Rebuilds the array from the list made by __getstate__
+        :complexity: O(length)
+        """
+        self.array = (len(state) * py_object)()
+        self.array[:] = state
+
@@ -0,0 +1,112 @@
+""" Hash Table Sizes
+
+Defines PrimeSizes and DEFAULT_SIZES, the default ladder of hash table
+sizes built with it. The ladder starts from hand-picked primes and appends
+the next prime past twice the last size whenever a table needs to grow
+beyond the end, so tables keep doubling instead of filling up at a fixed
+cap.
+
+The ladder is shared by every table using it, so each prime is only
+searched for once.
+"""
+from __future__ import annotations
+
+from threading import Lock
+from typing import Sequence
+
+# Witnesses making Miller-Rabin exact below 3.3 * 10^24.
+_WITNESSES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+
+def is_prime(n: int) -> bool:
+    """
+    Whether n is prime.
+
+    :complexity: O(log(n)^3), a Miller-Rabin test for each witness.
+    """
+    if n < 2:
+        return False
+    for p in _WITNESSES:
+        if n % p == 0:
+            return n == p
+    # n - 1 = d * 2^s with d odd
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for a in _WITNESSES:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def next_prime(n: int) -> int:
+    """
+    The smallest prime at least n.
+
+    :complexity: O(log(n)^4) on average, as primes are about log(n) apart.
+    """
+    if n <= 2:
+        return 2
+    if n % 2 == 0:
+        n += 1
+    while not is_prime(n):
+        n += 2
+    return n
+
+
+class PrimeSizes(list):
+    """
+    A list of table sizes that grows on demand.
+
+    Tables ask for a size index with has_size, which appends primes
+    (each at least double the one before) until the index exists.
+    """
+
+    GROWTH_FACTOR = 2
+
+    def __init__(self, sizes: Sequence[int]) -> None:
+        super().__init__(sizes)
+        self._lock = Lock()
+
+    def has_size(self, index: int) -> bool:
+        """
+        Make sure self[index] exists.
+
+        :complexity: O(1) when the size is cached, otherwise see next_prime.
+        """
+        if index < len(self):
+            return True
+        # Two tables may reach the end at the same time.
+        with self._lock:
+            while index >= len(self):
+                self.append(next_prime(self[-1] * self.GROWTH_FACTOR + 1))
+        return True
+
+    def __reduce__(self) -> str|tuple:
+        # The lock can't be pickled, and the shared default should stay shared.
+        if self is DEFAULT_SIZES:
+            return "DEFAULT_SIZES"
+        return (PrimeSizes, (list(self),))
+
+
+DEFAULT_SIZES = PrimeSizes([5, 13, 29, 53, 97, 193, 389, 769, 1543, 3079, 6151, 12289, 24593, 49157, 98317, 196613, 393241, 786433, 1572869])
+
+
+def has_size(sizes: Sequence[int], index: int) -> bool:
+    """
+    Whether a table using the size ladder sizes can move to sizes[index].
+    Extends PrimeSizes ladders; any other sequence is a fixed list of sizes.
+
+    :complexity: See PrimeSizes.has_size.
+    """
+    if isinstance(sizes, PrimeSizes):
+        return sizes.has_size(index)
+    return index < len(sizes)
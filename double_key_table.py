@@ -1,8 +1,12 @@
 from __future__ import annotations
 
 from typing import Generic, TypeVar, Iterator,Tuple
-from data_structures.hash_table import LinearProbeTable, FullError
+from data_structures.hash_table import LinearProbeTable, FullError, TOMBSTONE
+from data_structures.ordered_probe_table import OrderedProbeTable
 from data_structures.referential_array import ArrayR
+from data_structures.table_sizes import has_size
+from data_structures.hash_table_views import KeysView, ValuesView, ItemsView
+from data_structures.hashers import Hasher, SecondKeyHash, DEFAULT_HASHER
 
 K1 = TypeVar('K1')
 K2 = TypeVar('K2')
@@ -20,28 +24,68 @@ class DoubleKeyTable(Generic[K1, K2, V]):
     Double Hash Table.
 
     Type Arguments:
-        - K1:   1st Key Type. In most cases should be string.
-                Otherwise `hash1` should be overwritten.
-        - K2:   2nd Key Type. In most cases should be string.
-                Otherwise `hash2` should be overwritten.
+        - K1:   1st Key Type. Strings, integers and tuples of them are hashed
+                by the default hasher. Otherwise pass a `hasher` (see Hasher)
+                or overwrite `hash1`.
+        - K2:   2nd Key Type. As K1, using the same hasher, or overwrite `hash2`.
         - V:    Value Type.
 
+    Primary slots hold (key1, inner table, key1 hash) triples and inner tables
+    store key2 hashes the same way (see LinearProbeTable), so resizing and
+    cluster repair never hash a key again unless hash1 / hash2 are overwritten.
+
+    New inner tables start at a size holding `expected_fanout` key2s or, by
+    default, the mean number of key2s per key1 so far (only with the default
+    internal sizes), rather than growing up to it from the smallest size.
+
+    The primary table grows once more than MAX_LOAD_FACTOR of its slots are
+    taken and shrinks again when removing a key1 leaves fewer than
+    MIN_LOAD_FACTOR of them taken (see LinearProbeTable). The number of taken
+    slots is kept up to date rather than counted. Inner tables shrink on
+    their own.
+
+    With incremental=True the primary table grows like an incremental
+    LinearProbeTable: each insert or delete moves the next MIGRATION_STEP
+    slots of the old primary table across, and a lookup finding its key1 in
+    the old primary table moves that entry straight away. Inner tables are
+    created with incremental=True as well.
+
+    With ordered=True each inner table also keeps its key2s sorted (see
+    OrderedProbeTable), so keys(key1), values(key1) and items(key1) list them
+    in ascending order, and iter_keys, min_key and max_key can read a range
+    of them without sorting.
+
+    snapshot() returns a read-only DoubleKeyTableSnapshot of the table in
+    O(1). The snapshot and the table share the primary table and the inner
+    tables. After a snapshot, the table copies the primary table the first
+    time it changes it, and copies an inner table the first time it changes
+    that inner table.
+
     Unless stated otherwise, all methods have O(1) complexity.
     """
 
-    # No test case should exceed 1 million entries.
-    TABLE_SIZES = [5, 13, 29, 53, 97, 193, 389, 769, 1543, 3079, 6151, 12289, 24593, 49157, 98317, 196613, 393241, 786433, 1572869]
+    # Shared with LinearProbeTable, so both extend the same cached primes.
+    TABLE_SIZES = LinearProbeTable.TABLE_SIZES
 
     HASH_BASE = 31
     
     MAX_LOAD_FACTOR = 0.5
 
-    def __init__(self, sizes:list|None=None, internal_sizes:list|None=None) -> None:
+    # The primary table shrinks once fewer than this fraction of its slots are taken.
+    MIN_LOAD_FACTOR = 0.125
+
+    # Prime modulus keeping full hashes within a machine word.
+    HASH_MODULUS = 2147483647
+
+    # Old primary slots moved per insert / delete during an incremental resize.
+    MIGRATION_STEP = 8
+
+    def __init__(self, sizes:list|None=None, internal_sizes:list|None=None, hasher:Hasher|None=None,
+                 incremental:bool=False, expected_fanout:int|None=None, ordered:bool=False) -> None:
         self.external_size_index = sizes if sizes is not None else self.TABLE_SIZES # Assignment is constant --> O(1)
-        self.max_outer_index = len(self.external_size_index) # Assignment is constant --> O(1)
 
         self.outer_index = 0 # Assignment is constant --> O(1)
-        self.primary_table: ArrayR(tuple[K1, LinearProbeTable]) = ArrayR(self.external_size_index[self.outer_index]) # Assignment is constant --> O(1)
+        self.primary_table: ArrayR(tuple[K1, LinearProbeTable, int]) = ArrayR(self.external_size_index[self.outer_index]) # Assignment is constant --> O(1)
         self.internal_sizes = internal_sizes if internal_sizes is not None else self.TABLE_SIZES # Assignment is constant --> O(1)
         self.top_level_table_size = self.external_size_index[0] # Assignment is constant --> O(1)
 
@@ -51,6 +95,24 @@ class DoubleKeyTable(Generic[K1, K2, V]):
             self.internal_table_sizes = LinearProbeTable.TABLE_SIZES # Assignment is constant --> O(1)
 
         self._num_entries = 0 # Assignment is constant --> O(1)
+        # Number of key1s, counting any still in the old primary table of an incremental resize.
+        self._key1_count = 0 # Assignment is constant --> O(1)
+        self.hasher = hasher if hasher is not None else DEFAULT_HASHER # Assignment is constant --> O(1)
+        self._second_key_hash = SecondKeyHash(self) # Assignment is constant --> O(1)
+        self.expected_fanout = expected_fanout # Assignment is constant --> O(1)
+        # Fixed inner sizes are used as given, unless a fanout is expected explicitly.
+        self._adaptive_inner = internal_sizes is None # Assignment is constant --> O(1)
+        # Changed when a key pair is removed or the primary table reallocated, see TableView.
+        self._version = 0 # Assignment is constant --> O(1)
+        self.incremental = incremental # Assignment is constant --> O(1)
+        # The previous primary table while an incremental resize is in progress.
+        self._old_primary: ArrayR|None = None # Assignment is constant --> O(1)
+        self._migrate_position = 0 # Assignment is constant --> O(1)
+        self.ordered = ordered # Assignment is constant --> O(1)
+        # Whether the primary table is shared with a snapshot, see snapshot().
+        self._shared_primary = False # Assignment is constant --> O(1)
+        # Number of snapshots taken. Inner tables made since the last one carry the same number.
+        self._generation = 0 # Assignment is constant --> O(1)
 
        
     def hash1(self, key: K1) -> int:
@@ -58,32 +120,79 @@ class DoubleKeyTable(Generic[K1, K2, V]):
         Hash the 1st key for insert/retrieve/update into the hashtable.
         :complexity: O(len(key))
         """
-        value = 0
-        a = 31415
-        for char in key:
-            value = (ord(char) + a * value) % self.table_size
-            a = a * self.HASH_BASE % (self.table_size - 1)
-        return value
+        return self.full_hash(key) % self.table_size
 
     def hash2(self, key: K2, sub_table: LinearProbeTable[K2, V]) -> int:
         """
         Hash the 2nd key for insert/retrieve/update into the hashtable.
         :complexity: O(len(key))
         """
+        return self.full_hash(key) % sub_table.table_size
 
-    
-        value = 0
-        a = 31415
-        for char in key:
-            value = (ord(char) + a * value) % sub_table.table_size
-            a = a * self.HASH_BASE % (sub_table.table_size - 1)
-        return value
+    def full_hash(self, key: K1|K2) -> int:
+        """
+        Hash a key independently of any table size, see Hasher.
+        :complexity: O(len(key)) for strings and tuples, O(1) for integers.
+        """
+        return self.hasher.full_hash(key)
+
+    def _key1_hash(self, key1: K1) -> int:
+        """
+        The hash stored alongside key1: `full_hash` normally, or the position
+        given by `hash1` if it has been overwritten.
+        :complexity: O(hash1(key1))
+        """
+        if self._has_portable_hashes():
+            return self.full_hash(key1)
+        return self.hash1(key1)
+
+    def _has_portable_hashes(self) -> bool:
+        """
+        Whether stored key1 hashes survive a change of table size,
+        which is only the case while `hash1` hasn't been overwritten.
+        """
+        return getattr(self.hash1, "__func__", None) is DoubleKeyTable.hash1
+
+    def _new_internal_table(self) -> LinearProbeTable[K2, V]:
+        """
+        Create an empty bottom-level table (an OrderedProbeTable if the table
+        is ordered), with room for the expected fanout (see _expected_fanout).
+        The default hash2 is the same as LinearProbeTable's own hash, so
+        inner tables are only given a table_hash when it is overwritten. They
+        all share one SecondKeyHash.
+        :complexity: O(size of the new table)
+        """
+        table_hash = None
+        if getattr(self.hash2, "__func__", None) is not DoubleKeyTable.hash2:
+            table_hash = self._second_key_hash
+        table_class = OrderedProbeTable if self.ordered else LinearProbeTable
+        internal_table = table_class(self.internal_table_sizes, hasher=self.hasher, incremental=self.incremental,
+                                     table_hash=table_hash, capacity=self._expected_fanout())
+        internal_table._generation = self._generation # Not shared with any snapshot
+        return internal_table
+
+    def _expected_fanout(self) -> int:
+        """
+        Number of key2s a new key1 is expected to get: the `expected_fanout`
+        given to the constructor, or else the mean number of key2s per key1
+        so far. Starting inner tables at the size a mean one ends up with
+        saves most of their growth steps, while the memory allocated up
+        front stays proportional to len(self).
+        :complexity: O(1)
+        """
+        if self.expected_fanout is not None:
+            return self.expected_fanout
+        if not self._adaptive_inner or self._key1_count == 0:
+            return 0
+        return len(self) // self._key1_count
 
     
    
-    def _linear_probe(self, key1: K1, key2: K2, is_insert: bool) -> tuple[int, int]:
+    def _linear_probe(self, key1: K1, key2: K2, is_insert: bool, key1_hash: int|None = None) -> tuple[int, int]:
         """
         Find the correct position for this key in the hash table using linear probing.
+
+        key1_hash can be given when already known (see _key1_hash) to skip hashing key1.
         
         :raises KeyError: When the key pair is not in the table, but is_insert is False.
         
@@ -99,23 +208,32 @@ class DoubleKeyTable(Generic[K1, K2, V]):
                      is O(len(key1)) + self.table_size * len(key2).
         """
 
-        position = self.hash1(key1) % self.table_size  # complexity is O(len(key1))
+        if key1_hash is None: # Constant --> O(1)
+            key1_hash = self._key1_hash(key1)  # complexity is O(len(key1))
+        if self._old_primary is not None: # Constant --> O(1)
+            self._adopt(key1, key1_hash) # See _adopt
+        position = key1_hash % self.table_size # Assignment is constant --> O(1)
         for _ in self.primary_table: # Constant --> O(1)
             if self.primary_table[position] is None: # Constant --> O(1)
                 if is_insert: # Constant --> O(1)
-                    internal_table = LinearProbeTable(self.internal_table_sizes) #Assignment in constant --> O(1)
-                    self.primary_table[position] = (key1, internal_table) #Assignment in constant --> O(1)
-                    internal_table.hash = lambda k: self.hash2(k, internal_table) #Assignment in constant --> O(1)
+                    self._own_primary() # O(1), or O(self.table_size) once after a snapshot
+                    internal_table = self._new_internal_table() #Assignment in constant --> O(1)
+                    self.primary_table[position] = (key1, internal_table, key1_hash) #Assignment in constant --> O(1)
+                    self._key1_count += 1 # Incrementing is constant --> O(1)
 
                     if key2 is not None:  # Constant --> O(1)
-                        position_for_internal_table = self.hash2(key2, self.primary_table[position][1]) #Assignment in constant --> O(1)
+                        position_for_internal_table = internal_table._linear_probe(key2, True) #Assignment in constant --> O(1)
                         return (position, position_for_internal_table) # Returning is constant --> O(1)
                     else: # Constant --> O(1)
                         return (position, -1) # Returning is constant --> O(1)
                 else: # Constant --> O(1)
                     raise KeyError(key1) # Rasing doesn't have a complexity
-            elif self.primary_table[position][0] == key1: # Constant --> O(1)
+            elif self.primary_table[position][2] == key1_hash and self.primary_table[position][0] == key1: # Constant --> O(1)
                 if key2 is not None: # Constant --> O(1)
+                    internal_table = self.primary_table[position][1] # Assignment is constant --> O(1)
+                    if internal_table._old_table is not None: # Constant --> O(1)
+                        internal_table = self._writable_inner(position) # See _writable_inner
+                        internal_table._adopt(key2, internal_table._key_hash(key2)) # See LinearProbeTable._adopt
                     if is_insert: # Constant --> O(1)
                         internal_insert = self.primary_table[position][1]._linear_probe(key2, True) # best case = O(len(key2)) , worst case = O(len(key2) + N * comp(K))
                         return (position, internal_insert)
@@ -145,66 +263,48 @@ class DoubleKeyTable(Generic[K1, K2, V]):
 
     
 
-    def iter_keys(self, key:K1|None=None) -> Iterator[K1|K2]:
+    def iter_keys(self, key:K1|None=None, start:K2|None=None, stop:K2|None=None) -> Iterator[K1|K2]:
         """
         key = None:
            Returns an iterator of all top-level keys in hash table
         key = k:
            Returns an iterator of all keys in the bottom-hash-table for k.
+        key = k, with start and / or stop (ordered tables only):
+           Returns an iterator of the keys for k from start (inclusive) up to
+           stop (exclusive), in ascending order.
 
-        Complexity : The Best case is when key is None. This is because the function iterates
-                     over the primary table with size of the table size and yields the top-level keys,
-                     in this case the complexity of the function is O(self.table_size). The worst case
-                     is when The function first calls the _linear_probe method with a worst-case complexity 
-                     of O(len(key)) + self.table_size * len(key2). Then, it iterates over the keys in the 
-                     internal hash table. Assuming that the internal hash table has M elements, the complexity 
-                     of this part will be O(M). Therefore, the overall complexity in this case will be 
-                     O(len(key)) + self.table_size * len(key2) + K, where K is an element of the real numbers
+        :raises KeyError: when k is not in the table.
+        :raises ValueError: when start or stop is given without k, or the table isn't ordered.
 
+        Complexity : Creating the iterator is O(1) when key is None, otherwise it is one probe of the
+                     primary table for k (see _linear_probe). Running it to completion is O(self.table_size),
+                     or O(M) where M is the size of the bottom-hash-table for k, as it reads the slots one
+                     at a time without building a list (see keys). With start or stop, it is O(log(M) + R)
+                     where R is the number of keys returned (see OrderedProbeTable.key_range).
         """
-      
-
+        if start is None and stop is None: # Checks are constant --> O(1)
+            return iter(self.keys(key)) # Constant --> O(1)
         if key is None: # Checks are constant --> O(1)
-            for i in range(len(self.primary_table)): # Constant --> O(1)
-                if self.primary_table[i] is not None:  # Checks are constant --> O(1)
-                    yield self.primary_table[i][0] # Yielding is constant --> O(1)
-        else:  # Checks are constant --> O(1)
-            outer,outer2 = self._linear_probe(key,None,False) # O(linear_probe) , refer to linear probe function complexity
-            for i in self.primary_table[outer][1].keys():  # O(keys) , refer to keys complexity 
-                yield i # Yielding is constant --> O(1)
-
-                    
-
-    def keys(self, key:K1|None=None) -> list[K1]:
-        """
-        key = None: returns all top-level keys in the table.
-        key = x: returns all bottom-level keys for top-level key x.
-
-        Complexity : 
-                    If key is None:
-                    Best case: There are no top-level keys in the table, so the 
-                    function doesn't have to iterate through any elements. The 
-                    complexity in this case is O(1).
-                    Worst case: The function has to iterate through all top-level keys in the table. 
-                    The complexity of self.iter_keys(key) in this case will be O(N), where N is the 
-                    number of top-level keys. Since you're appending each key to the keys_result list, 
-                    the complexity of this loop will also be O(N).     
-
-                    If key is not None:
-                    Best case: There are no bottom-level keys for the specified top-level key, so the 
-                    function doesn't have to iterate through any elements. The complexity in this case is O(1).
-                    Worst case: The function has to iterate through all bottom-level keys for the specified top-level key. 
-                    The complexity of self.iter_keys(key) in this case depends on the number of keys in the bottom-level hash table. 
-                    If M is the number of keys in the bottom-level hash table, the complexity will be O(M). Since you're appending 
-                    each key to the keys_result list, the complexity of this loop will also be O(M).               
+            raise ValueError("A range of keys needs a top-level key.")
+        return self._ordered_table(key).key_range(start, stop) # O(_linear_probe + log(M))
+
+    def keys(self, key:K1|None=None) -> KeysView[K1|K2]:
         """
-        
+        key = None: returns a live view of all top-level keys in the table.
+        key = x: returns a live view of all bottom-level keys for top-level key x.
+
+        The view supports len(), `in` and iteration, and always reflects the current
+        contents of the table (see data_structures.hash_table_views). For ordered
+        tables, the bottom-level keys come in ascending order.
 
-        keys_result = [] # Assignment is constant --> O(1)
-        for i in self.iter_keys(key): # Refer to complexity analysis
-            keys_result.append(i) #Appending in constant -- O(1)
-        return keys_result # Returning is constant --> O(1)
+        :raises KeyError: when x is not in the table.
 
+        Complexity : O(1) when key is None. Otherwise one probe of the primary table for x,
+                     O(len(x)) in the best case and O(len(x) + self.table_size * comp(K1)) in the worst case.
+        """
+        if key is None: # Checks are constant --> O(1)
+            return PrimaryKeysView(self) # Constant --> O(1)
+        return self._internal_table(key).keys() # O(_linear_probe), refer to linear probe complexity analysis
 
     def iter_values(self, key:K1|None=None) -> Iterator[V]:
         """
@@ -212,67 +312,104 @@ class DoubleKeyTable(Generic[K1, K2, V]):
         Returns an iterator of all values in hash table
         key = k:
         Returns an iterator of all values in the bottom-hash-table for k.
-        
-        Complexity :Best case:
-                    If key is None: The best case occurs when the primary table is empty or has a 
-                    small number of top-level keys with very few values in their respective bottom-level 
-                    hash tables. In this case, the complexity is close to O(1).
-                    If key is not None: The best case happens when the specified top-level key has a small 
-                    number of values or no values in its associated bottom-level hash table. In this case, 
-                    the complexity is close to O(1).
-                    
-                    Worst case:
-                    If key is None: The worst case occurs when there are many top-level keys in the primary table 
-                    and each key has a large number of values in their associated bottom-level hash tables. In this case, 
-                    the complexity is O(N * M) where N is the number of top-level keys and M is the maximum number of values 
-                    in any bottom-level hash table.
-                    If key is not None: The worst case happens when the specified top-level key has a large number of values 
-                    in its associated bottom-level hash table. In this case, the complexity is O(M), where M is the number of values 
-                    in the bottom-level hash table for the specified key.
-                            
-        
+
+        :raises KeyError: when k is not in the table.
+
+        Complexity : As iter_keys. Running the iterator to completion is O(P + P * M) when key is None,
+                     where P is the size of the primary table and M is the maximum size of the internal tables.
         """
-        
-        
-        if key is None: #Checking is constant --> O(1)
-            for i in range(len(self.primary_table)): #Constant --> O(1)
-                if self.primary_table[i] is not None: #Checking is constant --> O(1)
-                    for i in self.primary_table[i][1].values():  #Constant --> O(1)
-                        yield i  # Yielding is constant --> O(1)
-        else:
-            outer,outer2 = self._linear_probe(key,None,False) # O(_linear_probe) , refer to linear probe complexity analysis
-            for i in self.primary_table[outer][1].values():  #Constant --> O(1)
-                yield i  # Yielding is constant --> O(1)
-      
-         
+        return iter(self.values(key)) # Constant --> O(1)
 
-    def values(self, key:K1|None=None) -> list[V]:
+    def values(self, key:K1|None=None) -> ValuesView[V]:
         """
-        key = None: returns all values in the table.
-        key = x: returns all values for top-level key x.
+        key = None: returns a live view of all values in the table.
+        key = x: returns a live view of all values for top-level key x.
 
-        Complexity : 
-                    Best case:
+        :raises KeyError: when x is not in the table.
 
-                    If key is None, there are no elements in the primary table, so the function will not 
-                    enter the loop, resulting in a complexity of O(1).
-                    If key is provided and there are no elements in the internal table, the function will not enter 
-                    the loop, resulting in a complexity of O(1).
-                    
-                    Worst case:
+        Complexity : See keys.
+        """
+        if key is None: # Checks are constant --> O(1)
+            return ValuesView(self) # Constant --> O(1)
+        return self._internal_table(key).values() # O(_linear_probe), refer to linear probe complexity analysis
 
-                    If key is None, and all positions in the primary table are occupied, the function will iterate through 
-                    all elements in the primary table and all elements in each of the internal tables. The complexity will 
-                    be O(P + P * M), where P is the size of the primary table and M is the maximum size of the internal tables.
-                    If key is provided, and the internal table corresponding to that key has all its positions occupied, the function will iterate through all elements in the internal table. The complexity will be O(M), where M is the size of the internal table.
+    def items(self, key:K1|None=None) -> ItemsView[tuple[tuple[K1, K2], V]|tuple[K2, V]]:
+        """
+        key = None: returns a live view of all ((key1, key2), value) pairs in the table.
+        key = x: returns a live view of all (key2, value) pairs for top-level key x.
 
+        :raises KeyError: when x is not in the table.
 
+        Complexity : See keys.
         """
-        values_result = [] # Assignment is constant --> O(1)
-        for i in self.iter_values(key): # O(iter_keys) , refer to iter_keys complexity analysis
-            values_result.append(i) #Appending is constant --> O(1)
-        return values_result # Returning is constant --> O(1)
-    
+        if key is None: # Checks are constant --> O(1)
+            return ItemsView(self) # Constant --> O(1)
+        return self._internal_table(key).items() # O(_linear_probe), refer to linear probe complexity analysis
+
+    def min_key(self, key1: K1) -> K2:
+        """
+        The smallest bottom-level key for key1 (ordered tables only).
+
+        :raises KeyError: when key1 is not in the table.
+        :raises ValueError: when the table isn't ordered.
+        :complexity: See _linear_probe.
+        """
+        return self._ordered_table(key1).min_key()
+
+    def max_key(self, key1: K1) -> K2:
+        """
+        The largest bottom-level key for key1 (ordered tables only).
+
+        :raises KeyError: when key1 is not in the table.
+        :raises ValueError: when the table isn't ordered.
+        :complexity: See _linear_probe.
+        """
+        return self._ordered_table(key1).max_key()
+
+    def _ordered_table(self, key1: K1) -> OrderedProbeTable[K2, V]:
+        """
+        The bottom-hash-table for key1, which keeps its keys sorted.
+
+        :raises KeyError: when key1 is not in the table.
+        :raises ValueError: when the table isn't ordered.
+        :complexity: See _linear_probe.
+        """
+        if not self.ordered:
+            raise ValueError("Key ranges need a table created with ordered=True.")
+        return self._internal_table(key1)
+
+    def _internal_table(self, key1: K1) -> LinearProbeTable[K2, V]:
+        """
+        The bottom-hash-table for key1.
+
+        :raises KeyError: when key1 is not in the table.
+        :complexity: See _linear_probe.
+        """
+        position, _ = self._linear_probe(key1, None, False)
+        internal_table = self.primary_table[position][1]
+        if internal_table._old_table is not None:
+            # Views of it finish its resize, which must not change a snapshot.
+            internal_table = self._writable_inner(position)
+        return internal_table
+
+    def _iter_keys(self) -> Iterator[K1]:
+        for entry in self.primary_table:
+            if entry is not None:
+                yield entry[0]
+
+    def _iter_values(self) -> Iterator[V]:
+        for entry in self.primary_table:
+            if entry is not None:
+                for _, value in entry[1]._read_items():
+                    yield value
+
+    def _iter_items(self) -> Iterator[tuple[tuple[K1, K2], V]]:
+        for entry in self.primary_table:
+            if entry is not None:
+                key1 = entry[0]
+                for key2, value in entry[1]._read_items():
+                    yield (key1, key2), value
+
     def __contains__(self, key: tuple[K1, K2]) -> bool:
         """
         Checks to see if the given key is in the Hash Table
@@ -342,21 +479,24 @@ class DoubleKeyTable(Generic[K1, K2, V]):
 
         """
         
-        primary_key,secondary_key = self._linear_probe(key[0],key[1],True) # Assignment is constant --> O(1)
+        self._insert(key[0], key[1], data) # Refer to complexity analysis above
 
-        try: #Constant --> O(1)
-            self.primary_table[primary_key][1][key[1]] #Checking is consant -- O(1)
-        except KeyError: #Constant --> O(1)
-            self._num_entries+=1 # Incrementing is constant --> O(1)
-        
-        self.primary_table[primary_key][1][key[1]] = data #Assignment is constant --> O(1)
+    def _insert(self, key1: K1, key2: K2, data: V, key1_hash: int|None = None, key2_hash: int|None = None) -> None:
+        """
+        __setitem__ for a key pair whose hashes may already be known.
 
-        amount_key1 = 0 #Assignment is constant --> O(1)
-        for keys in self.primary_table: #Constant --> O(1)
-            if keys is not None: #Constant --> O(1)
-                amount_key1+=1 # Incrementing is constant --> O(1)
-        
-        if amount_key1 > self.table_size / 2: #Checking is consant -- O(1)
+        Complexity : See __setitem__.
+        """
+        if self._old_primary is not None: # Constant --> O(1)
+            self._migrate(self.MIGRATION_STEP) # O(MIGRATION_STEP)
+        primary_key,_ = self._linear_probe(key1,None,True,key1_hash) # Assignment is constant --> O(1)
+
+        internal_table = self._writable_inner(primary_key) # See _writable_inner
+        old_size = len(internal_table) # Assignment is constant --> O(1)
+        internal_table._insert(key2, data, key2_hash) # See LinearProbeTable.__setitem__
+        self._num_entries += len(internal_table) - old_size # Incrementing is constant --> O(1)
+
+        if self._key1_count > self.MAX_LOAD_FACTOR * self.table_size: #Checking is consant -- O(1)
             self._rehash() # O(rehash) , refer to rehash complexity analysis
 
 
@@ -393,30 +533,50 @@ class DoubleKeyTable(Generic[K1, K2, V]):
 
         """
     
+        if self._old_primary is not None: # Constant --> O(1)
+            self._migrate(self.MIGRATION_STEP) # O(MIGRATION_STEP)
         p1, p2 = self._linear_probe(key[0], key[1], False) #Assignment is constant --> O(1)
+        self._version += 1 # Incrementing is constant --> O(1)
 
         if len(self.primary_table[p1][1]) > 1: #Constant --> O(1)
-            del self.primary_table[p1][1][key[1]] # O(1) or O(N) depending on where it is being deleted
+            del self._writable_inner(p1)[key[1]] # O(1) or O(N) depending on where it is being deleted
             self._num_entries -= 1 # Decrementing is constant --> O(1)
 
         else: #Constant --> O(1)
+            self._own_primary() # O(1), or O(self.table_size) once after a snapshot
             self.primary_table[p1] = None  #Assignment is constant --> O(1)
             self._num_entries -= 1 # Decrementing is constant --> O(1)
+            self._key1_count -= 1 # Decrementing is constant --> O(1)
             p1 = (p1 + 1) % self.table_size #Assignment is constant --> O(1)
 
             while self.primary_table[p1] is not None: #Checking is constant --> O(1)
-                key1 = self.primary_table[p1][0] #Assignment is constant --> O(1)
-                key2_list = list(self.primary_table[p1][1].keys()) #Assignment is constant --> O(1)
-                values = list(self.primary_table[p1][1].values()) #Assignment is constant --> O(1)
+                entry = self.primary_table[p1] #Assignment is constant --> O(1)
                 self.primary_table[p1] = None #Assignment is constant --> O(1)
+                self._place_primary(entry) # The inner table moves as it is, O(self.table_size) at worst
+                p1 = (p1 + 1) % self.table_size #Assignment is constant --> O(1)
 
-                for i in range(len(key2_list)): #Constant --> O(1)
-                    self[key1, key2_list[i]] = values[i]  ##Assignment is constant --> O(1)
+            outer_index = self._shrunk_outer_index() # O(log(self.table_size))
+            if outer_index != self.outer_index:
+                self._resize(outer_index) # See _rehash
 
-                p1 = (p1 + 1) % self.table_size #Assignment is constant --> O(1)
+    def _shrunk_outer_index(self) -> int:
+        """
+        The index of the primary table size to shrink to after a key1 was removed.
 
+        Once fewer than MIN_LOAD_FACTOR of the primary slots are taken, picks
+        the smallest size that is at most a quarter full, so the table is not
+        grown straight back by the next few inserts.
+
+        :complexity: O(log(N)) where N is self.table_size.
+        """
+        amount_key1 = self._key1_count #Assignment is constant --> O(1)
+
+        outer_index = self.outer_index #Assignment is constant --> O(1)
+        if amount_key1 < self.MIN_LOAD_FACTOR * self.table_size: #Checking is constant --> O(1)
+            while outer_index > 0 and amount_key1 <= self.external_size_index[outer_index - 1] / 4:
+                outer_index -= 1 # Decrementing is constant --> O(1)
+        return outer_index
 
-        
 
 
     def _rehash(self) -> None:
@@ -449,23 +609,164 @@ class DoubleKeyTable(Generic[K1, K2, V]):
         
         """
         
+        self._finish_resize()
+        if not has_size(self.external_size_index, self.outer_index + 1):
+            # Already at the largest size.
+            return
+        if self.incremental and self._has_portable_hashes():
+            self._start_resize(self.outer_index + 1)
+        else:
+            self._resize(self.outer_index + 1)
+
+    def _resize(self, outer_index: int) -> None:
+        """
+        Move every (key1, inner table, key1 hash) entry into a primary table
+        of size sizes[outer_index]. Inner tables and the counts are unchanged.
+
+        :complexity: See _rehash.
+        """
+        self._finish_resize()
         old_primary_table = self.primary_table
-        self.outer_index +=1
+        self._version += 1
+        self.outer_index = outer_index
+        self.primary_table = ArrayR(self.external_size_index[self.outer_index])
+        # Any snapshot keeps the old primary table.
+        self._shared_primary = False
 
-        if self.outer_index == self.external_size_index:
-            return
-        self.primary_table = ArrayR(self.external_size_index[self.outer_index - 1])
-        self._num_entries = 0
+        portable = self._has_portable_hashes()
+        for entry in old_primary_table:
+            if entry is not None:
+                if not portable:
+                    # The stored hash is a position in the old table size.
+                    entry = (entry[0], entry[1], self._key1_hash(entry[0]))
+                # Only the slot depends on the table size, so inner tables move as they are.
+                self._place_primary(entry)
 
-        for j in old_primary_table:
-            if j is not None:
-                key1 = j[0]
-                key2 = j[1].keys()
-                values = j[1].values()
-                for k in range(len(key2)):
-                    self[key1 , key2[k]] = values[k]
 
-        
+    def _start_resize(self, outer_index: int) -> None:
+        """
+        Begin an incremental resize: keep the current primary table aside and
+        continue with an empty one of size sizes[outer_index].
+
+        :complexity: O(sizes[outer_index]) to allocate the new primary table.
+        """
+        # Slots of the old primary table are emptied as they move.
+        self._own_primary()
+        self._old_primary = self.primary_table
+        self._migrate_position = 0
+        self._version += 1
+        self.outer_index = outer_index
+        self.primary_table = ArrayR(self.external_size_index[self.outer_index])
+
+    def _migrate(self, steps: int) -> None:
+        """
+        Move the entries in the next `steps` slots of the old primary table
+        into the current one, ending the incremental resize once all are done.
+        Inner tables move as they are, none of their keys is touched.
+
+        :complexity: O(steps) with no probing, see _place_primary.
+        """
+        old = self._old_primary
+        end = min(self._migrate_position + steps, len(old))
+        for position in range(self._migrate_position, end):
+            entry = old[position]
+            if entry is not None and entry is not TOMBSTONE:
+                # Later probes of the old primary table must carry on past this slot.
+                old[position] = TOMBSTONE
+                self._place_primary(entry)
+        self._migrate_position = end
+        if end == len(old):
+            self._old_primary = None
+
+    def _adopt(self, key1: K1, key1_hash: int) -> None:
+        """
+        Move key1's entry out of the old primary table of an incremental
+        resize, if it is there, so that it can be probed for as usual.
+
+        :complexity best: O(1) first position is empty or holds key1.
+        :complexity worst: O(N*comp(K1)) where N is the size of the old primary table.
+        """
+        old = self._old_primary
+        position = key1_hash % len(old)
+        for _ in range(len(old)):
+            entry = old[position]
+            if entry is None:
+                return
+            if entry is not TOMBSTONE and entry[2] == key1_hash and entry[0] == key1:
+                old[position] = TOMBSTONE
+                self._place_primary(entry)
+                return
+            position = (position + 1) % len(old)
+
+    def _place_primary(self, entry: tuple[K1, LinearProbeTable[K2, V], int]) -> None:
+        """
+        Put a (key1, inner table, key1 hash) entry whose key1 is not in the
+        primary table into the first free slot of its probe sequence.
+
+        :complexity best: O(1) first position is empty.
+        :complexity worst: O(N) where N is self.table_size.
+        """
+        position = entry[2] % self.table_size
+        while self.primary_table[position] is not None:
+            position = (position + 1) % self.table_size
+        self.primary_table[position] = entry
+
+    def _finish_resize(self) -> None:
+        """
+        Complete any incremental resize in progress.
+
+        :complexity: O(N) where N is the size of the old primary table.
+        """
+        if self._old_primary is not None:
+            self._migrate(len(self._old_primary))
+
+    def snapshot(self) -> DoubleKeyTableSnapshot[K1, K2, V]:
+        """
+        A read-only view of the table as it is now, unaffected by later
+        changes to the table (see DoubleKeyTableSnapshot).
+
+        Nothing is copied here. From now on the table copies the primary
+        table and each inner table the first time it changes them.
+
+        :complexity: O(1), plus finishing any incremental resize of the primary table.
+        """
+        self._finish_resize()
+        self._shared_primary = True
+        self._generation += 1
+        return DoubleKeyTableSnapshot(self)
+
+    def _own_primary(self) -> None:
+        """
+        Copy the primary table if it is shared with a snapshot, before changing it.
+
+        :complexity: O(1), or O(self.table_size) for the first change after a snapshot.
+        """
+        if self._shared_primary:
+            shared = self.primary_table
+            self.primary_table = ArrayR(len(shared))
+            for position in range(len(shared)):
+                self.primary_table[position] = shared[position]
+            self._shared_primary = False
+
+    def _writable_inner(self, position: int) -> LinearProbeTable[K2, V]:
+        """
+        The inner table in primary slot position, copied first if it may be
+        shared with a snapshot.
+
+        An inner table is the table's own once its _generation is the
+        table's, that is it was created or copied since the last snapshot.
+
+        :complexity: O(1), or O(size of the inner table) for the first change after a snapshot.
+        """
+        key1, internal_table, key1_hash = self.primary_table[position]
+        if internal_table._generation == self._generation:
+            return internal_table
+        internal_table = internal_table.copy()
+        internal_table._generation = self._generation
+        self._own_primary()
+        self.primary_table[position] = (key1, internal_table, key1_hash)
+        return internal_table
+
     @property
     def table_size(self) -> int:
         """
@@ -479,50 +780,155 @@ class DoubleKeyTable(Generic[K1, K2, V]):
     
     def __iter__(self) -> Iterator[tuple[K1, K2]]:
         """
-        Iterate through the keys of the table.
+        Iterate through the (key1, key2) pairs of the table.
 
         :return: An iterator over the keys.
+        :raises RuntimeError: when keys are added or removed during iteration.
 
-        Complexity: The complexity of this function depends on the number of elements in the primary table (outer hash table) and the number of elements in each inner hash table.
+        Complexity: O(P + n_1 + n_2 + ... + n_m) to run to completion, where P is the size of the primary table and
+                    n_i is the size of the i-th inner hash table. Slots are read once, keys are never probed again.
+        """
+        for key, _ in self.items():
+            yield key
 
-                    Let m be the number of elements in the primary table and let n_i be the number of elements in the i-th inner 
-                    hash table. The function iterates over each element in the primary table and then iterates over each element 
-                    in the inner hash table.The complexity can be represented as: O(m * (n_1 + n_2 + ... + n_m))
+    def __len__(self) -> int:
+        """
+        Returns number of elements in the hash table
 
-                    In the worst case, all elements are evenly distributed across all inner hash tables, resulting in a complexity 
-                    of: O(m * n)
+        Complexity : constant
+        """
+        return self._num_entries 
 
-                    where n is the average number of elements per inner hash table.
-                    In the best case, there is only one non-empty inner hash table, and the complexity would be: O(m + n) 
-                    where n is the number of elements in that single inner hash table.
+    def __str__(self) -> str:
+        """
+        String representation.
 
+        Not required but may be a good testing tool.
+        """
+        items = [f"{k}: {v}" for k, v in self.items()]
+        return "{" + ", ".join(items) + "}"
 
 
+class PrimaryKeysView(KeysView[K1]):
+    """
+    View over the top-level keys of a DoubleKeyTable.
+    """
 
+    def __len__(self) -> int:
+        return self._table._key1_count
+
+    def __contains__(self, key1: object) -> bool:
+        """
+        :complexity: See DoubleKeyTable._linear_probe.
         """
-        for primary_table_entry in self.primary_table:
-            if primary_table_entry is not None:
-                key1, inner_table = primary_table_entry
-                for key2 in inner_table.keys():
-                    yield key1, inner_table[key2]
+        try:
+            self._table._linear_probe(key1, None, False)
+        except KeyError:
+            return False
+        return True
 
 
+class DoubleKeyTableSnapshot(Generic[K1, K2, V]):
+    """
+    Read-only view of a DoubleKeyTable as it was when its snapshot() was
+    called.
+
+    The snapshot reads the primary table and inner tables it shares with the
+    table, which the table copies rather than changes from then on (see
+    DoubleKeyTable.snapshot). Reading a snapshot never changes them either,
+    so scans of it are consistent and need no lock, however the table
+    changes in the meantime.
+
+    Unless stated otherwise, all methods have the complexity of their
+    DoubleKeyTable counterpart.
+    """
+
+    def __init__(self, table: DoubleKeyTable[K1, K2, V]) -> None:
+        self._table = table
+        self._primary_table = table.primary_table
+        self._num_entries = len(table)
+        self._portable = table._has_portable_hashes()
+
+    def _entry(self, key1: K1) -> tuple[K1, LinearProbeTable[K2, V], int]:
+        """
+        The (key1, inner table, key1 hash) entry for key1.
+
+        :raises KeyError: when key1 is not in the snapshot.
+        :complexity: See DoubleKeyTable._linear_probe. When hash1 has been
+                     overwritten the stored positions may not match the
+                     table's current size, so all slots are searched, O(P).
+        """
+        primary_table = self._primary_table
+        if not self._portable:
+            for entry in primary_table:
+                if entry is not None and entry[0] == key1:
+                    return entry
+            raise KeyError(key1)
+        key1_hash = self._table.full_hash(key1)
+        position = key1_hash % len(primary_table)
+        for _ in range(len(primary_table)):
+            entry = primary_table[position]
+            if entry is None:
+                break
+            if entry[2] == key1_hash and entry[0] == key1:
+                return entry
+            position = (position + 1) % len(primary_table)
+        raise KeyError(key1)
+
+    def __getitem__(self, key: tuple[K1, K2]) -> V:
+        """
+        :raises KeyError: when the key pair is not in the snapshot.
+        """
+        return self._entry(key[0])[1][key[1]]
+
+    def __contains__(self, key: tuple[K1, K2]) -> bool:
+        try:
+            _ = self[key]
+        except KeyError:
+            return False
+        return True
+
     def __len__(self) -> int:
+        return self._num_entries
+
+    def __iter__(self) -> Iterator[tuple[K1, K2]]:
         """
-        Returns number of elements in the hash table
+        Iterate through the (key1, key2) pairs.
 
-        Complexity : constant
+        :complexity: See DoubleKeyTable.__iter__.
         """
-        return self._num_entries 
+        for key, _ in self.items():
+            yield key
 
-    def __str__(self) -> str:
+    def keys(self, key:K1|None=None) -> Iterator[K1|K2]:
         """
-        String representation.
+        key = None: iterates the top-level keys.
+        key = x: iterates the bottom-level keys for top-level key x.
 
-        Not required but may be a good testing tool.
+        :raises KeyError: when x is not in the snapshot.
         """
-        items = [f"{k}: {v}" for k, v in self]
-        return "{" + ", ".join(items) + "}"
+        if key is None:
+            return (entry[0] for entry in self._primary_table if entry is not None)
+        return (key2 for key2, _ in self._entry(key)[1]._read_items())
 
+    def values(self, key:K1|None=None) -> Iterator[V]:
+        """
+        key = None: iterates all values.
+        key = x: iterates the values for top-level key x.
 
+        :raises KeyError: when x is not in the snapshot.
+        """
+        return (value for _, value in self.items(key))
 
+    def items(self, key:K1|None=None) -> Iterator[tuple[tuple[K1, K2], V]|tuple[K2, V]]:
+        """
+        key = None: iterates all ((key1, key2), value) pairs.
+        key = x: iterates the (key2, value) pairs for top-level key x.
+
+        :raises KeyError: when x is not in the snapshot.
+        """
+        if key is not None:
+            return self._entry(key)[1]._read_items()
+        return (((entry[0], key2), value)
+                for entry in self._primary_table if entry is not None
+                for key2, value in entry[1]._read_items())
@@ -1,7 +1,8 @@
 from __future__ import annotations
-from typing import Generic, TypeVar
+from typing import Any, Generic, Iterator, TypeVar
 
 from data_structures.referential_array import ArrayR
+from data_structures.hashers import Hasher, DEFAULT_HASHER
 
 K = TypeVar("K")
 V = TypeVar("V")
@@ -11,25 +12,49 @@ class InfiniteHashTable(Generic[K, V]):
     Infinite Hash Table.
 
     Type Arguments:
-        - K:    Key Type. In most cases should be string.
-                Otherwise `hash` should be overwritten.
+        - K:    Key Type. Strings are split into characters, integers into
+                decimal digits and tuples into items by the default hasher.
+                Otherwise pass a `hasher` (see Hasher.level_hash) or
+                overwrite `hash`.
         - V:    Value Type.
 
+    Every slot holds None, a (key, value) pair or a subtable for the next
+    level. Keys that run out of symbols at the same level, without any
+    level telling them apart (like "0a" and "da", whose characters share
+    slots), are kept together in a list of pairs in the last slot.
+
+    Operations walk down the levels in a loop rather than recursing, so key
+    length is not limited by the recursion limit. keys(), values() and items()
+    list the table in sorted key order by walking the levels, sorting at
+    most 27 slots per table rather than the keys.
+
     Unless stated otherwise, all methods have O(1) complexity.
     """
 
     TABLE_SIZE = 27
 
-    def __init__(self) -> None:
+    def __init__(self, hasher: Hasher|None = None) -> None:
         self.level = 0
         self.table = [None] * self.TABLE_SIZE
         self.size = 0
+        self.hasher = hasher if hasher is not None else DEFAULT_HASHER
+        # For subtables: the symbol every key has at the level above, unless
+        # mixed is set as keys with different symbols share the slot above.
+        self.symbol = None
+        self.mixed = False
 
 
     def hash(self, key: K) -> int:
-        if self.level < len(key):
-            return ord(key[self.level]) % (self.TABLE_SIZE-1)
-        return self.TABLE_SIZE-1
+        """
+        Position of key at this level, the last slot once the key has run out of symbols.
+
+        Complexity: O(1) for strings, see Hasher.level_hash otherwise.
+        """
+        if type(key) is str and self.hasher is DEFAULT_HASHER:
+            if self.level < len(key):
+                return ord(key[self.level]) % (self.TABLE_SIZE-1)
+            return self.TABLE_SIZE-1
+        return self.hasher.level_hash(key, self.level, self.TABLE_SIZE-1)
 
     def __getitem__(self, key: K) -> V:
         """
@@ -46,16 +71,29 @@ class InfiniteHashTable(Generic[K, V]):
 
 
         """
-        index = self.hash(key) #Assignment is constant --> O(1)
-        entry = self.table[index] #Assignment is constant --> O(1)
-
-        if isinstance(entry, InfiniteHashTable): #Checking is constant --> O(1)
-            return entry[key] #Returning is constant --> O(1)
+        return self._find(key)[1] # See _find
 
-        if entry is not None and entry[0] == key: #Checking is constant --> O(1)
-            return entry[1] #Returning is constant --> O(1)
+    def _find(self, key: K) -> tuple[K, V]:
+        """
+        The (key, value) pair stored for key.
 
-        raise KeyError(key) #Raising doesn't have a complexity
+        :raises KeyError: when the key doesn't exist.
+        :complexity: O(n) where n is the number of nested subtables passed through.
+        """
+        table = self #Assignment is constant --> O(1)
+        while True: # Once per level --> O(n)
+            entry = table.table[table.hash(key)] #Assignment is constant --> O(1)
+            if isinstance(entry, InfiniteHashTable): #Checking is constant --> O(1)
+                table = entry #Assignment is constant --> O(1)
+            elif type(entry) is list: #Checking is constant --> O(1)
+                for pair in entry: # Keys that no level tells apart, usually two
+                    if pair[0] == key:
+                        return pair
+                raise KeyError(key) #Raising doesn't have a complexity
+            elif entry is not None and entry[0] == key: #Checking is constant --> O(1)
+                return entry #Returning is constant --> O(1)
+            else: #Checking is constant --> O(1)
+                raise KeyError(key) #Raising doesn't have a complexity
 
     def __setitem__(self, key: K, value: V) -> None:
         """
@@ -73,25 +111,47 @@ class InfiniteHashTable(Generic[K, V]):
 
 
         """
-        index = self.hash(key) #Assignment is constant --> O(1)
-        entry = self.table[index] #Assignment is constant --> O(1)
-
-        if entry is None: #Checking is constant --> O(1)
-            self.table[index] = (key, value) #Assignment is constant --> O(1)
-            self.size += 1 #Incrementing is constant --> O(1)
-        elif isinstance(entry, InfiniteHashTable): #Checking is constant --> O(1)
-            old_size = len(entry) #Assignment is constant --> O(1)
-            entry[key] = value #Assignment is constant --> O(1)
-            self.size += len(entry) - old_size #Constant --> O(1)
-        else: #Checking is constant --> O(1)
-            if entry[0] == key: #Checking is constant --> O(1)
-                self.table[index] = (key, value) #Assignment is constant --> O(1)
+        path = [] # Tables passed through, whose sizes grow if key is new
+        table = self #Assignment is constant --> O(1)
+        while True: # Once per level --> O(n)
+            path.append(table) #Appending is constant --> O(1)
+            index = table.hash(key) #Assignment is constant --> O(1)
+            entry = table.table[index] #Assignment is constant --> O(1)
+
+            if entry is None: #Checking is constant --> O(1)
+                table.table[index] = (key, value) #Assignment is constant --> O(1)
+                break
+            elif isinstance(entry, InfiniteHashTable): #Checking is constant --> O(1)
+                if not entry.mixed and entry.symbol != table._symbol(key): #Checking is constant --> O(1)
+                    entry.mixed = True #Assignment is constant --> O(1)
+                table = entry #Assignment is constant --> O(1)
+            elif type(entry) is list: #Checking is constant --> O(1)
+                for i, pair in enumerate(entry): # Keys that no level tells apart, usually two
+                    if pair[0] == key:
+                        entry[i] = (key, value)
+                        return
+                entry.append((key, value)) #Appending is constant --> O(1)
+                break
+            elif entry[0] == key: #Checking is constant --> O(1)
+                table.table[index] = (key, value) #Assignment is constant --> O(1)
+                return
+            elif index == self.TABLE_SIZE - 1: #Checking is constant --> O(1)
+                # Both keys have run out of symbols here, so no level below can tell them apart.
+                table.table[index] = [entry, (key, value)] #Assignment is constant --> O(1)
+                break
             else: #Checking is constant --> O(1)
-                new_table = self._create_subtable() #Assignment is constant --> O(1)
-                new_table[entry[0]] = entry[1] #Assignment is constant --> O(1)
-                new_table[key] = value #Assignment is constant --> O(1)
-                self.table[index] = new_table #Assignment is constant --> O(1)
-                self.size += 1 #Incrementing is constant --> O(1)
+                # Move the pair down a level and carry on from there with key.
+                new_table = table._create_subtable() #Assignment is constant --> O(1)
+                new_table.symbol = table._symbol(entry[0]) #Assignment is constant --> O(1)
+                new_table.table[new_table.hash(entry[0])] = entry #Assignment is constant --> O(1)
+                new_table.size = 1 #Assignment is constant --> O(1)
+                table.table[index] = new_table #Assignment is constant --> O(1)
+                if new_table.symbol != table._symbol(key): #Checking is constant --> O(1)
+                    new_table.mixed = True #Assignment is constant --> O(1)
+                table = new_table #Assignment is constant --> O(1)
+
+        for table in path: # O(n)
+            table.size += 1 #Incrementing is constant --> O(1)
 
     def __delitem__(self, key: K) -> None:
         """
@@ -111,30 +171,41 @@ class InfiniteHashTable(Generic[K, V]):
 
 
         """
-        index = self.hash(key) #Assignment is constant --> O(1)
-        entry = self.table[index] #Assignment is constant --> O(1)
-
-        if entry is None: #Checking is constant --> O(1)
-            raise KeyError(key) #Raising does not have a complexity
-
-        if isinstance(entry, InfiniteHashTable):
-            old_size = len(entry) #Assignment is constant --> O(1)
-            del entry[key] #Deleting is constant --> O(1)
+        path = [] # (table, index) of every slot passed through
+        table = self #Assignment is constant --> O(1)
+        while True: # Once per level --> O(n)
+            index = table.hash(key) #Assignment is constant --> O(1)
+            entry = table.table[index] #Assignment is constant --> O(1)
+            path.append((table, index)) #Appending is constant --> O(1)
+
+            if isinstance(entry, InfiniteHashTable): #Checking is constant --> O(1)
+                table = entry #Assignment is constant --> O(1)
+            elif type(entry) is list: #Checking is constant --> O(1)
+                for i, pair in enumerate(entry): # Keys that no level tells apart, usually two
+                    if pair[0] == key:
+                        del entry[i]
+                        break
+                else:
+                    raise KeyError(key) #Raising does not have a complexity
+                if len(entry) == 1: #Checking is constant --> O(1)
+                    table.table[index] = entry[0] #Assignment is constant --> O(1)
+                break
+            elif entry is not None and entry[0] == key: #Checking is constant --> O(1)
+                table.table[index] = None  #Assignment is constant --> O(1)
+                break
+            else: #Checking is constant --> O(1)
+                raise KeyError(key) #Raising does not have a complexity
 
-            if len(entry) == 1: #Checking is constant --> O(1)
+        # Walk back up, replacing subtables left with one pair by that pair.
+        for table, index in reversed(path): # O(n)
+            table.size -= 1 #Decrementig constant --> O(1)
+            entry = table.table[index] #Assignment is constant --> O(1)
+            if isinstance(entry, InfiniteHashTable) and len(entry) == 1: #Checking is constant --> O(1)
                 for e in entry.table: #Constant --> O(1)
                     if e is not None: #Checking is constant --> O(1)
-                        self.table[index] = e #Assignment is constant --> O(1)
+                        table.table[index] = e #Assignment is constant --> O(1)
                         break #Constant --> O(1)
 
-            self.size -= old_size - len(entry) #Constant --> O(1)
-
-        elif entry[0] == key: #Checking is constant --> O(1)
-            self.table[index] = None  #Assignment is constant --> O(1)
-            self.size -= 1 #Decrementig constant --> O(1)
-        else: #Checking is constant --> O(1)
-            raise KeyError(key) #Raising does not have a complexity
-
     def __len__(self):
         """
         Complexity: O(1)
@@ -147,18 +218,187 @@ class InfiniteHashTable(Generic[K, V]):
         Complexity : O(1)
 
         """
-        subtable = InfiniteHashTable()
+        subtable = InfiniteHashTable(self.hasher)
         subtable.level = self.level + 1
         return subtable
     
     
-    def __str__(self) -> str:
+    def _symbol(self, key: K) -> Any:
+        """
+        The symbol of key at this level: its level-th character (digit for
+        integers, item for tuples), or None once it has run out. Keys that
+        can't be indexed have no symbols.
+        """
+        if isinstance(key, int):
+            key = str(key)
+        try:
+            return key[self.level] if self.level < len(key) else None
+        except TypeError:
+            return None
+
+    def _sorted_children(self) -> list[tuple[Any, Any]]:
+        """
+        The contents of this table as (symbol, child) pairs in the order of
+        their symbol at this level, the symbol of a key that has run out
+        first. A child is a (key, value) pair, a subtable whose keys share
+        one symbol, or a list of (key, value) pairs in key order.
+
+        Slots are ordered by symbol code modulo 26, which is only symbol
+        order within one run of 26 characters (like "a" to "z"), so the at
+        most 27 slots are sorted here. Subtables mixing symbols are split
+        up by symbol, listing their items in order first.
+
+        :complexity: O(1), or O(M) per mixed subtable of M keys.
+        """
+        children = []
+        for entry in self.table: # TABLE_SIZE slots --> O(1)
+            if entry is None:
+                continue
+            if isinstance(entry, InfiniteHashTable):
+                if not entry.mixed:
+                    children.append((entry.symbol, entry))
+                    continue
+                groups = {}
+                for pair in entry.items(): # O(M)
+                    groups.setdefault(self._symbol(pair[0]), []).append(pair)
+                children.extend(groups.items())
+            elif type(entry) is list:
+                children.append((self._symbol(entry[0][0]), sorted(entry, key=lambda pair: pair[0])))
+            else:
+                children.append((self._symbol(entry[0]), entry))
+        children.sort(key=lambda child: (False,) if child[0] is None else (True, child[0]))
+        return children
+
+    def items(self) -> Iterator[tuple[K, V]]:
+        """
+        Iterate the (key, value) pairs in sorted key order. Keys are compared
+        symbol by symbol, so integers come in the order of their decimal
+        digits (see _symbol).
+
+        Walks the levels with a stack of children still to visit, so every
+        table is visited once and no key is compared with another.
+
+        :complexity: O(N) where N is the number of tables and pairs, plus
+                     O(M) for every subtable mixing symbols, see _sorted_children.
         """
-        String representation.
+        stack = [self._sorted_children()[::-1]] # Children to visit, last first
+        while stack:
+            children = stack[-1]
+            if not children:
+                stack.pop()
+                continue
+            _, child = children.pop()
+            if isinstance(child, InfiniteHashTable):
+                stack.append(child._sorted_children()[::-1])
+            elif type(child) is list:
+                yield from child
+            else:
+                yield child
+
+    def _prefix_node(self, prefix: K) -> tuple[Any, bool]:
+        """
+        Walk down the slots of prefix's symbols to the smallest part of the
+        table holding every key that starts with prefix: a subtable, a
+        (key, value) pair, a list of pairs, or None if there is no such key.
+
+        Also says whether every key there starts with prefix. That is known
+        from the symbol of each subtable on the way, unless a subtable mixes
+        symbols sharing a slot (see __init__): then the node also holds keys
+        whose symbols only share prefix's slots.
+
+        :complexity: O(len(prefix))
+        """
+        node = self #Assignment is constant --> O(1)
+        exact = True #Assignment is constant --> O(1)
+        for _ in range(len(str(prefix)) if isinstance(prefix, int) else len(prefix)): # O(len(prefix))
+            entry = node.table[node.hash(prefix)] #Assignment is constant --> O(1)
+            if not isinstance(entry, InfiniteHashTable): #Checking is constant --> O(1)
+                # At most a few keys left, checked one by one.
+                return entry, False
+            if entry.mixed: #Checking is constant --> O(1)
+                exact = False #Assignment is constant --> O(1)
+            elif entry.symbol != node._symbol(prefix): #Checking is constant --> O(1)
+                return None, True
+            node = entry #Assignment is constant --> O(1)
+        return node, exact
+
+    def items_with_prefix(self, prefix: K) -> Iterator[tuple[K, V]]:
+        """
+        Iterate the (key, value) pairs whose key starts with prefix, in
+        sorted key order. Integer keys and prefixes are compared by their
+        decimal digits.
+
+        :complexity: O(len(prefix) + M) where M is the number of matches, see
+                     items. If a subtable on the way mixes symbols sharing a
+                     slot, M is instead the size of the part walked.
+        """
+        node, exact = self._prefix_node(prefix)
+        if node is None:
+            return
+        if isinstance(node, InfiniteHashTable):
+            pairs = node.items()
+        elif type(node) is list:
+            pairs = sorted(node, key=lambda pair: pair[0])
+        else:
+            pairs = [node]
+        if exact:
+            yield from pairs
+            return
+        symbols = str(prefix) if isinstance(prefix, int) else prefix
+        for pair in pairs:
+            key = str(pair[0]) if isinstance(pair[0], int) else pair[0]
+            if key[:len(symbols)] == symbols:
+                yield pair
+
+    def keys_with_prefix(self, prefix: K) -> Iterator[K]:
+        """
+        Iterate the keys that start with prefix in sorted order, see items_with_prefix.
+        """
+        for key, _ in self.items_with_prefix(prefix):
+            yield key
+
+    def count_with_prefix(self, prefix: K) -> int:
+        """
+        The number of keys that start with prefix, read from the size of the
+        subtable holding them rather than counting them.
+
+        :complexity: O(len(prefix)), or that of items_with_prefix when a
+                     subtable on the way mixes symbols sharing a slot.
+        """
+        node, exact = self._prefix_node(prefix)
+        if exact and isinstance(node, InfiniteHashTable):
+            return len(node)
+        return sum(1 for _ in self.items_with_prefix(prefix))
 
-        Not required but may be a good testing tool.
+    def keys(self) -> Iterator[K]:
         """
-        pass
+        Iterate the keys in sorted order, see items.
+        """
+        for key, _ in self.items():
+            yield key
+
+    def values(self) -> Iterator[V]:
+        """
+        Iterate the values in the sorted order of their keys, see items.
+        """
+        for _, value in self.items():
+            yield value
+
+    def __iter__(self) -> Iterator[K]:
+        """
+        Iterate the keys in sorted order, see items.
+        """
+        return self.keys()
+
+    def __str__(self) -> str:
+        """
+        Returns all the key/value pairs in our hash table, in key order.
+        :complexity: O(N * (str(key) + str(value))) where N is the number of pairs, see items.
+        """
+        result = ""
+        for (key, value) in self.items():
+            result += "(" + str(key) + "," + str(value) + ")\n"
+        return result
 
     def get_location(self, key):
         """
@@ -181,20 +421,21 @@ class InfiniteHashTable(Generic[K, V]):
 
 
         """
-        index = self.hash(key) #Assignment is constant --> O(1)
-        entry = self.table[index] #Assignment is constant --> O(1)
-
-        if entry is None: #Checking is constant --> O(1)
-            raise KeyError(key) #Raising doesn't have a complexity
-
-        if isinstance(entry, InfiniteHashTable): #Checking is constant --> O(1)
-            location = [index] #Assignment is constant --> O(1)
-            location.extend(entry.get_location(key)) # O(L)
-            return location #Returning is constant --> O(1)
-        elif entry[0] == key: #Checking is constant --> O(1)
-            return [index] #Returning is constant --> O(1)
-        else: #Checking is constant --> O(1)
-            raise KeyError(key) #Raising doesn't have a complexity
+        location = [] #Assignment is constant --> O(1)
+        table = self #Assignment is constant --> O(1)
+        while True: # Once per level --> O(L)
+            index = table.hash(key) #Assignment is constant --> O(1)
+            entry = table.table[index] #Assignment is constant --> O(1)
+            location.append(index) #Appending is constant --> O(1)
+
+            if isinstance(entry, InfiniteHashTable): #Checking is constant --> O(1)
+                table = entry #Assignment is constant --> O(1)
+            elif type(entry) is list and any(pair[0] == key for pair in entry): #Checking is constant --> O(1)
+                return location #Returning is constant --> O(1)
+            elif type(entry) is tuple and entry[0] == key: #Checking is constant --> O(1)
+                return location #Returning is constant --> O(1)
+            else: #Checking is constant --> O(1)
+                raise KeyError(key) #Raising doesn't have a complexity
 
     def __contains__(self, key: K) -> bool:
         """
@@ -282,8 +282,7 @@ class MyWindow(arcade.Window):
             t = deserialize(json.loads(f.read()))
         try:
             # Try to add all existing mountains
-            for mountain in t.collect_all_mountains():
-                self.mountain_manager.add_mountain(mountain)
+            self.mountain_manager.add_mountains(t.iter_mountains())
         except NotImplementedError:
             pass
         self.mountain = TrailDraw(t)
@@ -392,7 +391,6 @@ class MyWindow(arcade.Window):
         groups = self.mountain_manager.group_by_difficulty()
         to = MountainOrganiser()
         positions = DoubleKeyTable()
-        positions.hash1 = lambda k: (k % positions.table_size)
         all_mountains = []
         for i, group in enumerate(groups):
             to.add_mountains(group)
@@ -1,3 +1,4 @@
+from typing import Iterable
 from mountain import Mountain
 from data_structures.hash_table import LinearProbeTable
 from algorithms.vedanshsort import mergesort
@@ -6,7 +7,7 @@ from algorithms.vedanshsort import mergesort
 class MountainManager:
 
     def __init__(self) -> None:
-        self.mountain_store = LinearProbeTable()
+        self.mountain_store = LinearProbeTable(tombstones=True)
 
     def add_mountain(self, mountain: Mountain)-> None:
         '''
@@ -19,6 +20,18 @@ class MountainManager:
         except: #Constant --> O(1)
             print("Error: could not add mountain to manager, table is full")  #Constant --> O(1)
 
+    def add_mountains(self, mountains: Iterable[Mountain]) -> None:
+        '''
+        Add many mountains to the manager at once, from a list or any other iterable
+
+        Complexity : O(N) where N is the number of mountains, as the store is resized
+                     a single time before they are inserted.
+        '''
+        try: #Constant --> O(1)
+            self.mountain_store.update((mountain.name, mountain) for mountain in mountains) #O(N)
+        except: #Constant --> O(1)
+            print("Error: could not add mountains to manager, table is full")  #Constant --> O(1)
+
     def remove_mountain(self, mountain: Mountain)-> None:
         '''
         Remove a mountain from the manager
@@ -34,6 +47,9 @@ class MountainManager:
                      in the same hash table bucket. In this case, the method needs to probe N positions until it finds the 
                      object's name, and each probe takes O(hash(key)) time to compute the hash function and O(comp(K)) time to 
                      compare names.
+
+                     As the store uses tombstone deletion, the rest of the cluster is not re-inserted, so the
+                     worst case is O(hash(key) + N*comp(K)) plus an occasional O(N) compaction.
         
         
         '''
@@ -79,11 +95,9 @@ class MountainManager:
                             
         '''
         self.matching_difficulty = [] #Assignment is constant --> O(1)
-        for mountian in self.mountain_store.array: #Constant --> O(N)
-            if mountian == None: #Checking is constant --> O(1)
-                pass #Constant --> O(1)
-            elif mountian[1].difficulty_level == diff:  #Checking is constant --> O(1)
-                self.matching_difficulty.append(mountian[1]) #Appending is constant --> O(1)
+        for mountian in self.mountain_store.values(): #Constant --> O(N)
+            if mountian.difficulty_level == diff:  #Checking is constant --> O(1)
+                self.matching_difficulty.append(mountian) #Appending is constant --> O(1)
 
         return self.matching_difficulty #Retunring is constant --> O(1)
  
@@ -104,7 +118,7 @@ class MountainManager:
                             
         '''
         self.grouped = [] #Assignment is constant --> O(1)
-        self.tmp = self.mountain_store.values() #O(N)
+        self.tmp = list(self.mountain_store.values()) #O(N), mergesort needs a list to slice
         self.sorted = mergesort(self.tmp) #O(N log N)
         self.current_difficulty_list = [] #Assignment is constant --> O(1)
         for mountain in self.sorted: #O(N)
@@ -0,0 +1,367 @@
+from __future__ import annotations
+from typing import Generic, Iterator, TypeVar
+
+from data_structures.hashers import Hasher, DEFAULT_HASHER
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class _Node:
+    """
+    A table of a SparseInfiniteHashTable.
+
+    Only the occupied slots are stored: bit i of `bitmap` is set when slot i
+    is, and its entry is children[number of set bits below bit i].
+
+    A chain of tables each holding nothing but the next table is stored as
+    the last one, with the slots of the ones before it in `skip`. The node's
+    own slots are at level `level`, so the chain starts at level
+    level - len(skip).
+    """
+
+    __slots__ = ("level", "skip", "bitmap", "children", "size")
+
+    def __init__(self, level: int, skip: tuple[int, ...] = ()) -> None:
+        self.level = level
+        self.skip = skip
+        self.bitmap = 0
+        self.children = []
+        self.size = 0
+
+    def position(self, index: int) -> int:
+        """
+        Where slot index is, or would be, in children.
+        """
+        return bin(self.bitmap & ((1 << index) - 1)).count("1")
+
+    def add(self, index: int, entry: object) -> None:
+        """
+        Fill the empty slot index with entry.
+
+        :complexity: O(number of children)
+        """
+        self.children.insert(self.position(index), entry)
+        self.bitmap |= 1 << index
+
+    def remove(self, index: int) -> None:
+        """
+        Empty slot index.
+
+        :complexity: O(number of children)
+        """
+        del self.children[self.position(index)]
+        self.bitmap &= ~(1 << index)
+
+
+class SparseInfiniteHashTable(Generic[K, V]):
+    """
+    Infinite Hash Table with sparse tables.
+
+    Holds the same keys in the same places as InfiniteHashTable (so
+    get_location gives the same answers), but stores each table as a bitmap
+    of its occupied slots and a list of just those entries, rather than a
+    list of all TABLE_SIZE slots, and stores chains of tables that each hold
+    only the next table as a single node (see _Node).
+
+    Type Arguments:
+        - K:    Key Type, see InfiniteHashTable.
+        - V:    Value Type.
+
+    Keys are listed in slot order (see items) rather than sorted order.
+
+    Unless stated otherwise, all methods have O(1) complexity.
+    """
+
+    TABLE_SIZE = 27
+
+    def __init__(self, hasher: Hasher|None = None) -> None:
+        self.root = _Node(0)
+        self.hasher = hasher if hasher is not None else DEFAULT_HASHER
+
+    def hash(self, key: K, level: int) -> int:
+        """
+        Position of key at level, the last slot once the key has run out of symbols.
+
+        Complexity: O(1) for strings, see Hasher.level_hash otherwise.
+        """
+        if type(key) is str and self.hasher is DEFAULT_HASHER:
+            if level < len(key):
+                return ord(key[level]) % (self.TABLE_SIZE-1)
+            return self.TABLE_SIZE-1
+        return self.hasher.level_hash(key, level, self.TABLE_SIZE-1)
+
+    def _skips_match(self, key: K, node: _Node) -> bool:
+        """
+        Whether key takes the chain of slots node was reached through.
+
+        :complexity: O(len(node.skip))
+        """
+        start = node.level - len(node.skip)
+        if type(key) is str and self.hasher is DEFAULT_HASHER and node.level <= len(key):
+            # The whole chain is within the key, so no level hashes to the last slot.
+            width = self.TABLE_SIZE - 1
+            for char, index in zip(key[start:node.level], node.skip):
+                if ord(char) % width != index:
+                    return False
+            return True
+        for i, index in enumerate(node.skip):
+            if self.hash(key, start + i) != index:
+                return False
+        return True
+
+    def __getitem__(self, key: K) -> V:
+        """
+        Get the value at a certain key
+
+        :raises KeyError: when the key doesn't exist.
+
+        Complexity: O(n) where n is the number of levels passed through.
+        """
+        node = self.root
+        fast = type(key) is str and self.hasher is DEFAULT_HASHER
+        while True:
+            if node.skip and not self._skips_match(key, node):
+                raise KeyError(key)
+            # self.hash and node.position, inlined for the common case of strings.
+            if fast:
+                level = node.level
+                index = ord(key[level]) % (self.TABLE_SIZE-1) if level < len(key) else self.TABLE_SIZE-1
+            else:
+                index = self.hash(key, node.level)
+            bitmap = node.bitmap
+            if not bitmap >> index & 1:
+                raise KeyError(key)
+            entry = node.children[bin(bitmap & ((1 << index) - 1)).count("1")]
+            if type(entry) is _Node:
+                node = entry
+            elif type(entry) is list:
+                for pair in entry:
+                    if pair[0] == key:
+                        return pair[1]
+                raise KeyError(key)
+            elif entry[0] == key:
+                return entry[1]
+            else:
+                raise KeyError(key)
+
+    def __setitem__(self, key: K, value: V) -> None:
+        """
+        Set an (key, value) pair in our hash table.
+
+        Complexity: O(n) where n is the number of levels passed through, plus
+                    O(TABLE_SIZE) per table changed to insert into its children.
+        """
+        path = [] # Nodes passed through, whose sizes grow if key is new
+        parent, parent_index = None, 0
+        node = self.root
+        while True:
+            if node.skip:
+                start = node.level - len(node.skip)
+                for i, skipped in enumerate(node.skip):
+                    index = self.hash(key, start + i)
+                    if index != skipped:
+                        # key leaves the chain here, which becomes a table with two slots.
+                        fork = _Node(start + i, node.skip[:i])
+                        fork.size = node.size
+                        node.skip = node.skip[i + 1:]
+                        fork.add(skipped, node)
+                        fork.add(index, (key, value))
+                        parent.children[parent.position(parent_index)] = fork
+                        path.append(fork)
+                        for table in path:
+                            table.size += 1
+                        return
+            path.append(node)
+            index = self.hash(key, node.level)
+            if not node.bitmap >> index & 1:
+                node.add(index, (key, value))
+                break
+            position = node.position(index)
+            entry = node.children[position]
+            if type(entry) is _Node:
+                parent, parent_index = node, index
+                node = entry
+            elif type(entry) is list:
+                for i, pair in enumerate(entry):
+                    if pair[0] == key:
+                        entry[i] = (key, value)
+                        return
+                entry.append((key, value))
+                break
+            elif entry[0] == key:
+                node.children[position] = (key, value)
+                return
+            elif index == self.TABLE_SIZE - 1:
+                # Both keys have run out of symbols here, so no level below can tell them apart.
+                node.children[position] = [entry, (key, value)]
+                break
+            else:
+                node.children[position] = self._split(entry, (key, value), node.level + 1)
+                break
+
+        for table in path:
+            table.size += 1
+
+    def _split(self, old: tuple[K, V], new: tuple[K, V], level: int) -> _Node:
+        """
+        The node holding two pairs whose keys take the same slots above
+        level: at the first level where their slots differ (or both keys
+        have run out), with the shared slots before it as its skip.
+
+        :complexity: O(n) where n is the number of levels the keys share.
+        """
+        skip = []
+        while True:
+            old_index = self.hash(old[0], level)
+            new_index = self.hash(new[0], level)
+            if old_index != new_index or new_index == self.TABLE_SIZE - 1:
+                break
+            skip.append(old_index)
+            level += 1
+        node = _Node(level, tuple(skip))
+        if old_index == new_index:
+            node.add(old_index, [old, new])
+        else:
+            node.add(old_index, old)
+            node.add(new_index, new)
+        node.size = 2
+        return node
+
+    def __delitem__(self, key: K) -> None:
+        """
+        Deletes a (key, value) pair in our hash table.
+
+        Like InfiniteHashTable, a table left holding one pair is replaced by
+        that pair. A table left holding nothing but another table joins its
+        chain.
+
+        :raises KeyError: when the key doesn't exist.
+
+        Complexity: O(n) where n is the number of levels passed through, plus
+                    O(TABLE_SIZE) per table changed.
+        """
+        path = [] # (node, slot) of every slot passed through
+        node = self.root
+        while True:
+            if node.skip and not self._skips_match(key, node):
+                raise KeyError(key)
+            index = self.hash(key, node.level)
+            if not node.bitmap >> index & 1:
+                raise KeyError(key)
+            path.append((node, index))
+            position = node.position(index)
+            entry = node.children[position]
+            if type(entry) is _Node:
+                node = entry
+            elif type(entry) is list:
+                for i, pair in enumerate(entry):
+                    if pair[0] == key:
+                        del entry[i]
+                        break
+                else:
+                    raise KeyError(key)
+                if len(entry) == 1:
+                    node.children[position] = entry[0]
+                break
+            elif entry[0] == key:
+                node.remove(index)
+                break
+            else:
+                raise KeyError(key)
+
+        # Walk back up, replacing tables left with one pair by that pair, and
+        # joining tables left with only another table to its chain.
+        for node, index in reversed(path):
+            node.size -= 1
+            if not node.bitmap >> index & 1:
+                continue
+            position = node.position(index)
+            child = node.children[position]
+            if type(child) is not _Node:
+                continue
+            if child.size == 1:
+                node.children[position] = child.children[0]
+            elif len(child.children) == 1 and type(child.children[0]) is _Node:
+                grandchild = child.children[0]
+                grandchild.skip = child.skip + (child.bitmap.bit_length() - 1,) + grandchild.skip
+                node.children[position] = grandchild
+
+    def __len__(self) -> int:
+        """
+        Complexity: O(1)
+        """
+        return self.root.size
+
+    def __contains__(self, key: K) -> bool:
+        """
+        Checks to see if the given key is in the Hash Table
+
+        :complexity: See __getitem__.
+        """
+        try:
+            _ = self[key]
+        except KeyError:
+            return False
+        else:
+            return True
+
+    def get_location(self, key: K) -> list[int]:
+        """
+        Get the sequence of positions required to access this key, the same
+        as InfiniteHashTable.get_location.
+
+        :raises KeyError: when the key doesn't exist.
+
+        Complexity: O(L) where L is the number of levels passed through.
+        """
+        location = []
+        node = self.root
+        while True:
+            if node.skip:
+                if not self._skips_match(key, node):
+                    raise KeyError(key)
+                location.extend(node.skip)
+            index = self.hash(key, node.level)
+            if not node.bitmap >> index & 1:
+                raise KeyError(key)
+            location.append(index)
+            entry = node.children[node.position(index)]
+            if type(entry) is _Node:
+                node = entry
+            elif type(entry) is list and any(pair[0] == key for pair in entry):
+                return location
+            elif type(entry) is tuple and entry[0] == key:
+                return location
+            else:
+                raise KeyError(key)
+
+    def items(self) -> Iterator[tuple[K, V]]:
+        """
+        Iterate the (key, value) pairs in slot order: ordered by get_location,
+        with keys sharing a location in the order they were added.
+
+        Walks the levels with a stack of iterators over the children still to
+        visit, so the pairs of a subtable come out in the place of its slot.
+
+        :complexity: O(N) where N is the number of nodes and pairs.
+        """
+        stack = [iter(self.root.children)] # Children still to visit, per node on the way down
+        while stack:
+            for entry in stack[-1]:
+                if type(entry) is _Node:
+                    stack.append(iter(entry.children))
+                    break
+                elif type(entry) is list:
+                    yield from entry
+                else:
+                    yield entry
+            else:
+                stack.pop()
+
+    def __iter__(self) -> Iterator[K]:
+        """
+        Iterate the keys, in slot order, see items.
+        """
+        for key, _ in self.items():
+            yield key
@@ -1,7 +1,17 @@
+import pickle
+import random
+import sys
+import threading
 import unittest
 from ed_utils.decorators import number
 
 from double_key_table import DoubleKeyTable
+from concurrent_double_key_table import ConcurrentDoubleKeyTable
+
+class LengthHashTable(DoubleKeyTable):
+    def hash2(self, key, sub_table):
+        return len(key) % sub_table.table_size
+
 
 class TestDoubleHash(unittest.TestCase):
 
@@ -123,3 +133,320 @@ class TestDoubleHash(unittest.TestCase):
         # with an iterator.
         self.assertRaises(BaseException, lambda: next(key_iterator))
         self.assertRaises(BaseException, lambda: next(value_iterator))
+
+    @number("3.6")
+    def test_cached_hashes(self):
+        calls = []
+        class CountingTable(DoubleKeyTable):
+            def full_hash(self, key):
+                calls.append(key)
+                return super().full_hash(key)
+
+        dt = CountingTable()
+        for i in range(20):
+            dt[f"k{i}", "a"] = i
+        # key1 is hashed once per insert, rehashing the primary table reuses it.
+        self.assertEqual(len(calls), 20)
+        self.assertEqual(dt.table_size, 53)
+        for i in range(20):
+            self.assertEqual(dt[f"k{i}", "a"], i)
+
+    @number("3.7")
+    def test_shrink(self):
+        dt = DoubleKeyTable()
+        for i in range(100):
+            dt[f"k{i}", "a"] = i
+            dt[f"k{i}", "b"] = -i
+        grown = dt.table_size
+        for i in range(97):
+            size = dt.table_size
+            del dt[f"k{i}", "a"]
+            # Deleting one of two key2s leaves key1 in place.
+            self.assertEqual(dt.table_size, size)
+            del dt[f"k{i}", "b"]
+        self.assertLess(dt.table_size, grown)
+        self.assertEqual(sorted(dt.keys()), ["k97", "k98", "k99"])
+        for i in range(97, 100):
+            self.assertEqual(dt[f"k{i}", "a"], i)
+            self.assertEqual(dt[f"k{i}", "b"], -i)
+
+    @number("3.8")
+    def test_views(self):
+        dt = DoubleKeyTable()
+        dt["Tim", "Jen"] = 1
+        dt["Tim", "Bob"] = 2
+        dt["Amy", "Ben"] = 3
+
+        keys = dt.keys()
+        self.assertEqual(len(keys), 2)
+        self.assertIn("Tim", keys)
+        self.assertNotIn("Bob", keys)
+        self.assertEqual(len(dt.values()), 3)
+        self.assertIn(3, dt.values())
+        self.assertEqual(set(dt.items("Tim")), {("Jen", 1), ("Bob", 2)})
+        self.assertEqual(set(dt), {("Tim", "Jen"), ("Tim", "Bob"), ("Amy", "Ben")})
+        self.assertIn((("Amy", "Ben"), 3), dt.items())
+
+        dt["May", "Jim"] = 4
+        self.assertEqual(set(keys), {"Tim", "Amy", "May"})
+        with self.assertRaises(RuntimeError):
+            for key1, key2 in dt:
+                del dt[key1, key2]
+
+    @number("3.9")
+    def test_int_keys(self):
+        # Integer key1s need no custom hash1.
+        dt = DoubleKeyTable()
+        for level in range(10):
+            dt[level, f"m{level}"] = level
+        for level in range(10):
+            self.assertEqual(dt[level, f"m{level}"], level)
+        self.assertEqual(set(dt.keys()), set(range(10)))
+
+    @number("3.10")
+    def test_incremental_resize(self):
+        dt = DoubleKeyTable(incremental=True)
+        for i in range(100):
+            dt[f"k{i}", "a"] = i
+            self.assertEqual(dt[f"k{i // 2}", "a"], i // 2)
+        self.assertIsNotNone(dt._old_primary)
+
+        dt["k0", "b"] = -1
+        del dt["k1", "a"]
+        self.assertEqual(dt["k0", "b"], -1)
+        self.assertNotIn(("k1", "a"), dt)
+        self.assertEqual(len(dt), 100)
+        self.assertEqual(len(dt.keys()), 99)
+
+        self.assertEqual(set(dt.keys()), {f"k{i}" for i in range(100)} - {"k1"})
+        self.assertIsNone(dt._old_primary)
+
+        # Many key2s per key1, so inner tables grow and are used mid-resize too.
+        rng = random.Random(0)
+        dt = DoubleKeyTable(incremental=True, expected_fanout=1)
+        expected = {}
+        inner_resized = False
+        for i in range(3000):
+            key = (f"k{rng.randrange(20)}", f"m{rng.randrange(40)}")
+            if key in expected and rng.random() < 0.4:
+                del dt[key]
+                del expected[key]
+                self.assertNotIn(key, dt)
+            else:
+                dt[key] = i
+                expected[key] = i
+                self.assertEqual(dt[key], i)
+                position, _ = dt._linear_probe(key[0], None, False)
+                inner_resized = inner_resized or dt.primary_table[position][1]._old_table is not None
+        self.assertTrue(inner_resized)
+        for key, value in expected.items():
+            self.assertEqual(dt[key], value)
+        self.assertEqual(len(dt), len(expected))
+        self.assertEqual(dict(dt.items()), expected)
+
+    @number("3.11")
+    def test_key1_count(self):
+        rng = random.Random(0)
+        for incremental in (False, True):
+            with self.subTest(incremental=incremental):
+                dt = DoubleKeyTable(incremental=incremental)
+                expected = {}
+                for i in range(3000):
+                    key = (f"k{rng.randrange(200)}", f"m{rng.randrange(3)}")
+                    if key in expected and rng.random() < 0.45:
+                        del dt[key]
+                        del expected[key]
+                    else:
+                        dt[key] = i
+                        expected[key] = i
+                    self.assertEqual(dt._key1_count, len({key1 for key1, _ in expected}))
+                self.assertEqual(len(dt), len(expected))
+                self.assertEqual(dict(dt.items()), expected)
+
+    @number("3.12")
+    def test_inner_tables_move_by_reference(self):
+        dt = DoubleKeyTable()
+        dt["Tim", "Jen"] = 1
+        dt["Tim", "Bob"] = 2
+        inner = dt._internal_table("Tim")
+        for i in range(50):
+            dt[f"k{i}", "a"] = i
+        # Grown several times, and the inner table for Tim is still the same object.
+        self.assertIs(dt._internal_table("Tim"), inner)
+        self.assertEqual(len(dt), 52)
+
+        # Removing key1s repairs clusters without rebuilding the other inner tables.
+        for i in range(40):
+            del dt[f"k{i}", "a"]
+        self.assertIs(dt._internal_table("Tim"), inner)
+        self.assertEqual(len(dt), 12)
+        self.assertEqual(dt["Tim", "Bob"], 2)
+
+    @number("3.13")
+    def test_shared_second_key_hash(self):
+        dt = LengthHashTable(incremental=True)
+        for i in range(100):
+            dt[f"k{i}", f"m{i % 7}"] = i
+        # Every inner table shares one picklable hash object instead of a closure each.
+        inner_hashes = {id(dt._internal_table(f"k{i}").table_hash) for i in range(100)}
+        self.assertEqual(inner_hashes, {id(dt._second_key_hash)})
+
+        copy = pickle.loads(pickle.dumps(dt))
+        self.assertEqual(dict(copy.items()), dict(dt.items()))
+        self.assertIs(copy._internal_table("k5").table_hash, copy._second_key_hash)
+        copy["k5", "new"] = -1
+        self.assertEqual(copy["k5", "new"], -1)
+
+    @number("3.14")
+    def test_inner_table_sizing(self):
+        dt = DoubleKeyTable(expected_fanout=100)
+        dt["Tim", "Jen"] = 1
+        self.assertEqual(dt._internal_table("Tim").table_size, 389)
+
+        # Without a hint, new inner tables start large enough for the mean fanout so far.
+        dt = DoubleKeyTable()
+        for j in range(60):
+            dt["Tim", f"m{j}"] = j
+        dt["Amy", "Ben"] = 1
+        self.assertEqual(dt._internal_table("Amy").table_size, 193)
+        self.assertEqual(dt["Amy", "Ben"], 1)
+
+        # Fixed internal sizes are left alone.
+        dt = DoubleKeyTable(internal_sizes=[5, 13])
+        for j in range(6):
+            dt["Tim", f"m{j}"] = j
+        dt["Amy", "Ben"] = 1
+        self.assertEqual(dt._internal_table("Amy").table_size, 5)
+
+    @number("3.15")
+    def test_ordered_key_index(self):
+        rng = random.Random(15)
+        for incremental in (False, True):
+            with self.subTest(incremental=incremental):
+                dt = DoubleKeyTable(ordered=True, incremental=incremental)
+                expected = {}
+                for i in range(2000):
+                    key = (f"k{rng.randrange(5)}", rng.randrange(300))
+                    if key in expected and rng.random() < 0.4:
+                        del dt[key]
+                        del expected[key]
+                    else:
+                        dt[key] = i
+                        expected[key] = i
+                for key1 in {key1 for key1, _ in expected}:
+                    key2s = sorted(key2 for k1, key2 in expected if k1 == key1)
+                    self.assertEqual(list(dt.keys(key1)), key2s)
+                    self.assertEqual(list(dt.items(key1)), [(key2, expected[key1, key2]) for key2 in key2s])
+                    self.assertEqual(list(dt.iter_keys(key1, 100, 200)), [k for k in key2s if 100 <= k < 200])
+                    self.assertEqual(list(dt.iter_keys(key1, stop=50)), [k for k in key2s if k < 50])
+                    self.assertEqual(dt.min_key(key1), key2s[0])
+                    self.assertEqual(dt.max_key(key1), key2s[-1])
+
+        self.assertRaises(KeyError, lambda: dt.min_key("missing"))
+        self.assertRaises(ValueError, lambda: dt.iter_keys(None, 1, 2))
+        self.assertRaises(ValueError, lambda: DoubleKeyTable().iter_keys("Tim", 1, 2))
+
+    @number("3.16")
+    def test_concurrent_writers(self):
+        dt = ConcurrentDoubleKeyTable(stripes=4)
+        results = []
+        errors = []
+
+        def work(worker):
+            rng = random.Random(worker)
+            expected = {}
+            try:
+                for i in range(1500):
+                    # Key1s are shared between workers, key2s are not.
+                    key = (f"k{rng.randrange(40)}", f"w{worker}-{rng.randrange(20)}")
+                    if key in expected and rng.random() < 0.4:
+                        del dt[key]
+                        del expected[key]
+                    else:
+                        dt[key] = i
+                        expected[key] = i
+                    if rng.random() < 0.01:
+                        list(dt.iter_keys())
+                for key, value in expected.items():
+                    self.assertEqual(dt[key], value)
+            except Exception as e:
+                errors.append(e)
+            results.append(expected)
+
+        old_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [threading.Thread(target=work, args=(worker,)) for worker in range(6)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(old_interval)
+
+        self.assertEqual(errors, [])
+        expected = {key: value for result in results for key, value in result.items()}
+        self.assertEqual(dict(dt.items()), expected)
+        self.assertEqual(len(dt), len(expected))
+        self.assertEqual(dt._key1_count, len({key1 for key1, _ in expected}))
+        self.assertEqual(len(dt.keys()), dt._key1_count)
+
+        copy = pickle.loads(pickle.dumps(dt))
+        self.assertEqual(dict(copy.items()), expected)
+        copy["new", "pair"] = 1
+        self.assertEqual(copy["new", "pair"], 1)
+
+    @number("3.17")
+    def test_snapshot(self):
+        rng = random.Random(17)
+        for kwargs in ({}, {"incremental": True}, {"ordered": True}):
+            with self.subTest(**kwargs):
+                dt = DoubleKeyTable(**kwargs)
+                for i in range(300):
+                    dt[f"k{rng.randrange(60)}", f"m{rng.randrange(10)}"] = i
+                before = dict(dt.items())
+                snapshot = dt.snapshot()
+
+                # Overwrite, insert, delete whole key1s and grow the primary table.
+                expected = dict(before)
+                for i in range(1500):
+                    key = (f"k{rng.randrange(200)}", f"m{rng.randrange(10)}")
+                    if key in expected and rng.random() < 0.5:
+                        del dt[key]
+                        del expected[key]
+                    else:
+                        dt[key] = -i
+                        expected[key] = -i
+                    if i == 700:
+                        # Scans of one snapshot stay consistent while a second one is taken.
+                        middle = dict(dt.items())
+                        second = dt.snapshot()
+
+                self.assertEqual(dict(dt.items()), expected)
+                self.assertEqual(dict(snapshot.items()), before)
+                self.assertEqual(len(snapshot), len(before))
+                self.assertEqual(dict(second.items()), middle)
+                for key, value in before.items():
+                    self.assertEqual(snapshot[key], value)
+                self.assertNotIn(("k199", "m0"), snapshot)
+                self.assertEqual(set(snapshot.keys()), {key1 for key1, _ in before})
+                self.assertEqual(sorted(snapshot.keys("k1")), sorted(k2 for k1, k2 in before if k1 == "k1"))
+
+        # Only the inner tables written to are copied.
+        dt = DoubleKeyTable()
+        dt["Tim", "Jen"] = 1
+        dt["Amy", "Ben"] = 2
+        snapshot = dt.snapshot()
+        dt["Tim", "Bob"] = 3
+        self.assertIs(dt._internal_table("Amy"), snapshot._entry("Amy")[1])
+        self.assertIsNot(dt._internal_table("Tim"), snapshot._entry("Tim")[1])
+        self.assertEqual(list(snapshot.items("Tim")), [("Jen", 1)])
+
+        # Copied once per snapshot, and copied again after the next one.
+        inner = dt._internal_table("Tim")
+        dt["Tim", "Sam"] = 4
+        self.assertIs(dt._internal_table("Tim"), inner)
+        second = dt.snapshot()
+        dt["Tim", "Kim"] = 5
+        self.assertIsNot(dt._internal_table("Tim"), inner)
+        self.assertEqual(sorted(second.items("Tim")), [("Bob", 3), ("Jen", 1), ("Sam", 4)])
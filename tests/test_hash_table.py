@@ -0,0 +1,261 @@
+import random
+import unittest
+from ed_utils.decorators import number
+
+from data_structures.hash_table import LinearProbeTable, ProbeStrategy, FullError
+from data_structures.table_sizes import PrimeSizes, is_prime
+from data_structures.hashers import DefaultHasher
+from data_structures.column_probe_table import ColumnProbeTable
+
+class TestLinearProbeTable(unittest.TestCase):
+
+    @number("9.1")
+    def test_bulk_load(self):
+        items = [(f"m{i}", i) for i in range(1000)]
+        table = LinearProbeTable.from_items(items)
+
+        self.assertEqual(len(table), 1000)
+        # Smallest size keeping the load factor at or below 0.5.
+        self.assertEqual(table.table_size, 3079)
+        for key, value in items:
+            self.assertEqual(table[key], value)
+
+        # Updating existing keys doesn't change the count.
+        table.update([("m1", -1), ("new", 5)])
+        self.assertEqual(len(table), 1001)
+        self.assertEqual(table["m1"], -1)
+        self.assertEqual(table["new"], 5)
+
+        # Fixed sizes can't grow past their last entry.
+        small = LinearProbeTable.from_items([("a", 1), ("b", 2)], sizes=[5])
+        self.assertEqual(small.table_size, 5)
+        self.assertEqual(set(small.keys()), {"a", "b"})
+
+    @number("9.2")
+    def test_cached_hashes(self):
+        class CountingTable(LinearProbeTable):
+            calls = 0
+            def full_hash(self, key):
+                CountingTable.calls += 1
+                return super().full_hash(key)
+
+        table = CountingTable()
+        for i in range(200):
+            table[f"m{i}"] = i
+        # Resizing and cluster repair reuse the stored hashes.
+        self.assertEqual(CountingTable.calls, 200)
+        for i in range(0, 200, 2):
+            del table[f"m{i}"]
+        self.assertEqual(CountingTable.calls, 300)
+        self.assertEqual(sorted(table.values()), list(range(1, 200, 2)))
+
+        # Overwriting hash still works, positions being recomputed on resize.
+        table = LinearProbeTable(sizes=[5, 13])
+        table.hash = lambda k: len(k) % table.table_size
+        for key in ["a", "bb", "ccc"]:
+            table[key] = key
+        self.assertEqual(table.table_size, 13)
+        self.assertEqual(table._linear_probe("bb", False), 2)
+
+    @number("9.3")
+    def test_tombstones(self):
+        table = LinearProbeTable(sizes=[13], tombstones=True, max_tombstone_ratio=0.3)
+        table.hash = lambda k: 0
+        for key in "abcde":
+            table[key] = key
+        # All keys share a cluster, so deleting leaves tombstones behind.
+        del table["b"]
+        del table["c"]
+        self.assertEqual(table.tombstone_count, 2)
+        self.assertEqual(len(table), 3)
+        self.assertNotIn("b", table)
+        self.assertEqual(table["e"], "e")
+        self.assertEqual(set(table.keys()), {"a", "d", "e"})
+
+        # Inserts reuse the first tombstone, without duplicating existing keys.
+        table["e"] = "E"
+        table["f"] = "f"
+        self.assertEqual(table._linear_probe("f", False), 1)
+        self.assertEqual(table.tombstone_count, 1)
+        self.assertEqual(len(table), 4)
+        self.assertEqual(table["e"], "E")
+
+        # Passing the tombstone ratio compacts the table in place.
+        for key in "adef":
+            del table[key]
+        self.assertEqual(table.tombstone_count, 0)
+        self.assertEqual(len(table), 0)
+        self.assertEqual(list(table.keys()), [])
+
+    def check_random_operations(self, table):
+        """Apply random inserts/deletes to table and a dict, and compare them."""
+        rng = random.Random(1)
+        expected = {}
+        for i in range(2000):
+            key = f"k{rng.randrange(300)}"
+            if key in expected and rng.random() < 0.4:
+                del table[key]
+                del expected[key]
+            else:
+                table[key] = i
+                expected[key] = i
+        self.assertEqual(len(table), len(expected))
+        self.assertEqual(sorted(table.keys()), sorted(expected))
+        self.assertEqual(sorted(table.values()), sorted(expected.values()))
+        for key, value in expected.items():
+            self.assertEqual(table[key], value)
+            self.assertGreaterEqual(table.probe_length(key), 1)
+        self.assertNotIn("missing", table)
+
+    @number("9.4")
+    def test_probe_strategies(self):
+        for strategy in ProbeStrategy:
+            with self.subTest(strategy=strategy):
+                self.check_random_operations(LinearProbeTable(probing=strategy))
+
+    @number("9.5")
+    def test_robin_hood(self):
+        table = LinearProbeTable(sizes=[13], probing=ProbeStrategy.ROBIN_HOOD)
+        homes = {"a": 0, "b": 0, "c": 1, "d": 1}
+        table.hash = lambda k: homes[k]
+        table["a"] = 1
+        table["c"] = 2
+        # b is further from home at slot 1 than c would be, so c moves along.
+        table["b"] = 3
+        self.assertEqual([table._linear_probe(k, False) for k in "abc"], [0, 1, 2])
+        self.assertEqual(table.probe_length("c"), 2)
+        table["d"] = 4
+        self.assertEqual(table._linear_probe("d", False), 3)
+
+        # Deleting shifts the rest of the cluster back.
+        del table["a"]
+        self.assertEqual([table._linear_probe(k, False) for k in "bcd"], [0, 1, 2])
+        self.assertRaises(ValueError, lambda: LinearProbeTable(tombstones=True, probing=ProbeStrategy.ROBIN_HOOD))
+
+    @number("9.6")
+    def test_column_layout(self):
+        for strategy in ProbeStrategy:
+            with self.subTest(strategy=strategy):
+                self.check_random_operations(ColumnProbeTable(probing=strategy))
+        with self.subTest(tombstones=True):
+            self.check_random_operations(ColumnProbeTable(tombstones=True))
+
+        table = ColumnProbeTable.from_items([("a", 1), ("b", 2)])
+        position = table._linear_probe("a", False)
+        self.assertEqual(table.array[position], "a")
+        self.assertEqual(table.value_array[position], 1)
+        del table["a"]
+        self.assertIsNone(table.value_array[position])
+
+    @number("9.7")
+    def test_shrink_after_mass_delete(self):
+        for tombstones in (False, True):
+            with self.subTest(tombstones=tombstones):
+                table = LinearProbeTable.from_items(((str(i), i) for i in range(1000)), tombstones=tombstones)
+                grown = table.table_size
+                for i in range(995):
+                    del table[str(i)]
+                self.assertLess(table.table_size, grown)
+                self.assertLessEqual(len(table), table.table_size / 4)
+                self.assertEqual(sorted(table.values()), list(range(995, 1000)))
+                # Shrinking stops at the smallest size.
+                for i in range(995, 1000):
+                    del table[str(i)]
+                self.assertEqual(table.table_size, table.TABLE_SIZES[0])
+
+    @number("9.8")
+    def test_unbounded_growth(self):
+        sizes = PrimeSizes([5, 13])
+        table = LinearProbeTable(sizes)
+        for i in range(1000):
+            table[str(i)] = i
+        self.assertGreater(table.table_size, 2000)
+        self.assertTrue(all(is_prime(size) for size in sizes))
+        self.assertTrue(all(b >= 2 * a for a, b in zip(sizes, sizes[1:])))
+        self.assertEqual(sorted(table.values()), list(range(1000)))
+
+        bulk = LinearProbeTable.from_items(((str(i), i) for i in range(1000)), sizes=PrimeSizes([5]))
+        self.assertGreaterEqual(bulk.table_size, 2000)
+
+        # A plain list of sizes stays capped.
+        capped = LinearProbeTable([5])
+        for i in range(5):
+            capped[str(i)] = i
+        self.assertRaises(FullError, capped.__setitem__, "5", 5)
+
+    @number("9.9")
+    def test_views(self):
+        for cls in (LinearProbeTable, ColumnProbeTable):
+            with self.subTest(cls=cls.__name__):
+                table = cls.from_items([("a", 1), ("b", 2)])
+                keys, values, items = table.keys(), table.values(), table.items()
+                self.assertEqual((len(keys), len(values), len(items)), (2, 2, 2))
+                self.assertIn("a", keys)
+                self.assertNotIn("c", keys)
+                self.assertIn(2, values)
+                self.assertIn(("b", 2), items)
+                self.assertNotIn(("b", 1), items)
+
+                # Views are live.
+                table["c"] = 3
+                self.assertEqual(sorted(keys), ["a", "b", "c"])
+                self.assertEqual(sorted(items), [("a", 1), ("b", 2), ("c", 3)])
+
+                # Changing values while iterating is fine, adding or removing keys is not.
+                for key in table.keys():
+                    table[key] = 0
+                self.assertEqual(list(values), [0, 0, 0])
+                with self.assertRaises(RuntimeError):
+                    for key in table.keys():
+                        del table[key]
+                with self.assertRaises(RuntimeError):
+                    for key in table.keys():
+                        table[key + "!"] = 0
+
+    @number("9.10")
+    def test_hasher(self):
+        table = LinearProbeTable()
+        for i in range(100):
+            table[i] = str(i)
+            table[(i, str(i))] = i
+        for i in range(100):
+            self.assertEqual(table[i], str(i))
+            self.assertEqual(table[(i, str(i))], i)
+        # Integer keys hash to themselves.
+        self.assertEqual(table.full_hash(42), 42)
+
+        class ModHasher(DefaultHasher):
+            def full_hash(self, key):
+                return key % 3
+        table = LinearProbeTable(hasher=ModHasher())
+        table[4] = "a"
+        table[7] = "b"
+        self.assertEqual(table.probe_length(7), 2)
+
+    @number("9.11")
+    def test_incremental_resize(self):
+        table = LinearProbeTable(incremental=True)
+        keys = [f"k{i}" for i in range(200)]
+        for i, key in enumerate(keys):
+            table[key] = i
+            # Every key stays reachable while items are split over both arrays.
+            self.assertEqual(table[keys[i // 2]], i // 2)
+            self.assertGreaterEqual(table.probe_length(keys[i // 2]), 1)
+            self.assertEqual(len(table), i + 1)
+        self.assertIsNotNone(table._old_table)
+
+        # Overwrite and delete keys that may still be in the old array.
+        table["k0"] = -1
+        del table["k1"]
+        self.assertEqual(table["k0"], -1)
+        self.assertNotIn("k1", table)
+        self.assertEqual(len(table), 199)
+
+        # Iterating finishes the resize.
+        self.assertEqual(len(list(table.keys())), 199)
+        self.assertIsNone(table._old_table)
+
+        for cls in (LinearProbeTable, ColumnProbeTable):
+            for strategy in ProbeStrategy:
+                with self.subTest(cls=cls.__name__, strategy=strategy):
+                    self.check_random_operations(cls(probing=strategy, incremental=True))
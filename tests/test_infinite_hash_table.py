@@ -1,7 +1,10 @@
+import random
 import unittest
+from unittest.mock import patch
 from ed_utils.decorators import number
 
 from infinite_hash_table import InfiniteHashTable
+from sparse_infinite_hash_table import SparseInfiniteHashTable
 
 class TestInfiniteHash(unittest.TestCase):
 
@@ -67,3 +70,158 @@ class TestInfiniteHash(unittest.TestCase):
         ih["lin"] = 10
         self.assertEqual(ih.get_location("lin"), [4])
         self.assertEqual(len(ih), 1)
+
+    @number("4.3")
+    def test_int_and_tuple_keys(self):
+        ih = InfiniteHashTable()
+        ih[12] = "a"
+        ih[123] = "b"
+        ih[7] = "c"
+        # Integers are split into decimal digits: "12" and "123" share the prefix "12".
+        self.assertEqual(ih.get_location(12), [ord("1") % 26, ord("2") % 26, 26])
+        self.assertEqual(ih[123], "b")
+        self.assertEqual(ih[7], "c")
+
+        ih[("lin", "leg")] = 1
+        ih[("lin", "mine")] = 2
+        self.assertEqual(ih[("lin", "leg")], 1)
+        self.assertEqual(ih[("lin", "mine")], 2)
+        self.assertEqual(len(ih), 5)
+
+    @number("4.4")
+    def test_sorted_iteration(self):
+        rng = random.Random(4)
+        names = [f"default-{rng.getrandbits(16):04x}" for _ in range(300)]
+        # Characters sharing slots ("0" / "d", "-" / "a", "A" / "a"), prefixes of other keys,
+        # and keys that no level tells apart.
+        names += ["", "a", "-", "A", "ab", "abc", "0a", "da", "0d", "dd", "d0", "00"]
+        expected = {}
+        ih = InfiniteHashTable()
+        for i, name in enumerate(names):
+            ih[name] = i
+            expected[name] = i
+        for name in rng.sample(sorted(expected), 100):
+            del ih[name]
+            del expected[name]
+
+        self.assertEqual(list(ih.keys()), sorted(expected))
+        self.assertEqual(list(ih.items()), sorted(expected.items()))
+        self.assertEqual(list(ih.values()), [expected[name] for name in sorted(expected)])
+        self.assertEqual(len(ih), len(expected))
+        for name, value in expected.items():
+            self.assertEqual(ih[name], value)
+        self.assertEqual(str(ih), "".join(f"({name},{expected[name]})\n" for name in sorted(expected)))
+
+        ih = InfiniteHashTable()
+        ih["0a"] = 1
+        ih["da"] = 2
+        self.assertEqual(ih.get_location("0a"), [22, 19, 26])
+        self.assertEqual(ih.get_location("da"), [22, 19, 26])
+        del ih["0a"]
+        self.assertEqual(ih.get_location("da"), [22])
+        self.assertRaises(KeyError, lambda: ih["0a"])
+
+    @number("4.5")
+    def test_deep_keys(self):
+        # Far more levels than the recursion limit allows.
+        ih = InfiniteHashTable()
+        long_key = "m" * 5000
+        ih[long_key] = 1
+        ih[long_key + "a"] = 2
+        self.assertEqual(ih[long_key + "a"], 2)
+        self.assertEqual(len(ih.get_location(long_key)), 5001)
+        self.assertEqual(list(ih), [long_key, long_key + "a"])
+        del ih[long_key + "a"]
+        self.assertEqual(ih.get_location(long_key), [ord("m") % 26])
+
+    @number("4.6")
+    def test_prefix_search(self):
+        rng = random.Random(6)
+        names = [f"default-{rng.getrandbits(16):04x}" for _ in range(300)]
+        names += [f"peak-{i}" for i in range(40)] + ["", "d", "de", "0efault-1", "dEfault"]
+        ih = InfiniteHashTable()
+        for i, name in enumerate(names):
+            ih[name] = i
+        expected = {name: i for i, name in enumerate(names)}
+
+        for prefix in ["", "d", "default-", "default-0", "default-d", "default-a1", "peak-1", "0", "dE", "x", "default-0000000"]:
+            with self.subTest(prefix=prefix):
+                matches = sorted(name for name in expected if name.startswith(prefix))
+                self.assertEqual(list(ih.keys_with_prefix(prefix)), matches)
+                self.assertEqual(list(ih.items_with_prefix(prefix)), [(name, expected[name]) for name in matches])
+                self.assertEqual(ih.count_with_prefix(prefix), len(matches))
+
+        # No other key shares the slots of "peak-", so its matches are counted without listing them.
+        with patch.object(InfiniteHashTable, "items", side_effect=AssertionError) as items:
+            self.assertEqual(ih.count_with_prefix("peak-"), 40)
+        items.assert_not_called()
+
+        ih = InfiniteHashTable()
+        ih[12] = "a"
+        ih[123] = "b"
+        ih[7] = "c"
+        self.assertEqual(list(ih.keys_with_prefix(12)), [12, 123])
+        self.assertEqual(ih.count_with_prefix(1), 2)
+
+    @number("4.7")
+    def test_sparse_matches_list_tables(self):
+        rng = random.Random(7)
+        names = [f"default-{rng.getrandbits(24):06x}" for _ in range(400)]
+        names += ["lin", "leg", "mine", "linked", "limp", "mining", "jake", "0a", "da", "", "d", "m" * 30, "m" * 31]
+        ih = InfiniteHashTable()
+        sparse = SparseInfiniteHashTable()
+        for step in range(3000):
+            name = rng.choice(names)
+            if name in ih and rng.random() < 0.4:
+                del ih[name]
+                del sparse[name]
+            else:
+                ih[name] = step
+                sparse[name] = step
+            if step % 100 == 0:
+                with self.subTest(step=step):
+                    self.assertEqual(len(sparse), len(ih))
+                    self.assertEqual(sorted(sparse.items()), list(ih.items()))
+                    for key in names:
+                        if key in ih:
+                            self.assertEqual(sparse[key], ih[key])
+                            self.assertEqual(sparse.get_location(key), ih.get_location(key))
+                        else:
+                            self.assertNotIn(key, sparse)
+                            self.assertRaises(KeyError, sparse.get_location, key)
+
+        # Two keys sharing 30 levels take one node rather than 30.
+        sparse = SparseInfiniteHashTable()
+        sparse["m" * 30 + "a"] = 1
+        sparse["m" * 30 + "b"] = 2
+        self.assertEqual(sparse.get_location("m" * 30 + "b"), [ord("m") % 26] * 30 + [ord("b") % 26])
+        node = sparse.root.children[0]
+        self.assertEqual((node.level, len(node.skip), len(node.children)), (30, 29, 2))
+        self.assertRaises(KeyError, lambda: sparse["m" * 29 + "xa"])
+
+    @number("4.8")
+    def test_sparse_slot_order(self):
+        sparse = SparseInfiniteHashTable()
+        for key in ["c", "by", "a", "bx"]:
+            sparse[key] = key
+        self.assertEqual(list(sparse), ["a", "bx", "by", "c"])
+        self.assertEqual(list(sparse.items()), [(key, key) for key in ["a", "bx", "by", "c"]])
+
+        rng = random.Random(8)
+        keys = list({"".join(rng.choices("hijklmnopqrstuvwxyz", k=4)) for _ in range(500)})
+        keys += ["0a", "da", "lin", "leg", "linked", "l", ""]
+        sparse = SparseInfiniteHashTable()
+        for key in keys:
+            sparse[key] = key
+        # Slot order is the order of locations (keys sharing one, like "0a" and "da", in the order added).
+        self.assertEqual(list(sparse), sorted(keys, key=lambda key: (sparse.get_location(key), keys.index(key))))
+
+        # h to z take slots 0 to 18 in order, so for keys of one length using only
+        # them slot order is sorted order, the order InfiniteHashTable lists.
+        same_length = [key for key in keys if len(key) == 4]
+        ih = InfiniteHashTable()
+        sparse = SparseInfiniteHashTable()
+        for key in same_length:
+            ih[key] = key
+            sparse[key] = key
+        self.assertEqual(list(sparse), list(ih))
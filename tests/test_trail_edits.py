@@ -111,4 +111,31 @@ class TestTrailMethods(unittest.TestCase):
         res = t.remove_branch()
         self.assertIsInstance(res, TrailSeries)
         self.assertEqual(res.mountain, m)
-        self.assertEqual(res.following.store, None)
\ No newline at end of file
+        self.assertEqual(res.following.store, None)
+
+    @number("1.5")
+    def test_identity_and_structure(self):
+        def build(last: Mountain) -> Trail:
+            return Trail(TrailSplit(
+                Trail(TrailSeries(Mountain("a", 1, 1), Trail(None))),
+                Trail(None),
+                Trail(TrailSeries(last, Trail(None))),
+            ))
+
+        first, second = build(Mountain("b", 2, 2)), build(Mountain("b", 2, 2))
+        self.assertNotEqual(first, second)
+        self.assertEqual(len({first, second, first.store, second.store}), 4)
+        self.assertEqual(len({Trail(None) for _ in range(100)}), 100)
+        self.assertTrue(first.structurally_equal(second))
+        self.assertTrue(first.store.structurally_equal(second.store))
+        self.assertTrue(first.store.path_top.store.structurally_equal(second.store.path_top.store))
+        self.assertFalse(first.structurally_equal(build(Mountain("c", 2, 2))))
+        self.assertFalse(first.structurally_equal(Trail(None)))
+        self.assertFalse(first.store.structurally_equal(first.store.path_top.store))
+
+        # Long trails are compared without recursing.
+        first, second = Trail(None), Trail(None)
+        for i in range(5000):
+            first = Trail(TrailSeries(Mountain(str(i), 1, 1), first))
+            second = Trail(TrailSeries(Mountain(str(i), 1, 1), second))
+        self.assertTrue(first.structurally_equal(second))
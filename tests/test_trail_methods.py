@@ -1,8 +1,11 @@
+import math
+import random
 import unittest
 from ed_utils.decorators import number
 
 from mountain import Mountain
-from trail import Trail, TrailSeries, TrailSplit, TrailStore
+from personality import TopWalker
+from trail import CompiledTrail, Trail, TrailSeries, TrailSplit, TrailStore
 
 class TestTrailMethods(unittest.TestCase):
 
@@ -57,3 +60,164 @@ class TestTrailMethods(unittest.TestCase):
             self.top_bot, self.top_top, self.top_mid,
             self.bot_one, self.bot_two, self.final
         ])))
+
+    @number("8.1")
+    def test_iter_mountains(self):
+        self.load_example()
+        names = lambda mountains: [mountain.name for mountain in mountains]
+        expected = ["top-top", "top-bot", "top-mid", "bot-one", "bot-two", "final"]
+        self.assertEqual(names(self.trail.iter_mountains()), expected)
+        self.assertEqual(names(self.trail.collect_all_mountains()), expected)
+
+        # Walks keep their own state, so they can be interleaved.
+        first, second = self.trail.iter_mountains(), self.trail.iter_mountains()
+        self.assertEqual(names([next(first), next(first), next(second), next(first), next(second)]),
+                         ["top-top", "top-bot", "top-top", "top-mid", "top-bot"])
+        self.assertFalse(hasattr(self.trail, "frontier"))
+
+        self.assertEqual(list(Trail(None).iter_mountains()), [])
+        empty_split = Trail(TrailSplit(Trail(None), Trail(None), Trail(TrailSeries(self.final, Trail(None)))))
+        self.assertEqual(empty_split.collect_all_mountains(), [self.final])
+
+        # A long trail with many splits, each mountain listed once.
+        trail = Trail(None)
+        for i in range(20000):
+            trail = Trail(TrailSeries(Mountain(f"m{i}", 1, 1), trail))
+            if i % 10 == 0:
+                trail = Trail(TrailSplit(Trail(TrailSeries(Mountain(f"t{i}", 1, 1), Trail(None))), Trail(None), trail))
+        found = names(trail.collect_all_mountains())
+        self.assertEqual(len(found), 22000)
+        self.assertEqual(len(set(found)), 22000)
+        self.assertEqual(found[8:11], ["m19991", "t19990", "m19990"])
+
+    @staticmethod
+    def random_trail(rng: random.Random, depth: int) -> Trail:
+        """A small random trail, for checking path queries against listing every path."""
+        trail = Trail(None)
+        for i in range(rng.randint(0, 3)):
+            if depth and rng.random() < 0.4:
+                top = TestTrailMethods.random_trail(rng, depth - 1)
+                bottom = TestTrailMethods.random_trail(rng, depth - 1)
+                trail = Trail(TrailSplit(top, bottom, trail))
+            else:
+                trail = Trail(TrailSeries(Mountain(f"m{rng.getrandbits(32)}", 1, 1), trail))
+        return trail
+
+    @staticmethod
+    def all_paths(trail: Trail) -> list[list[Mountain]]:
+        """Every path through trail, listed recursively."""
+        if trail.store is None:
+            return [[]]
+        if isinstance(trail.store, TrailSeries):
+            return [[trail.store.mountain] + path for path in TestTrailMethods.all_paths(trail.store.following)]
+        branches = TestTrailMethods.all_paths(trail.store.path_top) + TestTrailMethods.all_paths(trail.store.path_bottom)
+        return [branch + path for branch in branches for path in TestTrailMethods.all_paths(trail.store.path_follow)]
+
+    @number("8.2")
+    def test_count_paths(self):
+        self.load_example()
+        self.assertEqual(self.trail.count_paths_by_length(), [0, 0, 1, 3])
+        self.assertEqual([self.trail.count_k_paths(k) for k in range(-1, 6)], [0, 0, 0, 1, 3, 0, 0])
+        self.assertEqual(Trail(None).count_paths_by_length(), [1])
+
+        rng = random.Random(2)
+        for _ in range(200):
+            trail = self.random_trail(rng, 3)
+            lengths = [len(path) for path in self.all_paths(trail)]
+            histogram = trail.count_paths_by_length()
+            with self.subTest(trail=trail):
+                self.assertEqual(histogram, [lengths.count(k) for k in range(max(lengths) + 1)])
+                self.assertEqual(trail.count_k_paths(2), lengths.count(2))
+
+        # 2^500 paths: each split either takes its mountain or not.
+        trail = Trail(TrailSeries(self.final, Trail(None)))
+        for i in range(500):
+            trail = Trail(TrailSplit(Trail(TrailSeries(Mountain(str(i), 1, 1), Trail(None))), Trail(None), trail))
+        self.assertEqual(trail.count_paths_by_length(), [0] + [math.comb(500, k) for k in range(501)])
+        self.assertEqual(trail.count_k_paths(251), math.comb(500, 250))
+
+    @number("8.3")
+    def test_iter_k_paths(self):
+        self.load_example()
+        names = lambda path: [mountain.name for mountain in path]
+        self.assertEqual([names(path) for path in self.trail.iter_k_paths(3)], [
+            ["top-top", "top-mid", "final"],
+            ["top-bot", "top-mid", "final"],
+            ["bot-one", "bot-two", "final"],
+        ])
+        self.assertEqual([names(path) for path in self.trail.iter_k_paths(2)], [["bot-one", "final"]])
+        self.assertEqual(list(self.trail.iter_k_paths(4)), [])
+        self.assertEqual(list(self.trail.iter_k_paths(0)), [])
+
+        rng = random.Random(3)
+        for _ in range(100):
+            trail = self.random_trail(rng, 3)
+            paths = self.all_paths(trail)
+            for k in range(1, 8):
+                with self.subTest(trail=trail, k=k):
+                    expected = [path for path in paths if len(path) == k]
+                    found = list(trail.iter_k_paths(k))
+                    self.assertEqual(len(found), len(expected))
+                    self.assertTrue(all(map(lambda a, b: all(x is y for x, y in zip(a, b)), found, expected)))
+                    self.assertEqual(trail.length_k_paths(k), found)
+
+        # 2^300 paths, but the first ones come straight away.
+        trail = Trail(None)
+        for i in range(300):
+            trail = Trail(TrailSplit(Trail(TrailSeries(Mountain(str(i), 1, 1), Trail(None))), Trail(None), trail))
+        paths = trail.iter_k_paths(299)
+        self.assertEqual(names(next(paths)), [str(i) for i in range(299, 0, -1)])
+        self.assertEqual(names(next(paths)), [str(i) for i in range(299, 1, -1)] + ["0"])
+        self.assertEqual(len(list(trail.iter_k_paths(298))), math.comb(300, 298))
+
+        # Every path has an even number of mountains, so none has 41, though 41 is
+        # between the fewest and most. Branches are only walked if they can give k.
+        trail = Trail(None)
+        for i in range(40):
+            top = Trail(TrailSeries(Mountain(f"a{i}", 1, 1), Trail(TrailSeries(Mountain(f"b{i}", 1, 1), Trail(None)))))
+            trail = Trail(TrailSplit(top, Trail(None), trail))
+        self.assertEqual(list(trail.iter_k_paths(41)), [])
+        self.assertEqual(len(list(trail.iter_k_paths(4))), math.comb(40, 2))
+        self.assertEqual(len(list(trail.iter_k_paths(78))), 40)
+
+    @number("8.4")
+    def test_compile(self):
+        self.load_example()
+        compiled = self.trail.compile()
+        self.assertIs(self.trail.compile(), compiled)
+        self.assertEqual(len(compiled), 9)
+        self.assertEqual(compiled.mountains, self.trail.collect_all_mountains())
+        M, S, END = CompiledTrail.MOUNTAIN, CompiledTrail.SPLIT, CompiledTrail.END
+        # top-top, top-bot, top-mid, bot-one, bot-two, final
+        self.assertEqual(compiled.ops, [S, S, M, M, M, M, S, M, M])
+        self.assertEqual(compiled.top, [1, 2, END, END, END, END, 7, END, END])
+        self.assertEqual(compiled.bottom, [5, 3, END, END, END, END, END, END, END])
+        self.assertEqual(compiled.follow, [8, 4, END, END, END, 6, END, END, END])
+
+        # New trails don't change this one, so it stays compiled.
+        Trail(TrailSeries(self.final, Trail(None))).add_empty_branch_before()
+        self.assertIs(self.trail.compile(), compiled)
+
+        # Editing a part of it compiles it again.
+        bottom = self.trail.store.path_bottom.store
+        bottom.following = Trail(bottom.following.store.remove_branch())
+        self.assertIsNot(self.trail.compile(), compiled)
+        self.assertEqual(self.trail.count_paths_by_length(), [0, 0, 1, 2])
+        self.assertEqual([[m.name for m in path] for path in self.trail.length_k_paths(2)], [["bot-one", "final"]])
+
+        compiled = self.trail.compile()
+        self.trail.store.path_follow.store.mountain = self.bot_two
+        self.assertIsNot(self.trail.compile(), compiled)
+        self.assertEqual(self.trail.collect_all_mountains()[-1], self.bot_two)
+        tw = TopWalker()
+        self.trail.follow_path(tw)
+        self.assertEqual(tw.mountains, [self.top_top, self.top_mid, self.bot_two])
+
+        # Runs of mountains in series are walked in one step.
+        trail = Trail(None)
+        for i in range(10):
+            trail = Trail(TrailSeries(Mountain(str(i), 1, 1), trail))
+        trail = Trail(TrailSplit(trail, Trail(None), Trail(TrailSeries(self.final, Trail(None)))))
+        self.assertEqual(trail.compile().series, [1] + list(range(10, 0, -1)) + [1])
+        self.assertEqual(len(trail.length_k_paths(11)), 1)
+        self.assertEqual(len(trail.length_k_paths(1)), 1)
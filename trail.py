@@ -3,21 +3,40 @@ from dataclasses import dataclass
 
 from mountain import Mountain
 
-from typing import TYPE_CHECKING, Union
+from typing import TYPE_CHECKING, Iterator, Union
 
 from data_structures.linked_stack import LinkedStack
 # Avoid circular imports for typing.
 if TYPE_CHECKING:
     from personality import WalkerPersonality
 
-@dataclass
-class TrailSplit:
+class _TrailPart:
+    """
+    Base of the trail classes. Counts every change to the parts of any trail,
+    so a compiled trail (see Trail.compile) knows when it is out of date.
+    """
+
+    # Attributes that make up the shape of a trail.
+    _STRUCTURE = frozenset(("store", "mountain", "following", "path_top", "path_bottom", "path_follow"))
+    edits = 0
+
+    def __setattr__(self, name: str, value: object) -> None:
+        # Setting them in __init__ isn't an edit: a new part is not in any trail until
+        # it is assigned to a part that is, which is counted.
+        if name in _TrailPart._STRUCTURE and name in self.__dict__:
+            _TrailPart.edits += 1
+        object.__setattr__(self, name, value)
+
+@dataclass(eq=False)
+class TrailSplit(_TrailPart):
     """
     A split in the trail.
        ___path_top____
       /               \
     -<                 >-path_follow-
       \__path_bottom__/
+
+    Compares and hashes by identity, see Trail.
     """
 
     path_top: Trail
@@ -35,20 +54,27 @@ class TrailSplit:
         self.path_top = Trail(None) # Assignment is constant --> O(1) 
         return self.path_follow.store # Assignment is constant --> O(1)
 
-@dataclass
-class TrailSeries:
+    def structurally_equal(self, other: TrailSplit) -> bool:
+        """See Trail.structurally_equal."""
+        return _structurally_equal(self, other)
+
+@dataclass(eq=False)
+class TrailSeries(_TrailPart):
     """
     A mountain, followed by the rest of the trail
 
     --mountain--following--
 
+    Compares and hashes by identity, see Trail.
     """
-    def __hash__(self) -> int:
-        return hash(TrailSeries)
 
     mountain: Mountain
     following: Trail
 
+    def structurally_equal(self, other: TrailSeries) -> bool:
+        """See Trail.structurally_equal."""
+        return _structurally_equal(self, other)
+
 
     def remove_mountain(self) -> TrailStore:
         """
@@ -90,14 +116,84 @@ class TrailSeries:
 
 TrailStore = Union[TrailSplit, TrailSeries, None]
 
-@dataclass
-class Trail:
-    
+def _structurally_equal(first: Trail|TrailStore, second: Trail|TrailStore) -> bool:
+    """
+    Compare two trails (or stores) part by part, with an explicit stack so
+    long trails don't hit the recursion limit.
+
+    Complexity : O(n) where n is the number of trail objects compared.
+    """
+    pairs = [(first, second)]
+    while pairs:
+        a, b = pairs.pop()
+        if a is b:
+            continue # Same object, or both None --> O(1)
+        if isinstance(a, Trail) and isinstance(b, Trail):
+            pairs.append((a.store, b.store))
+        elif isinstance(a, TrailSeries) and isinstance(b, TrailSeries):
+            if not a.mountain == b.mountain:
+                return False
+            pairs.append((a.following, b.following))
+        elif isinstance(a, TrailSplit) and isinstance(b, TrailSplit):
+            pairs.append((a.path_top, b.path_top))
+            pairs.append((a.path_bottom, b.path_bottom))
+            pairs.append((a.path_follow, b.path_follow))
+        else:
+            return False
+    return True
+
+def _add_counts(first: tuple[int, list[int]], second: tuple[int, list[int]]) -> tuple[int, list[int]]:
+    """
+    Path length counts (see CompiledTrail.path_length_counts) of taking either of two branches.
+
+    Complexity : O(L) where L is the difference between the longest and shortest path.
+    """
+    offset = min(first[0], second[0])
+    counts = [0] * (max(first[0] + len(first[1]), second[0] + len(second[1])) - offset)
+    for start, branch in (first, second):
+        for i, count in enumerate(branch):
+            counts[start - offset + i] += count
+    return offset, counts
+
+def _pair_counts(first: tuple[int, list[int]], second: tuple[int, list[int]]) -> tuple[int, list[int]]:
+    """
+    Path length counts (see CompiledTrail.path_length_counts) of walking a path of
+    first, then a path of second.
+
+    Complexity : O(L1 * L2) where L1 and L2 are the spreads of path lengths of first and second.
+    """
+    counts = [0] * (len(first[1]) + len(second[1]) - 1)
+    for i, count in enumerate(first[1]):
+        if count:
+            for j, other in enumerate(second[1]):
+                counts[i + j] += count * other
+    return first[0] + second[0], counts
+
+@dataclass(eq=False)
+class Trail(_TrailPart):
+    """
+    A trail, holding a split, a mountain in series or nothing.
+
+    Trail, TrailSeries and TrailSplit objects compare and hash by identity,
+    so the sets of visited nodes used by traversals are O(1) per lookup.
+    Use structurally_equal to check whether two trails hold the same
+    mountains in the same shape.
+
+    follow_path, collect_all_mountains and the path queries run over the
+    compiled form of the trail (see compile), which is kept until any trail
+    is edited.
+    """
+
     store: TrailStore = None
 
-    def __hash__(self) -> int:
-        return hash(TrailStore)
-    
+    def structurally_equal(self, other: Trail) -> bool:
+        """
+        Whether other holds the same shape of splits and series, with equal mountains.
+
+        Complexity : O(n) where n is the number of trail objects compared.
+        """
+        return _structurally_equal(self, other)
+
     def add_mountain_before(self, mountain: Mountain) -> Trail:
         """Adds a mountain before everything currently in the trail."""
         return Trail(TrailSeries(mountain,Trail(None)))
@@ -115,123 +211,365 @@ class Trail:
         """
         return Trail(TrailSplit(Trail(None),Trail(None),Trail(None)))
 
+    def compile(self) -> CompiledTrail:
+        """Returns the trail compiled into flat lists of instructions, see CompiledTrail.
+
+           The compiled trail is kept, and reused until a part of any trail is changed:
+           setting the store, mountain or paths of an existing part, as the edit methods
+           and remove_branch do, makes the next call compile it again.
+
+           Complexity : O(1) when nothing has changed since the last call, otherwise
+                        O(n) where n is the number of trail objects.
+        """
+        compiled = self.__dict__.get("_compiled") # Constant --> O(1)
+        if compiled is None or compiled.edits != _TrailPart.edits: # Constant --> O(1)
+            compiled = CompiledTrail(self) # O(n)
+            self._compiled = compiled #Assignment is constant --> O(1)
+        return compiled # Returning is constant --> O(1)
+
     def follow_path(self, personality: WalkerPersonality) -> None:
-        """Follow a path and add mountains according to a personality."""
-        self.frontier = LinkedStack(1000) #Assignment is constant --> O(1)
-        self.frontier.push(self) # Pushing is constant in singly linked stack --> O(1)
-        while not self.frontier.is_empty(): # Checks is constant --> O(1)
-            self.trail_to_explore = self.frontier.pop() # Popping is constant in a singly linked stack --> O(1)
-            while self.trail_to_explore.store != None: #Checking is constant --> O(1)
-                if isinstance(self.trail_to_explore.store,TrailSplit): #Checking is instant --> O(1)
-                    is_top = personality.select_branch(self.trail_to_explore.store.path_top,self.trail_to_explore.store.path_bottom) #Assignment is constant --> O(1)
-                    if is_top: # Constant --> O(1)
-                        self.frontier.push(self.trail_to_explore.store.path_follow) # Pushing is constant in singly linked stack --> O(1)
-                        self.trail_to_explore = self.trail_to_explore.store.path_top #Assignment is constant --> O(1)
-                    else: # Constant --> O(1)
-                        self.frontier.push(self.trail_to_explore.store.path_follow) # Pushing is constant in singly linked stack --> O(1)
-                        self.trail_to_explore = self.trail_to_explore.store.path_bottom #Assignment is constant --> O(1)
+        """Follow a path and add mountains according to a personality.
+
+           Complexity : O(compile) plus O(p) where p is the number of mountains and splits
+                        on the path followed, see CompiledTrail.follow_path.
+        """
+        self.compile().follow_path(personality) # See CompiledTrail.follow_path
+
+    def iter_mountains(self) -> Iterator[Mountain]:
+        """Yields every mountain on the trail once, reading it left to right: at a split
+           the top path, then the bottom path, then the following path.
+
+           Walks each part of the trail exactly once, keeping the following paths still
+           to walk on a stack local to the generator, so several walks can run at once.
+
+           Complexity : Best case = Worst case = O(n) where n is the number of trail
+                        objects, as each is visited once and pushing and popping the
+                        singly linked stack is O(1).
+        """
+        frontier = LinkedStack() #Assignment is constant --> O(1)
+        frontier.push(self) # Pushing is constant in singly linked stack --> O(1)
+        while not frontier.is_empty(): # Checks is constant --> O(1)
+            store = frontier.pop().store # Popping is constant in a singly linked stack --> O(1)
+            while store is not None: #Checking is constant --> O(1)
+                if isinstance(store, TrailSplit): #Checking is instant --> O(1)
+                    frontier.push(store.path_follow) # Pushing is constant in singly linked stack --> O(1)
+                    frontier.push(store.path_bottom) # Pushing is constant in singly linked stack --> O(1)
+                    store = store.path_top.store #Assignment is constant --> O(1)
                 else: # Constant --> O(1)
-                    personality.add_mountain(self.trail_to_explore.store.mountain) # O(add_mountain) == O(1)
-                    if self.trail_to_explore.store.following.store == None: 
-                        if self.frontier.is_empty(): #Checking is instant --> O(1)
-                            break  # Constant --> O(1)
-                        self.trail_to_explore = self.frontier.pop() # Popping is constant in a singly linked stack --> O(1)
-                    else: # Constant --> O(1)
-                        self.trail_to_explore = self.trail_to_explore.store.following #Assignment is constant --> O(1)
-            
+                    yield store.mountain # Constant --> O(1)
+                    store = store.following.store #Assignment is constant --> O(1)
 
     def collect_all_mountains(self) -> list[Mountain]:
-        """Returns a list of all mountains on the trail.
-
-           Complexity : The best case of this is equal to the worst case. This is because the add function 
-                        in a set is always O(n) as the we would first need to iterate through the entire set
-                        to check if the element is already added. Due to this in the best case and the worst case 
-                        both need to iterate through the list . Due to this, Best case = Worst case = O(n + k) where k 
-                        is an integer of real numbers.
-
-        """
-        self.frontier = LinkedStack() #Assignment is constant --> O(1)
-        self.visited = set() #Assignment is constant --> O(1)
-        self.current_path = [] #Assignment is constant --> O(1)
-        self.trail_to_explore = self #Assignment is constant --> O(1)
-        while self.trail_to_explore.store != None: #Checking is instant --> O(1)
-            if isinstance(self.trail_to_explore.store,TrailSplit): # Constant --> O(1)
-                if self.trail_to_explore.store.path_top not in self.visited: # Constant --> O(1)
-                    self.frontier.push(self.trail_to_explore.store.path_follow) # Pushing is constant in singly linked stack --> O(1)
-                    self.trail_to_explore = self.trail_to_explore.store.path_top  #Assignment is constant --> O(1)
-                elif self.trail_to_explore.store.path_bottom not in self.visited: # Constant --> O(1)
-                    self.frontier.push(self.trail_to_explore.store.path_follow)  # Pushing is constant in singly linked stack --> O(1)
-                    self.trail_to_explore = self.trail_to_explore.store.path_bottom #Assignment is constant --> O(1)
-                
-                else: # Constant --> O(1)
-                    self.visited.add(self.trail_to_explore) # Adding is linear time --> O(n)
-                    self.trail_to_explore = self #Assignment is constant --> O(1)
-                    continue # Constant --> O(1)
-            else: # Constant --> O(1)
-                if self.trail_to_explore.store not in self.visited: # Constant --> O(1)
-                    self.visited.add( self.trail_to_explore.store)
-                    self.current_path.append(self.trail_to_explore.store.mountain) # Appending in a list is constant --> O(1)
-                if self.trail_to_explore.store.following.store == None: # Constant --> O(1)
-                    self.visited.add(self.trail_to_explore)  # Adding is linear time --> O(n)
-                    if not self.frontier.is_empty(): # Constant --> O(1)
-                        self.trail_to_explore = self.frontier.pop()  # Popping is constant in a singly linked stack --> O(1)
-                        if not self.frontier.is_empty() and self.trail_to_explore.store == None: # Constant --> O(1)
-                            self.trail_to_explore = self.frontier.pop()  # Popping is constant in a singly linked stack --> O(1)
-
-                    else: # Constant --> O(1)
-                        self.trail_to_explore = self #Assignment is constant --> O(1)
+        """Returns a list of all mountains on the trail, in the order of iter_mountains.
 
-                else: # Constant --> O(1)
-                    self.trail_to_explore = self.trail_to_explore.store.following #Assignment is constant --> O(1)
-        return self.current_path # Returning is constant --> O(1)
+           Complexity : O(compile) plus O(m) to copy the m mountains out of the compiled
+                        trail's mountain table, which is in the same order.
+        """
+        return list(self.compile().mountains) # O(m)
+
+    def count_paths_by_length(self) -> list[int]:
+        """Returns a histogram of path lengths: the number of paths containing exactly
+           i mountains at index i, up to the longest path. Paths are counted as in
+           length_k_paths, so taking a different branch is a different path.
+
+           Counts are combined bottom-up rather than listing the paths: a mountain adds
+           one to every length after it, a split adds the counts of its two branches,
+           then pairs every branch length with every following length.
+
+           Complexity : O(compile) plus O(n + s * L^2) the first time, where n is the number
+                        of trail objects, s the number of splits and L the difference between
+                        the longest and shortest path. Polynomial, where the number of paths
+                        is exponential in s. The counts are kept with the compiled trail, so
+                        later calls are O(L).
+        """
+        offset, counts = self.compile().path_length_counts() # See CompiledTrail.path_length_counts
+        return [0] * offset + counts # O(L)
+
+    def count_k_paths(self, k: int) -> int:
+        """Returns the number of paths containing exactly k mountains, the length of
+           length_k_paths(k), without listing them.
 
-    def length_k_paths(self, k) -> list[list[Mountain]]: # Input to this should not exceed k > 50, at most 5 branches.
+           Complexity : See count_paths_by_length, O(compile) once the counts are kept.
+        """
+        if k <= 0: # Constant --> O(1)
+            return 0 # Returning is constant --> O(1)
+        offset, counts = self.compile().path_length_counts() # See CompiledTrail.path_length_counts
+        if offset <= k < offset + len(counts): # Constant --> O(1)
+            return counts[k - offset] # Returning is constant --> O(1)
+        return 0 # Returning is constant --> O(1)
+
+    def iter_k_paths(self, k: int) -> Iterator[list[Mountain]]:
+        """Yields the paths containing exactly k mountains one at a time, as lists of
+           mountains, in the order of length_k_paths: top branches before bottom ones.
+           See CompiledTrail.iter_k_paths.
+
+           Complexity : O(compile) plus O(n + S * L) the first time to find which lengths
+                        each part of the trail can lead to, then O(s + k) per path yielded,
+                        where n is the number of trail objects, S the number of splits,
+                        L the number of mountains and s the number of splits on a path.
+        """
+        return self.compile().iter_k_paths(k) # See CompiledTrail.iter_k_paths
+
+    def length_k_paths(self, k) -> list[list[Mountain]]:
         """
         Returns a list of all paths of containing exactly k mountains.
         Paths are represented as lists of mountains.
 
         Paths are unique if they take a different branch, even if this results in the same set of mountains.
+
+        Complexity : See iter_k_paths, which lists the paths one at a time.
+        """
+        return list(self.iter_k_paths(k)) # See iter_k_paths
+
+
+class CompiledTrail:
+    """
+    A trail flattened into parallel lists, one entry per instruction, so
+    walking it is list indexing rather than following Trail, TrailSeries
+    and TrailSplit objects and checking their classes.
+
+    Instruction i is:
+        - ops[i] == MOUNTAIN: walk past mountains[args[i]], then go to follow[i].
+          The next series[i] - 1 instructions are the mountains in series
+          after it, so mountains[args[i]:args[i] + series[i]] can be walked
+          in one step.
+        - ops[i] == SPLIT: take top[i] or bottom[i] (the Trails of which are
+          branches[args[i]], for select_branch), then go to follow[i].
+    A jump to END is an empty trail: the end of a branch, or of the trail.
+
+    Instructions are laid out in the order iter_mountains walks the trail,
+    so a mountain in series is followed by the next instruction, every
+    instruction comes before the ones inside it, and the mountain table is
+    in the order of iter_mountains. Values worked out bottom-up (path
+    length counts and the lengths each instruction can lead to) are kept
+    once found.
+
+    The lists hold one extra entry past the last instruction where values
+    of END are kept, so that index END (-1) reads them.
+    """
+
+    MOUNTAIN = 0
+    SPLIT = 1
+    END = -1
+
+    def __init__(self, trail: Trail) -> None:
+        """
+        Compile trail.
+
+        Complexity : O(n) where n is the number of trail objects.
         """
-        if k<=0:
-            return []
-        self.frontier = LinkedStack()
-        self.visited = set()
-        self.current_path = []
-        self.all_paths = []
-        self.trail_to_explore = self
-        while self.trail_to_explore.store is not None:
-            if len(self.current_path) == k and self.frontier.is_empty():
-                self.all_paths.append(self.current_path)
-                self.current_path = []
-            elif len(self.current_path) > k or (len(self.current_path) < k and self.frontier.is_empty() and self.trail_to_explore.store is None):
-                self.current_path = []
-                self.frontier = LinkedStack() #creating a new stack is better than clearing old one as we save time complexity and python will clear up the objects anyway
-                self.trail_to_explore = self
-            if isinstance(self.trail_to_explore.store,TrailSplit):
-                if self.trail_to_explore.store.path_top not in self.visited:
-                    self.frontier.push(self.trail_to_explore.store.path_follow)
-                    self.trail_to_explore = self.trail_to_explore.store.path_top
-                elif self.trail_to_explore.store.path_bottom not in self.visited:
-                    self.frontier.push(self.trail_to_explore.store.path_follow)
-                    self.trail_to_explore = self.trail_to_explore.store.path_bottom
-                
+        self.edits = _TrailPart.edits
+        self.ops, self.args, self.top, self.bottom, self.follow = [], [], [], [], []
+        self.series = []
+        self.mountains: list[Mountain] = []
+        self.branches: list[tuple[Trail, Trail]] = []
+        self.start = self.END
+        self._counts = None
+        self._to_end = None
+        self._then = None # Set with _to_end, see path_lengths_to_end
+
+        ops, args, top, bottom, follow = self.ops, self.args, self.top, self.bottom, self.follow
+        # Trails still to lay out, with the list and index of the jump to point at them.
+        pending = [(trail, None, 0)]
+        while pending:
+            trail, jumps, at = pending.pop()
+            store = trail.store
+            if store is None:
+                continue # The jump stays at END.
+            if jumps is None:
+                self.start = len(ops)
+            else:
+                jumps[at] = len(ops)
+            while store is not None:
+                i = len(ops)
+                top.append(self.END)
+                bottom.append(self.END)
+                follow.append(self.END)
+                if isinstance(store, TrailSplit):
+                    ops.append(self.SPLIT)
+                    args.append(len(self.branches))
+                    self.branches.append((store.path_top, store.path_bottom))
+                    pending.append((store.path_follow, follow, i))
+                    pending.append((store.path_bottom, bottom, i))
+                    store = store.path_top.store # Laid out next
+                    if store is not None:
+                        top[i] = i + 1
                 else:
-                    self.visited.add(self.trail_to_explore)
-                    self.trail_to_explore = self
-                    self.frontier = LinkedStack()
+                    ops.append(self.MOUNTAIN)
+                    args.append(len(self.mountains))
+                    self.mountains.append(store.mountain)
+                    store = store.following.store # Laid out next
+                    if store is not None:
+                        follow[i] = i + 1
+
+        # Count each run of mountains in series back from its end.
+        series = self.series = [1] * len(ops)
+        for i in range(len(ops) - 2, -1, -1):
+            if ops[i] == self.MOUNTAIN and follow[i] == i + 1 and ops[i + 1] == self.MOUNTAIN:
+                series[i] = series[i + 1] + 1
+
+    def __len__(self) -> int:
+        """ The number of instructions. """
+        return len(self.ops)
+
+    def follow_path(self, personality: WalkerPersonality) -> None:
+        """
+        Follow a path and add mountains according to a personality.
+
+        Complexity : O(p) where p is the number of mountains and splits on the path.
+        """
+        ops, args, top, bottom, follow, series = self.ops, self.args, self.top, self.bottom, self.follow, self.series
+        mountains, branches = self.mountains, self.branches
+        add_mountain = personality.add_mountain
+        frontier = [] # Where to go after each branch taken
+        at = self.start
+        while True:
+            if at == self.END:
+                if not frontier:
+                    return
+                at = frontier.pop()
+            elif ops[at] == self.MOUNTAIN:
+                first = args[at]
+                for mountain in mountains[first:first + series[at]]:
+                    add_mountain(mountain)
+                at = follow[at + series[at] - 1]
             else:
-                self.current_path.append(self.trail_to_explore.store.mountain)
-                if self.trail_to_explore.store.following.store is None:
-                    self.visited.add(self.trail_to_explore)
-                    if not self.frontier.is_empty():
-                        self.trail_to_explore = self.frontier.pop()
-                        if not self.frontier.is_empty() and self.trail_to_explore.store is None:
-                            self.trail_to_explore = self.frontier.pop()
-                    else:
-                        self.trail_to_explore = self
+                frontier.append(follow[at])
+                path_top, path_bottom = branches[args[at]]
+                at = top[at] if personality.select_branch(path_top, path_bottom) else bottom[at]
+
+    def path_length_counts(self) -> tuple[int, list[int]]:
+        """
+        Returns (offset, counts) where counts[i] is the number of paths of offset + i
+        mountains. The first and last counts are never 0, so offset is the fewest
+        mountains on a path and offset + len(counts) - 1 the most.
+
+        Keeping the offset apart lets a mountain in series reuse the counts of the
+        trail after it, so long series cost O(1) per mountain.
 
+        Complexity : O(n + s * L^2) the first time, see Trail.count_paths_by_length, then O(1).
+        """
+        if self._counts is None:
+            ops, top, bottom, follow = self.ops, self.top, self.bottom, self.follow
+            counts = [None] * len(ops) + [(0, [1])] # END is the empty path
+            # Every instruction comes before the ones inside it.
+            for i in range(len(ops) - 1, -1, -1):
+                if ops[i] == self.MOUNTAIN:
+                    offset, following = counts[follow[i]]
+                    counts[i] = (offset + 1, following)
                 else:
-                    self.trail_to_explore = self.trail_to_explore.store.following
-        return self.all_paths
+                    counts[i] = _pair_counts(_add_counts(counts[top[i]], counts[bottom[i]]), counts[follow[i]])
+            self._counts = counts[self.start]
+        return self._counts
+
+    def path_lengths_to_end(self) -> list[tuple[int, int]]:
+        """
+        Returns, for each instruction, the numbers of mountains a walk can pass
+        between reaching it and the end of the whole trail: through the rest of its
+        branch, then on through the paths following every split it is inside. With
+        END's (the end of the trail, so only 0) last.
 
+        Each is (offset, mask) where bit i of mask is set when offset + i mountains
+        can be passed. Keeping the offset apart lets a mountain in series reuse the
+        mask of the instruction after it.
 
+        Complexity : O(n + s * L) the first time, where n is the number of instructions,
+                     s the number of splits and L the number of mountains, then O(1).
+        """
+        if self._to_end is None:
+            ops, top, bottom, follow = self.ops, self.top, self.bottom, self.follow
+            # Where a walk goes when the branch holding each instruction ends. Every
+            # instruction comes after the one leading to it, so one pass forwards sets them.
+            then = [self.END] * len(ops)
+            for i in range(len(ops)):
+                if ops[i] == self.MOUNTAIN:
+                    if follow[i] != self.END:
+                        then[follow[i]] = then[i]
+                else:
+                    after = follow[i] if follow[i] != self.END else then[i]
+                    for branch in (top[i], bottom[i]):
+                        if branch != self.END:
+                            then[branch] = after
+                    if follow[i] != self.END:
+                        then[follow[i]] = then[i]
+
+            # The paths following a split are laid out after its branches, so one pass
+            # backwards finds everything an instruction can lead to before it.
+            self._then = then
+            to_end = [None] * len(ops) + [(0, 1)]
+            for i in range(len(ops) - 1, -1, -1):
+                after = follow[i] if follow[i] != self.END else then[i]
+                if ops[i] == self.MOUNTAIN:
+                    offset, mask = to_end[after]
+                    to_end[i] = (offset + 1, mask)
+                else:
+                    first = to_end[top[i] if top[i] != self.END else after]
+                    second = to_end[bottom[i] if bottom[i] != self.END else after]
+                    if first[0] > second[0]:
+                        first, second = second, first
+                    to_end[i] = (first[0], first[1] | second[1] << (second[0] - first[0]))
+            self._to_end = to_end
+        return self._to_end
+
+    def iter_k_paths(self, k: int) -> Iterator[list[Mountain]]:
+        """
+        Yields the paths containing exactly k mountains one at a time, as lists of
+        mountains, top branches before bottom ones.
+
+        A branch is only walked when, with the mountains picked so far, some way
+        through it and on to the end of the trail has exactly k mountains (see
+        path_lengths_to_end). The runs of mountains in series picked so far, and the
+        instructions still to go to, are kept in linked cells shared by every path
+        that starts the same way, so nothing is copied until a path is yielded.
+
+        Complexity : O(n + s * L) the first time, see path_lengths_to_end, then O(s + k)
+                     per path yielded, where s is the number of splits on a path: every
+                     split walked leads to at least one path. Walking a run of mountains
+                     in series is O(1).
+        """
+        if k <= 0:
+            return
+        to_end = self.path_lengths_to_end()
+        offset, mask = to_end[self.start]
+        if k < offset or not mask >> (k - offset) & 1:
+            return
+        ops, args, top, bottom, follow, series = self.ops, self.args, self.top, self.bottom, self.follow, self.series
+        mountains, then = self.mountains, self._then
+
+        # A path so far is None or (start, end, path before it), for mountains[start:end].
+        # Still to go to is None or (instruction, the rest still to go to).
+        frontier = [(self.start, 0, None, None)]
+        while frontier:
+            at, length, path, pending = frontier.pop()
+            while True:
+                if at == self.END:
+                    if pending is None: # The end of a path, which has k mountains as every split walked was checked.
+                        runs = []
+                        while path is not None:
+                            runs.append(path)
+                            path = path[2]
+                        found = []
+                        for run in reversed(runs):
+                            found.extend(mountains[run[0]:run[1]])
+                        yield found
+                        break
+                    at, pending = pending[0], pending[1]
+                elif ops[at] == self.MOUNTAIN:
+                    run = series[at]
+                    path = (args[at], args[at] + run, path)
+                    length += run
+                    at = follow[at + run - 1]
+                else:
+                    rest = (follow[at], pending)
+                    # Where an empty branch leads, the same as the end of a full one.
+                    after = follow[at] if follow[at] != self.END else then[at]
+                    # Walk a branch only if some way on from it has exactly k - length mountains.
+                    branch = bottom[at]
+                    offset, mask = to_end[branch if branch != self.END else after]
+                    if k - length >= offset and mask >> (k - length - offset) & 1:
+                        frontier.append((branch, length, path, rest))
+                    branch = top[at]
+                    offset, mask = to_end[branch if branch != self.END else after]
+                    if k - length < offset or not mask >> (k - length - offset) & 1:
+                        break
+                    at, pending = branch, rest